@@ -1,7 +1,17 @@
 """Humanize API endpoints."""
+import asyncio
+
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
 
-from app.models.schemas import HumanizeRequest, HumanizeResponse
+from app.api.sse import sse_event, sse_response
+from app.config import settings
+from app.models.schemas import (
+    HumanizeBatchRequest,
+    HumanizeBatchResult,
+    HumanizeRequest,
+    HumanizeResponse,
+)
 from app.services.openai_service import OpenAIService
 
 router = APIRouter(prefix="/api/v1", tags=["humanize"])
@@ -37,6 +47,7 @@ async def humanize_text(request: HumanizeRequest) -> HumanizeResponse:
             similarity=request.params.similarity.value,
             style=request.params.style.value,
             custom_style=request.params.customStyle,
+            use_cache=request.params.useCache,
         )
 
         return HumanizeResponse(**result)
@@ -52,3 +63,106 @@ async def humanize_text(request: HumanizeRequest) -> HumanizeResponse:
             detail=f"Processing failed: {str(e)}",
         )
 
+
+
+@router.post(
+    "/humanize/stream",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Humanize AI-generated text (streaming)",
+    description=(
+        "Stream humanized text as server-sent events: `delta` events carry output "
+        "as it is generated, a final `done` event carries the HumanizeResponse "
+        "fields, and an `error` event is sent if processing fails."
+    ),
+)
+async def humanize_text_stream(request: HumanizeRequest) -> StreamingResponse:
+    """
+    Streaming humanize text endpoint.
+
+    Args:
+        request: HumanizeRequest with source text and parameters
+
+    Returns:
+        StreamingResponse emitting server-sent events
+    """
+
+    async def event_stream():
+        try:
+            async for event in openai_service.humanize_stream(
+                text=request.source.text,
+                length=request.params.length.value,
+                similarity=request.params.similarity.value,
+                style=request.params.style.value,
+                custom_style=request.params.customStyle,
+                use_cache=request.params.useCache,
+            ):
+                if event["event"] == "delta":
+                    yield sse_event("delta", {"content": event["content"]})
+                else:
+                    result = HumanizeResponse(**event["result"])
+                    yield sse_event("done", result.model_dump())
+        except ValueError as e:
+            yield sse_event("error", {"detail": str(e)})
+        except Exception as e:
+            yield sse_event("error", {"detail": f"Processing failed: {str(e)}"})
+
+    return sse_response(event_stream())
+
+
+@router.post(
+    "/humanize/batch",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Humanize a batch of texts",
+    description=(
+        "Process many humanize requests concurrently and stream one NDJSON "
+        "HumanizeBatchResult line per item as soon as it finishes. Lines arrive "
+        "in completion order; use `index` to match them to request items. A "
+        "failing item produces an `error` line instead of failing the batch."
+    ),
+)
+async def humanize_batch(request: HumanizeBatchRequest) -> StreamingResponse:
+    """
+    Batch humanize endpoint.
+
+    Args:
+        request: HumanizeBatchRequest with a list of humanize requests
+
+    Returns:
+        StreamingResponse emitting newline-delimited JSON results
+    """
+    semaphore = asyncio.Semaphore(max(1, settings.humanize_batch_concurrency))
+
+    async def run_item(index: int, item: HumanizeRequest) -> HumanizeBatchResult:
+        async with semaphore:
+            try:
+                result = await openai_service.humanize(
+                    text=item.source.text,
+                    length=item.params.length.value,
+                    similarity=item.params.similarity.value,
+                    style=item.params.style.value,
+                    custom_style=item.params.customStyle,
+                    use_cache=item.params.useCache,
+                )
+                return HumanizeBatchResult(index=index, result=HumanizeResponse(**result))
+            except ValueError as e:
+                return HumanizeBatchResult(index=index, error=str(e))
+            except Exception as e:
+                return HumanizeBatchResult(index=index, error=f"Processing failed: {str(e)}")
+
+    async def result_lines():
+        tasks = [
+            asyncio.create_task(run_item(index, item))
+            for index, item in enumerate(request.items)
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                item_result = await finished
+                yield item_result.model_dump_json(exclude_none=True) + "\n"
+        finally:
+            # Client went away or the stream was closed: stop remaining work
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(result_lines(), media_type="application/x-ndjson")
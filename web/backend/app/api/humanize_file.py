@@ -2,11 +2,12 @@
 from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel, Field
 import logging
-import base64
-from pathlib import Path
 
 from app.models.schemas import Params, HumanizeResponse
+from app.services.job_queue import ProgressCallback
 from app.services.openai_service import OpenAIService
+from app.services.output_budget import LENGTH_OUTPUT_RATIOS
+from app.services.upload_store import upload_store
 
 logger = logging.getLogger(__name__)
 
@@ -15,11 +16,14 @@ router = APIRouter(prefix="/api/v1", tags=["humanize-file"])
 # Initialize OpenAI service
 openai_service = OpenAIService()
 
+# Minimum progress increase between reports while streaming a job's output
+PROGRESS_STEP = 0.05
+
 
 class HumanizeFileRequest(BaseModel):
     """Request model for file-based humanization."""
     
-    file_path: str = Field(..., description="Path to the uploaded file")
+    file_id: str = Field(..., description="Content ID returned by the upload endpoint")
     text: str = Field(
         default="", 
         description="Extracted text from file. If empty, will use file base64 instead"
@@ -27,6 +31,112 @@ class HumanizeFileRequest(BaseModel):
     params: Params = Field(..., description="Processing parameters")
 
 
+async def _humanize_text_with_progress(
+    request: HumanizeFileRequest, report: ProgressCallback
+) -> dict:
+    """Humanize extracted text, reporting progress from the streamed output."""
+    expected_chars = len(request.text) * LENGTH_OUTPUT_RATIOS.get(request.params.length.value, 1.0)
+    emitted = 0
+    reported = 0.0
+    async for event in openai_service.humanize_stream(
+        text=request.text,
+        length=request.params.length.value,
+        similarity=request.params.similarity.value,
+        style=request.params.style.value,
+        custom_style=request.params.customStyle,
+        use_cache=request.params.useCache,
+    ):
+        if event["event"] == "done":
+            return event["result"]
+        emitted += len(event["content"])
+        # Output length is only estimated, so stay below 100% until done
+        progress = min(0.95, 0.1 + 0.85 * emitted / max(expected_chars, 1))
+        if progress - reported >= PROGRESS_STEP:
+            reported = progress
+            await report(progress, "Generating")
+    raise ValueError("Humanization ended without a result")
+
+
+async def humanize_stored_file(
+    request: HumanizeFileRequest, report: ProgressCallback | None = None
+) -> dict:
+    """
+    Humanize an uploaded file in text or file base64 mode.
+
+    Args:
+        request: HumanizeFileRequest with file ID, optional text, and parameters
+        report: Progress callback (used when running as a background job)
+
+    Returns:
+        dict: HumanizeResponse fields
+
+    Raises:
+        ValueError: If the file ID is invalid or processing fails
+        FileNotFoundError: If the file does not exist
+    """
+    # Verify file exists
+    stored = upload_store.get(request.file_id)
+    
+    logger.info(
+        f"Processing file: {stored.filename}, "
+        f"text length: {len(request.text)}, "
+        f"file size: {stored.size} bytes"
+    )
+    
+    # Determine transfer mode based on whether text is empty:
+    # - text not empty: only pass text (text mode)
+    # - text empty: pass file_data (file base64 mode)
+    has_text = bool(request.text and request.text.strip())
+    
+    if has_text:
+        logger.info(f"Using text mode: {len(request.text)} characters")
+        # Text mode: only pass extracted text
+        try:
+            if report is not None:
+                await report(0.1, "Generating")
+                result = await _humanize_text_with_progress(request, report)
+            else:
+                result = await openai_service.humanize(
+                    text=request.text,
+                    length=request.params.length.value,
+                    similarity=request.params.similarity.value,
+                    style=request.params.style.value,
+                    custom_style=request.params.customStyle,
+                    use_cache=request.params.useCache,
+                    file_data=None  # Don't pass file data
+                )
+        except Exception as openai_error:
+            logger.error(f"OpenAI service error (text mode): {openai_error}", exc_info=True)
+            raise
+    else:
+        # The file is base64-encoded from disk while the upstream body is sent
+        logger.info(f"Using file base64 mode: {stored.size} bytes")
+        if report is not None:
+            await report(0.1, "Generating from file")
+        # File mode: pass base64 encoded file
+        try:
+            result = await openai_service.humanize(
+                text="",  # Empty text
+                length=request.params.length.value,
+                similarity=request.params.similarity.value,
+                style=request.params.style.value,
+                custom_style=request.params.customStyle,
+                file_data={
+                    'filename': stored.filename,
+                    'path': stored.path
+                }
+            )
+        except Exception as openai_error:
+            logger.error(f"OpenAI service error (file mode): {openai_error}", exc_info=True)
+            raise
+    
+    logger.info(
+        f"File humanization completed: {stored.filename}, "
+        f"output length: {result['chars']}"
+    )
+    return result
+
+
 @router.post(
     "/humanize-file",
     response_model=HumanizeResponse,
@@ -49,7 +159,7 @@ async def humanize_file(request: HumanizeFileRequest) -> HumanizeResponse:
        - Useful for files with complex formatting
     
     Args:
-        request: HumanizeFileRequest with file path, optional text, and parameters
+        request: HumanizeFileRequest with file ID, optional text, and parameters
         
     Returns:
         HumanizeResponse with humanized content
@@ -58,66 +168,7 @@ async def humanize_file(request: HumanizeFileRequest) -> HumanizeResponse:
         HTTPException: If processing fails
     """
     try:
-        # Verify file exists
-        file_path = Path(request.file_path)
-        if not file_path.exists():
-            raise ValueError(f"File not found: {request.file_path}")
-        
-        # Read and encode file to base64
-        with open(file_path, "rb") as f:
-            file_content = f.read()
-            file_base64 = base64.b64encode(file_content).decode("utf-8")
-        
-        logger.info(
-            f"Processing file: {file_path.name}, "
-            f"text length: {len(request.text)}, "
-            f"base64 length: {len(file_base64)}"
-        )
-        
-        # Determine transfer mode based on whether text is empty:
-        # - text not empty: only pass text (text mode)
-        # - text empty: pass file_data (file base64 mode)
-        has_text = bool(request.text and request.text.strip())
-        
-        if has_text:
-            logger.info(f"Using text mode: {len(request.text)} characters")
-            # Text mode: only pass extracted text
-            try:
-                result = await openai_service.humanize(
-                    text=request.text,
-                    length=request.params.length.value,
-                    similarity=request.params.similarity.value,
-                    style=request.params.style.value,
-                    custom_style=request.params.customStyle,
-                    file_data=None  # Don't pass file data
-                )
-            except Exception as openai_error:
-                logger.error(f"OpenAI service error (text mode): {openai_error}", exc_info=True)
-                raise
-        else:
-            logger.info(f"Using file base64 mode: {len(file_base64)} characters")
-            # File mode: pass base64 encoded file
-            try:
-                result = await openai_service.humanize(
-                    text="",  # Empty text
-                    length=request.params.length.value,
-                    similarity=request.params.similarity.value,
-                    style=request.params.style.value,
-                    custom_style=request.params.customStyle,
-                    file_data={
-                        'filename': file_path.name,
-                        'base64_content': file_base64
-                    }
-                )
-            except Exception as openai_error:
-                logger.error(f"OpenAI service error (file mode): {openai_error}", exc_info=True)
-                raise
-        
-        logger.info(
-            f"File humanization completed: {file_path.name}, "
-            f"output length: {result['chars']}"
-        )
-        
+        result = await humanize_stored_file(request)
         return HumanizeResponse(**result)
         
     except ValueError as e:
@@ -0,0 +1,141 @@
+"""Background job API endpoints."""
+import asyncio
+import logging
+
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from app.api.humanize_file import HumanizeFileRequest, humanize_stored_file
+from app.api.sse import sse_event, sse_response
+from app.config import settings
+from app.models.schemas import JobResponse
+from app.services.job_queue import SUCCEEDED, Job, ProgressCallback, job_runner
+from app.services.upload_store import upload_store
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1", tags=["jobs"])
+
+HUMANIZE_FILE_JOB = "humanize_file"
+
+
+async def _run_humanize_file(payload: dict, report: ProgressCallback) -> dict:
+    """Job handler: humanize an uploaded file."""
+    return await humanize_stored_file(HumanizeFileRequest(**payload), report)
+
+
+job_runner.register(HUMANIZE_FILE_JOB, _run_humanize_file)
+
+
+def _to_response(job: Job) -> JobResponse:
+    return JobResponse(
+        jobId=job.id,
+        kind=job.kind,
+        status=job.status,
+        progress=job.progress,
+        message=job.message,
+        result=job.result,
+        error=job.error,
+        createdAt=job.created_at,
+        updatedAt=job.updated_at,
+    )
+
+
+async def _get_job(job_id: str) -> Job:
+    job = await job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job not found: {job_id}")
+    return job
+
+
+@router.post(
+    "/jobs/humanize-file",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Queue file humanization",
+    description=(
+        "Queue humanization of an uploaded file and return a job ID immediately. "
+        "Poll `/api/v1/jobs/{job_id}` or subscribe to `/api/v1/jobs/{job_id}/events` "
+        "for progress and the result."
+    ),
+)
+async def submit_humanize_file(request: HumanizeFileRequest) -> JobResponse:
+    """
+    Queue a humanize-file job.
+
+    Args:
+        request: Same body as ``/api/v1/humanize-file``
+
+    Returns:
+        JobResponse for the queued job
+
+    Raises:
+        HTTPException: If the file ID is invalid or unknown
+    """
+    try:
+        upload_store.get(request.file_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    job = await job_runner.submit(HUMANIZE_FILE_JOB, request.model_dump(mode="json"))
+    logger.info(f"Queued job {job.id} for file {request.file_id[:12]}")
+    return _to_response(job)
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=JobResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get job status",
+    description="Return the status, progress and (once finished) the result of a job",
+)
+async def get_job(job_id: str) -> JobResponse:
+    """
+    Look up a job.
+
+    Raises:
+        HTTPException: If the job does not exist
+    """
+    return _to_response(await _get_job(job_id))
+
+
+@router.get(
+    "/jobs/{job_id}/events",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Stream job progress",
+    description=(
+        "Server-sent events: a `progress` event whenever the job's status or "
+        "progress changes, then a final `done` or `error` event."
+    ),
+)
+async def stream_job_events(job_id: str) -> StreamingResponse:
+    """
+    Stream job progress as server-sent events.
+
+    The job may be running in any worker process, so its state is polled
+    from the shared store.
+
+    Raises:
+        HTTPException: If the job does not exist
+    """
+    job = await _get_job(job_id)
+
+    async def event_stream():
+        current = job
+        last_state = None
+        while True:
+            state = (current.status, current.progress, current.message)
+            if current.finished:
+                response = _to_response(current).model_dump(mode="json")
+                yield sse_event("done" if current.status == SUCCEEDED else "error", response)
+                return
+            if state != last_state:
+                last_state = state
+                yield sse_event("progress", _to_response(current).model_dump(mode="json"))
+            await asyncio.sleep(settings.job_poll_interval)
+            current = await job_runner.get(job_id) or current
+
+    return sse_response(event_stream())
@@ -0,0 +1,59 @@
+"""Runtime metrics endpoint."""
+import asyncio
+from typing import Any, Dict
+
+from fastapi import APIRouter, status
+
+from app.services.extraction_cache import extraction_cache
+from app.services.extraction_pool import extraction_pool
+from app.services.extractors import extractor_registry
+from app.services.hedging import openai_hedger
+from app.services.job_queue import job_runner, job_store
+from app.services.openai_service import get_provider_router
+from app.services.output_budget import output_budget
+from app.services.rate_limiter import rate_limiter
+from app.services.resilience import openai_breaker, openai_retry_policy
+from app.services.result_cache import result_cache
+from app.services.single_flight import humanize_flights
+from app.services.upload_janitor import upload_janitor
+
+router = APIRouter(prefix="/api/v1", tags=["metrics"])
+
+
+def _provider_stats() -> Dict[str, Any]:
+    """Routing state, or the configuration error if no router can be built."""
+    try:
+        return get_provider_router().stats()
+    except ValueError as e:
+        return {"error": str(e)}
+
+
+@router.get(
+    "/metrics",
+    response_model=Dict[str, Any],
+    status_code=status.HTTP_200_OK,
+    summary="Service metrics",
+    description="Per-worker counters for caches and upstream scheduling",
+)
+async def get_metrics() -> Dict[str, Any]:
+    """
+    Return runtime metrics for this worker process.
+
+    Returns:
+        Dict with metrics grouped by component
+    """
+    return {
+        "resultCache": result_cache.stats(),
+        "singleFlight": humanize_flights.stats(),
+        "rateLimiter": rate_limiter.stats(),
+        "circuitBreaker": openai_breaker.stats(),
+        "retries": openai_retry_policy.stats(),
+        "hedging": openai_hedger.stats(),
+        "providers": _provider_stats(),
+        "outputBudget": output_budget.stats(),
+        "extractionPool": extraction_pool.stats(),
+        "extractionCache": extraction_cache.stats(),
+        "extractors": extractor_registry.stats(),
+        "uploads": upload_janitor.stats(),
+        "jobs": {**job_runner.stats(), "queue": await asyncio.to_thread(job_store.counts)},
+    }
@@ -0,0 +1,23 @@
+"""Server-sent event helpers shared by the streaming endpoints."""
+import json
+from typing import AsyncIterator
+
+from fastapi.responses import StreamingResponse
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format a server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """Stream formatted events without caching or proxy buffering."""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Disable proxy buffering (nginx) so events reach the browser immediately
+            "X-Accel-Buffering": "no",
+        },
+    )
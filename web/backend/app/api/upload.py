@@ -1,9 +1,19 @@
 """File upload API endpoints."""
-from fastapi import APIRouter, File, UploadFile, HTTPException, status
-from typing import Dict
+from fastapi import APIRouter, File, Query, UploadFile, HTTPException, status
+from fastapi.responses import FileResponse
+from typing import AsyncIterator
 import logging
 
+from app.config import settings
+from app.models.schemas import UploadResponse
+from app.services.extraction_cache import ExtractionResult, extraction_cache
+from app.services.extraction_pool import extraction_pool
+from app.services.extractors import FormatExtractor, extract_buffer, extract_file, extractor_registry
 from app.services.file_processor import FileProcessor
+from app.services.pdf_extractor import pdf_extractor
+from app.services.pptx_extractor import pptx_extractor
+from app.services.tokenizer import Tokenizer
+from app.services.upload_store import StoredFile, upload_store
 
 logger = logging.getLogger(__name__)
 
@@ -11,54 +21,165 @@ router = APIRouter(prefix="/api/v1", tags=["upload"])
 
 file_processor = FileProcessor()
 
+_tokenizer: Tokenizer | None = None
+
+
+def _get_tokenizer() -> Tokenizer:
+    """Tokenizer used to count extracted tokens (created on first use)."""
+    global _tokenizer
+    if _tokenizer is None:
+        _tokenizer = Tokenizer(settings.openai_model)
+    return _tokenizer
+
+
+async def _read_chunks(file: UploadFile, buffer: bytearray | None = None) -> AsyncIterator[bytes]:
+    """Yield the uploaded file in ``upload_chunk_size`` pieces, keeping a copy in ``buffer``."""
+    while chunk := await file.read(settings.upload_chunk_size):
+        if buffer is not None:
+            buffer.extend(chunk)
+        yield chunk
+
+
+async def _extract(
+    stored: StoredFile,
+    fmt: FormatExtractor,
+    start_page: int = 0,
+    end_page: int | None = None,
+    buffer: bytearray | None = None,
+) -> ExtractionResult:
+    """
+    Extract text from a stored upload, reusing a cached result when possible.
+
+    Parsing always runs in worker processes, so it never blocks the event
+    loop and an overrunning job is killed. Small uploads are sent to a worker
+    as ``buffer``, the bytes received, without reading the stored file back;
+    for larger files PDF page ranges and PPTX slide ranges are spread across
+    all workers.
+    PDFs are only parsed up to the end of the requested page range or until
+    the extracted text exceeds the token budget, since anything beyond it
+    would be truncated before being sent upstream anyway.
+    """
+    token_budget = settings.extraction_token_budget or settings.humanize_max_document_tokens
+    variant = ""
+    if fmt.name == "pdf":
+        variant = f"p{start_page}-{'' if end_page is None else end_page}.t{token_budget}"
+    elif fmt.name == "pptx":
+        variant = "notes" if pptx_extractor.include_notes else "slides"
+
+    if settings.extraction_cache_enabled:
+        cached = await extraction_cache.get(stored.file_id, fmt.extension, variant)
+        if cached is not None:
+            logger.info(f"Extraction cache hit: {stored.file_id[:12]}")
+            return cached
+
+    if buffer is not None:
+        with extractor_registry.timed(fmt.name, len(buffer)):
+            result = await extraction_pool.run(
+                extract_buffer, bytes(buffer), fmt.name, start_page, end_page, token_budget
+            )
+    elif fmt.name == "pdf":
+        with extractor_registry.timed(fmt.name, stored.size):
+            result = await pdf_extractor.extract_within_budget(
+                str(stored.path),
+                start_page=start_page,
+                end_page=end_page,
+                token_budget=token_budget,
+                count_tokens=_get_tokenizer().count,
+            )
+    elif fmt.name == "pptx":
+        with extractor_registry.timed(fmt.name, stored.size):
+            result = ExtractionResult(text=await pptx_extractor.extract(str(stored.path)))
+    else:
+        with extractor_registry.timed(fmt.name, stored.size):
+            text = await extraction_pool.run(extract_file, str(stored.path), fmt.name)
+        result = ExtractionResult(text=text)
+
+    if settings.extraction_cache_enabled:
+        await extraction_cache.put(stored.file_id, fmt.extension, result, variant)
+    return result
+
+
+def _page_fields(fmt: FormatExtractor, extraction: ExtractionResult) -> dict:
+    """Page range metadata for the upload response (PDFs only)."""
+    if fmt.name != "pdf":
+        return {}
+    return {
+        "pageCount": extraction.page_count,
+        "startPage": extraction.start_page + 1,
+        "endPage": extraction.end_page,
+        "stopReason": extraction.stop_reason,
+    }
+
 
 @router.post(
     "/upload",
-    response_model=Dict[str, str],
+    response_model=UploadResponse,
+    response_model_exclude_none=True,
     status_code=status.HTTP_200_OK,
     summary="Upload and process document",
     description="Upload a document file (PDF, DOCX, PPTX, TXT) and extract text content",
 )
-async def upload_file(file: UploadFile = File(...)) -> Dict[str, str]:
+async def upload_file(
+    file: UploadFile = File(...),
+    start_page: int | None = Query(None, ge=1, description="First PDF page to extract (1-based)"),
+    end_page: int | None = Query(None, ge=1, description="Last PDF page to extract (1-based)"),
+) -> UploadResponse:
     """
     Upload and process document file.
 
+    The file is streamed to disk in chunks while being hashed, so memory use
+    does not grow with the file size, and it is stored under its SHA-256
+    content ID. Uploads up to ``extraction_inline_max_bytes`` are also kept
+    in memory and parsed from there. The format is detected from the
+    content, not the extension. The raw bytes are not echoed back and can be
+    fetched from ``/api/v1/files/{file_id}`` if needed.
+
     Args:
         file: Uploaded file
+        start_page: First PDF page to extract (1-based, inclusive)
+        end_page: Last PDF page to extract (1-based, inclusive)
 
     Returns:
-        Dict with extracted text and base64 encoded file
+        UploadResponse with the file ID, extracted text and stats
 
     Raises:
         HTTPException: If upload or processing fails
     """
     try:
-        # Read file content
-        content = await file.read()
-        file_size = len(content)
-
-        # Validate file
-        file_processor.validate_file(file.filename or "unknown", file_size)
-
-        # Save file to local storage
-        file_path = file_processor.save_file(file.filename or "unknown", content)
+        # Validate type (and size, when already known) before copying anything
+        filename = file.filename or "unknown"
+        file_processor.validate_file(filename, file.size or 0)
+        if start_page and end_page and end_page < start_page:
+            raise ValueError("end_page must not be before start_page")
+
+        # Stream the file into the content-addressed store
+        inline = bool(file.size) and file.size <= settings.extraction_inline_max_bytes
+        buffer = bytearray() if inline else None
+        stored = await upload_store.put_stream(
+            filename, _read_chunks(file, buffer), FileProcessor.MAX_FILE_SIZE
+        )
+        file_size = stored.size
+        if buffer is not None and len(buffer) != file_size:
+            buffer = None
 
-        # Process file and extract text
-        extracted_text, base64_content = file_processor.process_file(file_path)
+        # Extract text (repeat uploads of the same content skip parsing)
+        fmt = extractor_registry.detect(stored.path if buffer is None else buffer, filename)
+        extraction = await _extract(stored, fmt, (start_page or 1) - 1, end_page, buffer)
+        extracted_text = extraction.text
 
         logger.info(
-            f"File uploaded and processed: {file.filename}, size: {file_size} bytes, "
+            f"File uploaded and processed: {filename}, size: {file_size} bytes, "
             f"extracted: {len(extracted_text)} characters"
         )
 
-        return {
-            "filename": file.filename or "unknown",
-            "text": extracted_text,
-            "base64": base64_content,
-            "size": str(file_size),
-            "chars": str(len(extracted_text)),
-            "file_path": file_path,  # Return file path for later use
-        }
+        return UploadResponse(
+            fileId=stored.file_id,
+            filename=filename,
+            text=extracted_text,
+            size=file_size,
+            chars=len(extracted_text),
+            **_page_fields(fmt, extraction),
+        )
 
     except ValueError as e:
         raise HTTPException(
@@ -72,3 +193,35 @@ async def upload_file(file: UploadFile = File(...)) -> Dict[str, str]:
             detail=f"File upload failed: {str(e)}",
         )
 
+
+@router.get(
+    "/files/{file_id}",
+    status_code=status.HTTP_200_OK,
+    summary="Download uploaded file",
+    description="Return the raw bytes of an uploaded file (supports HTTP Range requests)",
+)
+async def download_file(file_id: str) -> FileResponse:
+    """
+    Download a stored upload.
+
+    Args:
+        file_id: SHA-256 content ID returned by ``/upload``
+
+    Returns:
+        FileResponse streaming the file; ``Range`` headers yield partial content
+
+    Raises:
+        HTTPException: If the ID is invalid or the file does not exist
+    """
+    try:
+        stored = upload_store.get(file_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    return FileResponse(
+        stored.path,
+        media_type=stored.content_type,
+        filename=stored.filename,
+    )
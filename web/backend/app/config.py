@@ -19,6 +19,111 @@ class Settings(BaseSettings):
     openai_model: str = "gpt-4o-mini"  # Use a stable model
     openai_api_url: str = "https://api.openai.com/v1/chat/completions"
 
+    # Shared upstream HTTP client (one pooled client per worker process)
+    openai_timeout: float = 120.0
+    openai_max_connections: int = 100
+    openai_max_keepalive_connections: int = 20
+    openai_keepalive_expiry: float = 30.0
+    openai_http2: bool = True  # Requires the optional "h2" package
+    openai_warmup_connections: int = 2  # Connections pre-opened at startup (0 disables)
+
+    # Upstream rate limits (0 = learn from x-ratelimit-* response headers)
+    openai_rpm_limit: int = 0
+    openai_tpm_limit: int = 0
+    openai_rate_limit_max_wait: float = 30.0  # Longest a request may queue before failing
+
+    # Retries and circuit breaker for transient upstream failures
+    openai_max_retries: int = 3
+    openai_retry_base_delay: float = 0.5
+    openai_retry_max_delay: float = 8.0
+    openai_attempt_timeout: float = 60.0  # Per attempt when no output budget applies
+    openai_connect_timeout: float = 10.0
+    openai_breaker_failure_threshold: int = 5
+    openai_breaker_reset_timeout: float = 30.0
+
+    # Request hedging: duplicate calls slower than the recent p95 latency
+    openai_hedging_enabled: bool = False
+    openai_hedge_budget: float = 0.05  # Max fraction of requests that may be hedged
+    openai_hedge_min_delay: float = 1.0
+    openai_hedge_max_delay: float = 30.0
+    openai_hedge_min_samples: int = 20  # Latency samples needed before hedging starts
+
+    # Completion providers in order of preference (openai, gemini, fake)
+    humanize_providers: str = "openai"
+    provider_max_error_rate: float = 0.5  # Above this recent error rate a provider is deprioritized
+    provider_min_samples: int = 5
+    provider_health_window: float = 60.0  # Seconds of outcomes used for the error rate
+
+    # Gemini API Configuration (loaded from environment: GEMINI_API_KEY)
+    gemini_api_key: str = ""
+    gemini_model: str = "gemini-1.5-flash"
+    gemini_api_url: str = "https://generativelanguage.googleapis.com/v1beta"
+    gemini_timeout: float = 60.0
+
+    # Uploads are streamed to disk in chunks of this size
+    upload_chunk_size: int = 1024 * 1024
+    upload_multipart_overhead: int = 64 * 1024  # Allowance for multipart framing in the body limit
+    # Background cleanup of stored uploads (0 disables either limit)
+    upload_max_age_hours: float = 24.0  # Since the file was last uploaded
+    upload_max_total_bytes: int = 2 * 1024 * 1024 * 1024  # Oldest files are deleted above this
+    upload_janitor_interval: float = 60.0  # Seconds between sweeps
+    upload_janitor_rescan_interval: float = 3600.0  # Full scans pick up other workers' uploads
+
+    # Document extraction runs in pre-warmed worker processes (0 = run in a thread)
+    extraction_workers: int = 2
+    extraction_timeout: float = 60.0  # Per job; the worker is killed and replaced on overrun
+    pdf_pages_per_job: int = 16  # PDFs are split into page ranges extracted in parallel
+    # PDF extraction stops once this many tokens are extracted (0 = humanize_max_document_tokens)
+    extraction_token_budget: int = 0
+    pptx_slides_per_job: int = 20  # Large decks are split into slide ranges extracted in parallel
+    pptx_include_notes: bool = True  # Append speaker notes to each slide's text
+    ooxml_max_part_bytes: int = 256 * 1024 * 1024  # Decompressed size cap per DOCX/PPTX part (0 = no limit)
+    # Uploads up to this size are sent to a worker from the received bytes instead of re-read from disk
+    extraction_inline_max_bytes: int = 2 * 1024 * 1024
+
+    # Extracted text cached by content hash: in memory per worker, on disk shared
+    extraction_cache_enabled: bool = True
+    extraction_cache_dir: str = ""  # Defaults to web/backend/cache/extraction
+    extraction_cache_memory_bytes: int = 32 * 1024 * 1024
+    extraction_cache_disk_bytes: int = 512 * 1024 * 1024
+
+    # Output budgets: max_tokens and timeout sized from input length and Length option
+    openai_max_output_tokens: int = 4000  # Model output cap
+    output_budget_min_tokens: int = 256
+    output_budget_base_timeout: float = 15.0
+    output_budget_seconds_per_token: float = 0.025  # Capped at openai_timeout
+
+    # Long documents are split into chunks that are rewritten in parallel
+    humanize_chunk_tokens: int = 3000
+    humanize_chunk_concurrency: int = 4
+    humanize_max_document_tokens: int = 400000
+
+    # Batch endpoint: items processed concurrently per batch request
+    humanize_batch_concurrency: int = 8
+
+    # Tokenization: inputs at least this long are encoded in a thread pool
+    tokenizer_threads: int = 2
+    tokenizer_thread_threshold_chars: int = 20000
+
+    # Result cache for identical humanize requests (per worker)
+    result_cache_enabled: bool = True
+    result_cache_max_entries: int = 1000
+    result_cache_max_bytes: int = 64 * 1024 * 1024
+    result_cache_ttl_seconds: float = 3600.0
+    result_cache_variants: int = 1  # >1 keeps several rewrites per key and rotates
+
+    # Background jobs (SQLite queue shared by all workers; no external broker)
+    job_queue_db: str = ""  # Defaults to web/backend/data/jobs.db
+    job_workers: int = 2  # Jobs run concurrently by each API worker process
+    job_poll_interval: float = 0.5  # Queue polling and progress event interval (seconds)
+    job_stale_seconds: float = 300.0  # Running jobs without a heartbeat this long are retried
+    job_max_attempts: int = 2
+    job_retention_seconds: float = 86400.0  # Finished jobs are deleted after this long
+    job_timeout_seconds: float = 1800.0  # Running jobs are failed after this long (0 = no limit)
+
+    # Identical concurrent requests share one upstream rewrite
+    single_flight_enabled: bool = True
+
     class Config:
         env_file = ".env"
 
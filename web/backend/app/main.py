@@ -1,12 +1,19 @@
 """FastAPI application entry point."""
+from contextlib import AsyncExitStack, asynccontextmanager
 from pathlib import Path
 import sys
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api import humanize, humanize_file, upload
+from app.api import humanize, humanize_file, jobs, metrics, upload
 from app.config import settings
+from app.middleware import BodySizeLimitMiddleware
+from app.services.extraction_pool import extraction_pool
+from app.services.file_processor import FileProcessor
+from app.services.http_client import init_http_client, close_http_client
+from app.services.job_queue import job_runner
+from app.services.upload_janitor import upload_janitor
 
 # Ensure app module can be imported (supports both direct running and module import)
 if __name__ == "__main__":
@@ -15,11 +22,31 @@ if __name__ == "__main__":
         sys.path.insert(0, str(backend_dir))
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared resources on startup and release them on shutdown.
+
+    Each resource registers its teardown as soon as it has started, so a
+    failure part-way through startup still stops everything that is
+    already running, in reverse order.
+    """
+    async with AsyncExitStack() as stack:
+        await init_http_client()
+        stack.push_async_callback(close_http_client)
+        if extraction_pool.workers > 0:
+            extraction_pool.start()
+            stack.callback(extraction_pool.shutdown)
+        job_runner.start()
+        stack.push_async_callback(job_runner.stop)
+        await upload_janitor.start()
+        stack.push_async_callback(upload_janitor.stop)
+        yield
 
 app = FastAPI(
     title=settings.app_name,
     description="Transform AI-generated text into human-like content",
     version=settings.app_version,
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -31,10 +58,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Reject oversized uploads before the multipart body is buffered
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_body_size=FileProcessor.MAX_FILE_SIZE + settings.upload_multipart_overhead,
+    path_prefixes=("/api/v1/upload",),
+)
+
 # Register routers
 app.include_router(humanize.router)
 app.include_router(upload.router)
 app.include_router(humanize_file.router)
+app.include_router(jobs.router)
+app.include_router(metrics.router)
 
 
 @app.get("/")
@@ -0,0 +1,85 @@
+"""ASGI middleware."""
+import logging
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Named HTTP_413_CONTENT_TOO_LARGE or HTTP_413_REQUEST_ENTITY_TOO_LARGE depending on version
+PAYLOAD_TOO_LARGE = 413
+
+
+class BodySizeLimitMiddleware:
+    """
+    Reject request bodies larger than ``max_body_size`` before they are buffered.
+
+    A too-large ``Content-Length`` is answered with 413 without reading the body.
+    Bodies without a length (chunked transfer) are counted as they arrive and
+    the request fails with 413 as soon as the limit is passed.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int, path_prefixes: tuple[str, ...] = ()):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: Wrapped ASGI application
+            max_body_size: Largest accepted body in bytes
+            path_prefixes: Paths the limit applies to (all paths if empty)
+        """
+        self.app = app
+        self.max_body_size = max_body_size
+        self.path_prefixes = path_prefixes
+
+    def _applies(self, path: str) -> bool:
+        return not self.path_prefixes or path.startswith(self.path_prefixes)
+
+    def _too_large(self) -> JSONResponse:
+        return JSONResponse(
+            {"detail": f"Request body exceeds maximum allowed size ({self.max_body_size} bytes)"},
+            status_code=PAYLOAD_TOO_LARGE,
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._applies(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit():
+            if int(content_length) > self.max_body_size:
+                logger.warning(f"Rejected {scope['path']}: Content-Length {int(content_length)} too large")
+                await self._too_large()(scope, receive, send)
+                return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # FastAPI passes HTTPExceptions from body parsing through unchanged
+                    raise HTTPException(
+                        status_code=PAYLOAD_TOO_LARGE,
+                        detail=f"Request body exceeds maximum allowed size ({self.max_body_size} bytes)",
+                    )
+            return message
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except HTTPException as e:
+            if e.status_code != PAYLOAD_TOO_LARGE or response_started:
+                raise
+            await self._too_large()(scope, receive, send)
@@ -8,6 +8,11 @@ from app.models.schemas import (
     Params,
     HumanizeRequest,
     HumanizeResponse,
+    HumanizeBatchRequest,
+    HumanizeBatchResult,
+    JobStatus,
+    JobResponse,
+    UploadResponse,
 )
 
 __all__ = [
@@ -19,5 +24,10 @@ __all__ = [
     "Params",
     "HumanizeRequest",
     "HumanizeResponse",
+    "HumanizeBatchRequest",
+    "HumanizeBatchResult",
+    "JobStatus",
+    "JobResponse",
+    "UploadResponse",
 ]
 
@@ -79,6 +79,10 @@ class Params(BaseModel):
         description="Custom style description (required when style is Custom)",
         examples=["Professional and concise"],
     )
+    useCache: bool = Field(
+        True,
+        description="Return a cached result for an identical earlier request when available",
+    )
 
     @field_validator("customStyle")
     @classmethod
@@ -128,6 +132,12 @@ class HumanizeResponse(BaseModel):
     processingTime: int = Field(
         ..., description="Processing time in milliseconds", ge=0, examples=[850]
     )
+    wasTruncated: bool = Field(
+        False, description="Whether the input was truncated before processing"
+    )
+    originalTokens: Optional[int] = Field(
+        None, description="Token count of the input before truncation", ge=0
+    )
 
     model_config = {
         "json_schema_extra": {
@@ -141,3 +151,63 @@ class HumanizeResponse(BaseModel):
         }
     }
 
+
+
+class HumanizeBatchRequest(BaseModel):
+    """Request model for batch humanize endpoint."""
+
+    items: list[HumanizeRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=500,
+        description="Humanize requests to process concurrently",
+    )
+
+
+class HumanizeBatchResult(BaseModel):
+    """One NDJSON line of the batch humanize response."""
+
+    index: int = Field(..., description="Position of the item in the request", ge=0)
+    result: Optional[HumanizeResponse] = Field(None, description="Result if the item succeeded")
+    error: Optional[str] = Field(None, description="Error message if the item failed")
+
+
+class JobStatus(str, Enum):
+    """Background job status enumeration."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class JobResponse(BaseModel):
+    """State of a background job."""
+
+    jobId: str = Field(..., description="Job ID")
+    kind: str = Field(..., description="Job type", examples=["humanize_file"])
+    status: JobStatus = Field(..., description="Current status")
+    progress: float = Field(0.0, description="Estimated progress from 0 to 1", ge=0, le=1)
+    message: Optional[str] = Field(None, description="Current processing stage")
+    result: Optional[HumanizeResponse] = Field(None, description="Result once succeeded")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
+    createdAt: float = Field(..., description="Submission time (Unix seconds)")
+    updatedAt: float = Field(..., description="Last update time (Unix seconds)")
+
+
+class UploadResponse(BaseModel):
+    """Response model for the upload endpoint."""
+
+    fileId: str = Field(..., description="SHA-256 content ID of the stored file")
+    filename: str = Field(..., description="Original filename")
+    text: str = Field(..., description="Extracted text")
+    size: int = Field(..., description="File size in bytes", ge=0)
+    chars: int = Field(..., description="Character count of the extracted text", ge=0)
+    pageCount: Optional[int] = Field(None, description="Pages in the document (PDF only)", ge=0)
+    startPage: Optional[int] = Field(None, description="First extracted page, 1-based", ge=1)
+    endPage: Optional[int] = Field(None, description="Last extracted page, 1-based", ge=0)
+    stopReason: Optional[str] = Field(
+        None,
+        description="Why extraction stopped before the end of the requested range "
+        "('token_budget' when the text already exceeds what can be processed)",
+    )
@@ -1,6 +1,7 @@
 """Services package."""
 from app.services.text_processor import TextProcessorService
 from app.services.document_parser import DocumentParserService
+from app.services.extractors import ExtractorRegistry, FormatExtractor
 
-__all__ = ["TextProcessorService", "DocumentParserService"]
+__all__ = ["TextProcessorService", "DocumentParserService", "ExtractorRegistry", "FormatExtractor"]
 
@@ -1,15 +1,21 @@
 """Document parsing service for various file formats."""
-import io
 from typing import BinaryIO
 
-import PyPDF2
-from docx import Document
-from pptx import Presentation
+from app.services.extractors import Source, extractor_registry
 
 
 class DocumentParserService:
     """Service for parsing documents and extracting text."""
 
+    def _parse(self, file: Source, name: str) -> str:
+        try:
+            return extractor_registry.extract(file, name=name)
+        except ValueError:
+            # Already a user-facing message from the registry
+            raise
+        except Exception as e:
+            raise ValueError(f"Failed to parse {name.upper()}: {str(e)}")
+
     def parse_pdf(self, file: BinaryIO) -> str:
         """
         Parse PDF file and extract text.
@@ -20,14 +26,7 @@ class DocumentParserService:
         Returns:
             Extracted text content
         """
-        try:
-            reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            return text.strip()
-        except Exception as e:
-            raise ValueError(f"Failed to parse PDF: {str(e)}")
+        return self._parse(file, "pdf")
 
     def parse_docx(self, file: BinaryIO) -> str:
         """
@@ -39,12 +38,7 @@ class DocumentParserService:
         Returns:
             Extracted text content
         """
-        try:
-            doc = Document(file)
-            text = "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
-            return text.strip()
-        except Exception as e:
-            raise ValueError(f"Failed to parse DOCX: {str(e)}")
+        return self._parse(file, "docx")
 
     def parse_pptx(self, file: BinaryIO) -> str:
         """
@@ -56,16 +50,7 @@ class DocumentParserService:
         Returns:
             Extracted text content
         """
-        try:
-            prs = Presentation(file)
-            text = ""
-            for slide in prs.slides:
-                for shape in slide.shapes:
-                    if hasattr(shape, "text") and shape.text.strip():
-                        text += shape.text + "\n"
-            return text.strip()
-        except Exception as e:
-            raise ValueError(f"Failed to parse PPTX: {str(e)}")
+        return self._parse(file, "pptx")
 
     def parse_txt(self, file: BinaryIO) -> str:
         """
@@ -77,23 +62,15 @@ class DocumentParserService:
         Returns:
             Extracted text content
         """
-        try:
-            content = file.read()
-            # Try UTF-8 first, fall back to latin-1
-            try:
-                return content.decode("utf-8").strip()
-            except UnicodeDecodeError:
-                return content.decode("latin-1").strip()
-        except Exception as e:
-            raise ValueError(f"Failed to parse TXT: {str(e)}")
+        return self._parse(file, "txt")
 
-    def parse(self, file: BinaryIO, filename: str) -> str:
+    def parse(self, file: Source, filename: str) -> str:
         """
-        Parse document based on file extension.
+        Parse a document, detecting its format from the content.
 
         Args:
-            file: Binary file object
-            filename: Original filename with extension
+            file: Binary file object, in-memory buffer or path
+            filename: Original filename (used in error messages)
 
         Returns:
             Extracted text content
@@ -101,20 +78,4 @@ class DocumentParserService:
         Raises:
             ValueError: If file type is unsupported or parsing fails
         """
-        ext = filename.lower().split(".")[-1]
-
-        parsers = {
-            "pdf": self.parse_pdf,
-            "docx": self.parse_docx,
-            "doc": self.parse_docx,  # Try DOCX parser for DOC
-            "pptx": self.parse_pptx,
-            "ppt": self.parse_pptx,  # Try PPTX parser for PPT
-            "txt": self.parse_txt,
-        }
-
-        parser = parsers.get(ext)
-        if not parser:
-            raise ValueError(f"Unsupported file type: {ext}")
-
-        return parser(file)
-
+        return extractor_registry.extract(file, filename)
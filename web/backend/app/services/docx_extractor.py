@@ -0,0 +1,126 @@
+"""Streaming DOCX text extraction straight from the package XML."""
+import re
+import zipfile
+from typing import BinaryIO, Iterator
+from xml.etree.ElementTree import iterparse
+
+from app.services.ooxml import open_part
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+_P = f"{W_NS}p"
+_T = f"{W_NS}t"
+_TAB = f"{W_NS}tab"
+_BREAKS = {f"{W_NS}br", f"{W_NS}cr"}
+_BODY = f"{W_NS}body"
+
+_HEADER = re.compile(r"^word/header(\d*)\.xml$")
+_FOOTER = re.compile(r"^word/footer(\d*)\.xml$")
+
+
+def _iter_part_paragraphs(stream: BinaryIO) -> Iterator[str]:
+    """
+    Yield paragraph texts from one WordprocessingML part.
+
+    The part is parsed incrementally; each finished top-level block is
+    cleared, so memory stays flat regardless of document size. Paragraphs
+    nested in text boxes are yielded before the paragraph that anchors them.
+    ``mc:Fallback`` content (legacy duplicates of text boxes) is skipped.
+    """
+    buffers: list[list[str]] = []
+    fallback_depth = 0
+    depth = 0
+    container = None  # Element whose children are the top-level blocks
+    container_depth = 0
+
+    for event, elem in iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            depth += 1
+            if depth == 1 or tag == _BODY:
+                container, container_depth = elem, depth
+            if tag == MC_FALLBACK:
+                fallback_depth += 1
+            elif not fallback_depth and tag == _P:
+                buffers.append([])
+            continue
+
+        depth -= 1
+        if tag == MC_FALLBACK:
+            fallback_depth -= 1
+        elif fallback_depth:
+            continue
+        elif tag == _T:
+            if buffers and elem.text:
+                buffers[-1].append(elem.text)
+        elif tag == _TAB:
+            if buffers:
+                buffers[-1].append("\t")
+        elif tag in _BREAKS:
+            if buffers:
+                buffers[-1].append("\n")
+        elif tag == _P:
+            yield "".join(buffers.pop())
+
+        # Drop each finished top-level block (paragraph, table) from the tree
+        if depth == container_depth:
+            container.clear()
+
+
+def _part_order(name: str, pattern: re.Pattern) -> int:
+    return int(pattern.match(name).group(1) or 0)
+
+
+def iter_docx_paragraphs(file: str | BinaryIO, include_headers: bool = True) -> Iterator[str]:
+    """
+    Yield the paragraphs of a DOCX file in document order.
+
+    Table cells and text boxes are included. With ``include_headers``,
+    header paragraphs come first and footer paragraphs last.
+
+    Args:
+        file: Path or binary file object
+        include_headers: Also extract headers and footers
+
+    Raises:
+        ValueError: If the file is not a valid DOCX package or a part is too large
+    """
+    try:
+        package = zipfile.ZipFile(file)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Not a DOCX file: {str(e)}")
+
+    with package:
+        names = package.namelist()
+        if "word/document.xml" not in names:
+            raise ValueError("Not a DOCX file: word/document.xml is missing")
+
+        headers = sorted(
+            (n for n in names if _HEADER.match(n)), key=lambda n: _part_order(n, _HEADER)
+        )
+        footers = sorted(
+            (n for n in names if _FOOTER.match(n)), key=lambda n: _part_order(n, _FOOTER)
+        )
+        parts = headers + ["word/document.xml"] + footers if include_headers else ["word/document.xml"]
+
+        for name in parts:
+            with open_part(package, name) as stream:
+                yield from _iter_part_paragraphs(stream)
+
+
+def read_docx_text(file: str | BinaryIO, skip_empty: bool = False) -> str:
+    """
+    Extract the text of a DOCX file, one paragraph per line.
+
+    Args:
+        file: Path or binary file object
+        skip_empty: Drop paragraphs that contain only whitespace
+
+    Returns:
+        str: Extracted text
+    """
+    paragraphs = iter_docx_paragraphs(file)
+    if skip_empty:
+        paragraphs = (p for p in paragraphs if p.strip())
+    return "\n".join(paragraphs).strip()
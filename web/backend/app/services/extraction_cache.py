@@ -0,0 +1,267 @@
+"""Extraction result cache keyed by file content hash."""
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump when an extractor's output changes so stale cached text is not served
+EXTRACTOR_VERSION = "4"
+
+CACHE_DIR = Path(__file__).parent.parent.parent / "cache" / "extraction"
+
+# Rescan the shared directory after this many writes even if under the cap,
+# since other workers write to it too
+_RESCAN_EVERY_PUTS = 100
+
+
+@dataclass
+class ExtractionResult:
+    """Extracted document text plus page metadata."""
+
+    text: str
+    page_count: int = 0  # Pages in the whole document
+    page_offsets: list[int] = field(default_factory=list)  # Start of each page in ``text``
+    start_page: int = 0  # Index of the first extracted page
+    stop_reason: str | None = None  # Why extraction ended before the last page
+
+    @classmethod
+    def from_pages(
+        cls,
+        pages: list[str],
+        start_page: int = 0,
+        page_count: int | None = None,
+        stop_reason: str | None = None,
+    ) -> "ExtractionResult":
+        """
+        Join page texts with newlines, recording where each page starts.
+
+        Args:
+            pages: Texts of consecutive pages
+            start_page: Index of the first page in ``pages``
+            page_count: Pages in the whole document (defaults to ``len(pages)``)
+            stop_reason: Why extraction stopped early, if it did
+        """
+        offsets = []
+        position = 0
+        for page in pages:
+            offsets.append(position)
+            position += len(page) + 1
+        joined = "\n".join(pages)
+        stripped = joined.lstrip()
+        lead = len(joined) - len(stripped)
+        return cls(
+            text=stripped.rstrip(),
+            page_count=len(pages) if page_count is None else page_count,
+            page_offsets=[max(0, offset - lead) for offset in offsets],
+            start_page=start_page,
+            stop_reason=stop_reason,
+        )
+
+    @property
+    def end_page(self) -> int:
+        """Index one past the last extracted page."""
+        return self.start_page + len(self.page_offsets)
+
+    @property
+    def size(self) -> int:
+        """Approximate memory footprint in bytes."""
+        return len(self.text.encode("utf-8")) + 8 * len(self.page_offsets)
+
+
+class ExtractionCache:
+    """
+    Two-level cache of extraction results.
+
+    Entries live in a per-worker in-memory LRU and in a directory shared by
+    all workers (one JSON file per entry, written atomically). Both levels
+    are bounded in bytes; on disk the least recently used files (by mtime,
+    refreshed on every hit) are evicted first. Memory hits are answered on
+    the event loop; disk reads, writes and eviction scans run in a thread.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        max_memory_bytes: int = 32 * 1024 * 1024,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+        version: str = EXTRACTOR_VERSION,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            root: Directory shared by all workers
+            max_memory_bytes: Size cap of the in-memory LRU
+            max_disk_bytes: Size cap of the cache directory
+            version: Extractor version included in every key
+        """
+        self.root = Path(root)
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.version = version
+
+        self._memory: OrderedDict[str, ExtractionResult] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: int | None = None
+        self._puts_since_scan = 0
+        self._disk_lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def make_key(self, file_id: str, ext: str, variant: str = "") -> str:
+        """
+        Key for a file's extraction with the current extractor version.
+
+        ``variant`` distinguishes partial extractions (page range, token budget).
+        """
+        key = f"{file_id}.{ext.lstrip('.').lower()}.v{self.version}"
+        return f"{key}.{variant}" if variant else key
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def _remember(self, key: str, result: ExtractionResult) -> None:
+        if result.size > self.max_memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= self._memory.pop(key).size
+        self._memory[key] = result
+        self._memory_bytes += result.size
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.size
+
+    def _read_disk(self, key: str) -> ExtractionResult | None:
+        """Load an entry from the shared directory and mark it recently used."""
+        path = self._path(key)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            result = ExtractionResult(**data)
+            path.touch()
+        except (OSError, ValueError, TypeError):
+            return None
+        return result
+
+    def _write_disk(self, key: str, result: ExtractionResult) -> None:
+        """Write an entry atomically, then enforce the size cap if needed."""
+        path = self._path(key)
+        data = json.dumps(asdict(result), ensure_ascii=False).encode("utf-8")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                Path(tmp_path).unlink(missing_ok=True)
+                raise
+        except OSError as e:
+            logger.warning(f"Failed to write extraction cache entry {key}: {e}")
+            return
+
+        with self._disk_lock:
+            self._puts_since_scan += 1
+            if self._disk_bytes is not None:
+                self._disk_bytes += len(data)
+            if (
+                self._disk_bytes is None
+                or self._disk_bytes > self.max_disk_bytes
+                or self._puts_since_scan >= _RESCAN_EVERY_PUTS
+            ):
+                self._enforce_disk_cap()
+
+    async def get(self, file_id: str, ext: str, variant: str = "") -> ExtractionResult | None:
+        """
+        Look up a cached extraction.
+
+        Returns:
+            ExtractionResult | None: The cached result, or None on a miss
+        """
+        key = self.make_key(file_id, ext, variant)
+        result = self._memory.get(key)
+        if result is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return result
+
+        result = await asyncio.to_thread(self._read_disk, key)
+        if result is None:
+            self.misses += 1
+            return None
+
+        self.disk_hits += 1
+        self._remember(key, result)
+        return result
+
+    async def put(self, file_id: str, ext: str, result: ExtractionResult, variant: str = "") -> None:
+        """Store an extraction in memory and in the shared directory."""
+        key = self.make_key(file_id, ext, variant)
+        self._remember(key, result)
+        await asyncio.to_thread(self._write_disk, key, result)
+
+    def _enforce_disk_cap(self) -> None:
+        """Rescan the directory and delete least recently used entries over the cap (holds the disk lock)."""
+        entries = []
+        for path in self.root.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_disk_bytes:
+            # Evict down to 90% so the next few writes don't rescan again
+            target = self.max_disk_bytes * 0.9
+            for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+                if total <= target:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                self.evictions += 1
+            logger.info(f"Extraction cache trimmed to {total} bytes")
+
+        self._disk_bytes = total
+        self._puts_since_scan = 0
+
+    def clear(self) -> None:
+        """Forget the in-memory entries and reset counters (disk is left as is)."""
+        self._memory.clear()
+        self._memory_bytes = 0
+        self.memory_hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """Return cache counters for monitoring."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "memoryEntries": len(self._memory),
+            "memoryBytes": self._memory_bytes,
+            "diskBytes": self._disk_bytes,
+            "memoryHits": self.memory_hits,
+            "diskHits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hitRate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Memory level is per worker; the directory is shared by all workers
+extraction_cache = ExtractionCache(
+    Path(settings.extraction_cache_dir) if settings.extraction_cache_dir else CACHE_DIR,
+    max_memory_bytes=settings.extraction_cache_memory_bytes,
+    max_disk_bytes=settings.extraction_cache_disk_bytes,
+)
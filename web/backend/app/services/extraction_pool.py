@@ -0,0 +1,289 @@
+"""Pre-warmed worker processes for document text extraction."""
+import asyncio
+import logging
+import multiprocessing
+import time
+from collections import deque
+from multiprocessing.connection import Connection
+from typing import Any, AsyncIterator, Callable
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_up() -> None:
+    """Import the extractors (and their parsing libraries) once per worker process."""
+    import app.services.extractors  # noqa: F401
+    import app.services.file_processor  # noqa: F401
+    import app.services.pdf_extractor  # noqa: F401
+    import app.services.pptx_extractor  # noqa: F401
+
+
+def _worker_main(conn: Connection) -> None:
+    """Worker process loop: run ``(func, args)`` jobs and send back the outcome."""
+    _warm_up()
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        func, args = job
+        try:
+            conn.send((True, func(*args)))
+        except Exception as e:
+            # Only ValueError is part of the extraction contract (and always picklable)
+            error = e if isinstance(e, ValueError) else ValueError(f"{type(e).__name__}: {e}")
+            conn.send((False, error))
+
+
+def split_ranges(count: int, per_job: int) -> list[tuple[int, int]]:
+    """Split ``count`` items into consecutive ``[start, stop)`` ranges."""
+    per_job = max(1, per_job)
+    return [(start, min(start + per_job, count)) for start in range(0, count, per_job)]
+
+
+class _Slot:
+    """One single-worker process that can be killed and replaced on its own."""
+
+    def __init__(self, index: int, context: multiprocessing.context.BaseContext):
+        self.index = index
+        self.context = context
+        self.process: multiprocessing.process.BaseProcess | None = None
+        self.conn: Connection | None = None
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def start(self) -> None:
+        parent_conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(
+            target=_worker_main,
+            args=(child_conn,),
+            name=f"extractor-{self.index}",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def kill(self) -> None:
+        if self.process is not None:
+            self.process.kill()
+            self.process.join(timeout=5)
+        if self.conn is not None:
+            self.conn.close()
+        self.process = None
+        self.conn = None
+
+    def stop(self) -> None:
+        if self.conn is not None and self.alive:
+            try:
+                self.conn.send(None)
+                self.process.join(timeout=5)
+            except (OSError, BrokenPipeError):
+                pass
+        self.kill()
+
+
+def _drop_result(task: asyncio.Task) -> None:
+    """Retrieve the outcome of a job nobody is waiting for (avoids unretrieved-exception warnings)."""
+    if not task.cancelled():
+        task.exception()
+
+
+class ExtractionPool:
+    """
+    Run CPU-heavy extraction jobs in dedicated worker processes.
+
+    Each slot is a single long-lived process with the parsing libraries already
+    imported. A job that overruns its timeout gets its process killed and
+    replaced (off the event loop), so a pathological document costs one slot
+    for a bounded time instead of blocking the event loop. With ``workers=0``
+    jobs run in a thread instead (useful for development and tests).
+    """
+
+    def __init__(self, workers: int = 2, timeout: float = 60.0):
+        """
+        Initialize the pool (processes are started by ``start`` or on first use).
+
+        Args:
+            workers: Number of worker processes
+            timeout: Default per-job timeout in seconds
+        """
+        self.workers = workers
+        self.timeout = timeout
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = [_Slot(i, self._context) for i in range(workers)]
+        self._free: asyncio.Queue[_Slot] | None = None
+
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.busy = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.restarts = 0
+        self.total_run_seconds = 0.0
+
+    def start(self) -> None:
+        """Start (pre-warm) every worker process."""
+        for slot in self._slots:
+            if not slot.alive:
+                slot.start()
+        logger.info(f"Extraction pool started with {self.workers} worker processes")
+
+    def shutdown(self) -> None:
+        """Stop all worker processes."""
+        for slot in self._slots:
+            slot.stop()
+
+    def _free_slots(self) -> asyncio.Queue:
+        if self._free is None:
+            self._free = asyncio.Queue()
+            for slot in self._slots:
+                self._free.put_nowait(slot)
+        return self._free
+
+    async def _restart(self, slot: _Slot) -> None:
+        # Killing, joining and spawning block for a while; keep them off the event loop
+        await asyncio.to_thread(slot.kill)
+        await asyncio.to_thread(slot.start)
+        self.restarts += 1
+
+    async def _execute(self, slot: _Slot, func: Callable[..., Any], args: tuple, timeout: float) -> Any:
+        """Run one job on ``slot`` and hand the slot back when the job is over."""
+        self.busy += 1
+        started = time.monotonic()
+        try:
+            if not slot.alive:
+                await asyncio.to_thread(slot.start)
+            slot.conn.send((func, args))
+            ok, value = await asyncio.wait_for(asyncio.to_thread(slot.conn.recv), timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            logger.warning(f"Extraction job exceeded {timeout:.0f}s; killing worker {slot.index}")
+            await self._restart(slot)
+            raise ValueError(f"Document extraction timed out after {timeout:.0f}s")
+        except asyncio.CancelledError:
+            # Only when the event loop shuts down; do not leave a busy worker behind
+            slot.kill()
+            raise
+        except (EOFError, OSError) as e:
+            self.failed += 1
+            logger.error(f"Extraction worker {slot.index} died: {e!r}")
+            await self._restart(slot)
+            raise ValueError("Document extraction failed: worker process crashed")
+        finally:
+            self.busy -= 1
+            self.total_run_seconds += time.monotonic() - started
+            self._free_slots().put_nowait(slot)
+
+        if not ok:
+            self.failed += 1
+            raise value
+        self.completed += 1
+        return value
+
+    async def run(self, func: Callable[..., Any], *args, timeout: float | None = None) -> Any:
+        """
+        Run ``func(*args)`` in a worker process.
+
+        ``func`` and its arguments must be picklable (module-level functions).
+        If the caller is cancelled after the job has started, the worker still
+        finishes it (within the timeout) and its result is dropped, so the slot
+        is reused instead of being killed and respawned.
+
+        Args:
+            func: Job function
+            *args: Job arguments
+            timeout: Seconds before the job is killed (defaults to the pool timeout)
+
+        Returns:
+            The job's return value
+
+        Raises:
+            ValueError: If the job fails or times out
+        """
+        timeout = timeout or self.timeout
+        if self.workers <= 0:
+            return await asyncio.wait_for(asyncio.to_thread(func, *args), timeout)
+
+        free = self._free_slots()
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            slot = await free.get()
+        finally:
+            self.queue_depth -= 1
+
+        job = asyncio.ensure_future(self._execute(slot, func, args, timeout))
+        try:
+            return await asyncio.shield(job)
+        except asyncio.CancelledError:
+            job.add_done_callback(_drop_result)
+            raise
+
+    async def run_ordered(
+        self, func: Callable[..., Any], jobs: list[tuple]
+    ) -> AsyncIterator[Any]:
+        """
+        Run ``func(*args)`` for each argument tuple, yielding results in order.
+
+        Only as many jobs as there are workers are in flight at once, so a
+        consumer that stops early leaves the remaining jobs unstarted. Jobs a
+        worker has already picked up finish in the background and their
+        results are dropped; no worker is killed.
+
+        Raises:
+            ValueError: If a job fails or times out
+        """
+        window = max(1, self.workers)
+        pending = iter(jobs)
+        in_flight: deque[asyncio.Task] = deque()
+
+        def refill() -> None:
+            while len(in_flight) < window:
+                args = next(pending, None)
+                if args is None:
+                    return
+                in_flight.append(asyncio.create_task(self.run(func, *args)))
+
+        try:
+            refill()
+            while in_flight:
+                result = await in_flight[0]
+                in_flight.popleft()
+                refill()
+                yield result
+        finally:
+            # Cancelling ``run`` only abandons the wait: a started job keeps
+            # its worker until it completes, a queued one never starts
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+    def stats(self) -> dict:
+        """Return pool counters for monitoring."""
+        jobs = self.completed + self.failed + self.timed_out
+        return {
+            "workers": self.workers,
+            "busy": self.busy,
+            "queueDepth": self.queue_depth,
+            "maxQueueDepth": self.max_queue_depth,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timedOut": self.timed_out,
+            "restarts": self.restarts,
+            "avgRunMs": int(self.total_run_seconds / jobs * 1000) if jobs else 0,
+        }
+
+
+# One pool per API worker process, started in the application lifespan hook
+extraction_pool = ExtractionPool(
+    workers=settings.extraction_workers,
+    timeout=settings.extraction_timeout,
+)
@@ -0,0 +1,332 @@
+"""Format detection by magic bytes and a registry of text extractors."""
+import io
+import logging
+import os
+import threading
+import time
+import zipfile
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Union
+
+from app.config import settings
+from app.services.docx_extractor import read_docx_text
+from app.services.extraction_cache import ExtractionResult
+from app.services.pdf_extractor import read_pdf_text, read_pdf_within_budget
+from app.services.pptx_extractor import read_pptx_text
+from app.services.tokenizer import Tokenizer
+
+logger = logging.getLogger(__name__)
+
+ZIP_MAGIC = b"PK\x03\x04"
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"  # Legacy .doc / .ppt
+SNIFF_BYTES = 1024
+
+# File path, in-memory buffer or open binary file
+Source = Union[str, Path, bytes, bytearray, memoryview, BinaryIO]
+
+
+class BufferReader(io.RawIOBase):
+    """Seekable read-only file over a buffer that does not copy it."""
+
+    def __init__(self, buffer: bytes | bytearray | memoryview):
+        """Wrap ``buffer`` (the caller must not resize it while the reader is open)."""
+        self._view = memoryview(buffer).cast("B")
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._view)}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def readinto(self, target) -> int:
+        count = max(0, min(len(target), len(self._view) - self._position))
+        target[:count] = self._view[self._position:self._position + count]
+        self._position += count
+        return count
+
+    def close(self) -> None:
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+
+@contextmanager
+def open_source(source: Source) -> Iterator[tuple[BinaryIO, int]]:
+    """
+    Open ``source`` as a seekable binary file and report its size.
+
+    Paths are opened from disk; buffers are read in place. Open files are
+    used as they are (and left open).
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as f:
+            yield f, os.fstat(f.fileno()).st_size
+    elif isinstance(source, bytes):
+        # BytesIO shares an immutable bytes object instead of copying it
+        yield io.BytesIO(source), len(source)
+    elif isinstance(source, (bytearray, memoryview)):
+        # Buffered so parsers that read a byte at a time stay in C
+        with io.BufferedReader(BufferReader(source), buffer_size=64 * 1024) as f:
+            yield f, memoryview(source).nbytes
+    else:
+        start = source.tell()
+        size = source.seek(0, io.SEEK_END) - start
+        source.seek(start)
+        yield source, size
+
+
+def decode_text(data: bytes | bytearray | memoryview) -> str:
+    """
+    Decode a plain text file.
+
+    UTF-8 (with or without a byte order mark) is tried first, then GBK, then
+    Latin-1, which accepts any bytes.
+    """
+    for encoding in ("utf-8-sig", "gbk"):
+        try:
+            return str(data, encoding).strip()
+        except UnicodeDecodeError:
+            continue
+    return str(data, "latin-1").strip()
+
+
+def _read_pptx(file: BinaryIO) -> str:
+    return read_pptx_text(file, include_notes=settings.pptx_include_notes)
+
+
+def _read_txt(file: BinaryIO) -> str:
+    return decode_text(file.read())
+
+
+@dataclass
+class FormatExtractor:
+    """How to recognize one document format and extract its text."""
+
+    name: str
+    extension: str
+    read: Callable[[BinaryIO], str]
+    magic: bytes = b""  # Leading bytes of the format
+    zip_member: str = ""  # Part that identifies a ZIP-based (OOXML) format
+
+
+class ExtractorRegistry:
+    """
+    Document formats keyed by their content rather than the file name.
+
+    ``detect`` sniffs the leading bytes (and, for ZIP packages, the part
+    names) to pick an extractor; the extension only appears in error
+    messages. ``extract`` accepts a path, an open file or an in-memory
+    buffer, and records calls, failures, bytes and time per format.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._extractors: dict[str, FormatExtractor] = {}
+        self._stats: dict[str, dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, extractor: FormatExtractor) -> None:
+        """Add (or replace) a format; formats are tried in registration order."""
+        self._extractors[extractor.name] = extractor
+        self._stats.setdefault(
+            extractor.name, {"calls": 0, "failures": 0, "bytes": 0, "seconds": 0.0}
+        )
+
+    def get(self, name: str) -> FormatExtractor:
+        """
+        Look up a format by name.
+
+        Raises:
+            ValueError: If the format is not registered
+        """
+        try:
+            return self._extractors[name]
+        except KeyError:
+            raise ValueError(f"Unsupported file type: {name}")
+
+    def sniff(self, file: BinaryIO, filename: str = "") -> FormatExtractor:
+        """
+        Detect the format of an open file (its position is restored).
+
+        Raises:
+            ValueError: If the content is not a supported format
+        """
+        start = file.tell()
+        head = file.read(SNIFF_BYTES)
+        file.seek(start)
+
+        for extractor in self._extractors.values():
+            if extractor.magic and head.startswith(extractor.magic):
+                return extractor
+
+        ext = Path(filename).suffix.lower()
+        if head.startswith(ZIP_MAGIC):
+            try:
+                members = set(zipfile.ZipFile(file).namelist())
+            except zipfile.BadZipFile as e:
+                raise ValueError(f"Corrupt ZIP-based document: {str(e)}")
+            finally:
+                file.seek(start)
+            for extractor in self._extractors.values():
+                if extractor.zip_member and extractor.zip_member in members:
+                    return extractor
+            raise ValueError(f"Unsupported file type: {ext or 'ZIP archive'}")
+        if head.startswith(OLE_MAGIC):
+            raise ValueError("Legacy .doc/.ppt files are not supported; save the file as DOCX or PPTX")
+        if b"\x00" not in head and "txt" in self._extractors:
+            # Plain text has no magic; binary formats almost always contain NUL bytes
+            return self._extractors["txt"]
+        raise ValueError(f"Unsupported file type: {ext or 'unknown'}")
+
+    def detect(self, source: Source, filename: str = "") -> FormatExtractor:
+        """
+        Detect the format of a path, buffer or open file.
+
+        Raises:
+            ValueError: If the content is not a supported format
+        """
+        if not filename and isinstance(source, (str, Path)):
+            filename = str(source)
+        with open_source(source) as (file, _):
+            return self.sniff(file, filename)
+
+    @contextmanager
+    def timed(self, name: str, size: int) -> Iterator[None]:
+        """Record one extraction of ``size`` bytes (and whether it failed) for ``name``."""
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                stats = self._stats.setdefault(
+                    name, {"calls": 0, "failures": 0, "bytes": 0, "seconds": 0.0}
+                )
+                stats["calls"] += 1
+                stats["failures"] += failed
+                stats["bytes"] += size
+                stats["seconds"] += elapsed
+
+    def extract(
+        self,
+        source: Source,
+        filename: str = "",
+        name: str | None = None,
+        record_stats: bool = True,
+    ) -> str:
+        """
+        Extract the text of a document.
+
+        Args:
+            source: Path, in-memory buffer or open binary file
+            filename: Original file name (used in error messages)
+            name: Format to use instead of detecting it
+            record_stats: Count this call in ``stats`` (off when the caller times it)
+
+        Returns:
+            str: Extracted text
+
+        Raises:
+            ValueError: If the format is unsupported or the document cannot be read
+        """
+        with open_source(source) as (file, size):
+            extractor = self.get(name) if name else self.sniff(file, filename)
+            with self.timed(extractor.name, size) if record_stats else nullcontext():
+                try:
+                    text = extractor.read(file)
+                except ValueError:
+                    raise
+                except Exception as e:
+                    raise ValueError(f"Failed to extract text from {extractor.name.upper()}: {str(e)}")
+        logger.info(f"Extracted {len(text)} characters from {size} bytes of {extractor.name.upper()}")
+        return text
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-format calls, failures, bytes, seconds and throughput (this process)."""
+        with self._lock:
+            return {
+                name: {
+                    **stats,
+                    "seconds": round(stats["seconds"], 3),
+                    "mbPerSecond": round(stats["bytes"] / stats["seconds"] / 1024 / 1024, 2)
+                    if stats["seconds"]
+                    else 0.0,
+                }
+                for name, stats in self._stats.items()
+            }
+
+
+def extract_file(file_path: str, name: str | None = None) -> str:
+    """
+    Extract the text of a file on disk (runs in a worker process).
+
+    Stats are not recorded here; the caller times the job in its own process.
+
+    Raises:
+        ValueError: If the format is unsupported or the document cannot be read
+    """
+    return extractor_registry.extract(file_path, name=name, record_stats=False)
+
+
+_tokenizer: Tokenizer | None = None
+
+
+def _count_tokens(text: str) -> int:
+    global _tokenizer
+    if _tokenizer is None:
+        _tokenizer = Tokenizer(settings.openai_model)
+    return _tokenizer.count(text)
+
+
+def extract_buffer(
+    buffer: bytes,
+    name: str,
+    start_page: int = 0,
+    end_page: int | None = None,
+    token_budget: int | None = None,
+) -> ExtractionResult:
+    """
+    Extract the text of an in-memory upload (runs in a worker process).
+
+    PDFs are read only up to ``end_page`` or the token budget, like
+    ``PdfExtractor.extract_within_budget``. Stats are not recorded here.
+
+    Raises:
+        ValueError: If the format is unsupported or the document cannot be read
+    """
+    if name != "pdf":
+        return ExtractionResult(text=extractor_registry.extract(buffer, name=name, record_stats=False))
+    with open_source(buffer) as (file, _):
+        return read_pdf_within_budget(
+            file,
+            start_page=start_page,
+            end_page=end_page,
+            token_budget=token_budget,
+            count_tokens=_count_tokens,
+        )
+
+
+extractor_registry = ExtractorRegistry()
+extractor_registry.register(FormatExtractor("pdf", ".pdf", read_pdf_text, magic=b"%PDF-"))
+extractor_registry.register(
+    FormatExtractor("docx", ".docx", read_docx_text, zip_member="word/document.xml")
+)
+extractor_registry.register(
+    FormatExtractor("pptx", ".pptx", _read_pptx, zip_member="ppt/presentation.xml")
+)
+extractor_registry.register(FormatExtractor("txt", ".txt", _read_txt))
@@ -1,13 +1,9 @@
 """File processing service for document upload."""
-import base64
 import os
 from pathlib import Path
-from typing import Tuple
 import logging
 
-from PyPDF2 import PdfReader
-from docx import Document
-from pptx import Presentation
+from app.services.extractors import extractor_registry
 
 logger = logging.getLogger(__name__)
 
@@ -83,15 +79,7 @@ class FileProcessor:
         Returns:
             str: Extracted text
         """
-        try:
-            reader = PdfReader(file_path)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            return text.strip()
-        except Exception as e:
-            logger.error(f"Error extracting text from PDF: {e}")
-            raise ValueError(f"Failed to extract text from PDF: {str(e)}")
+        return extractor_registry.extract(file_path, name="pdf")
 
     @staticmethod
     def extract_text_from_docx(file_path: str) -> str:
@@ -104,13 +92,7 @@ class FileProcessor:
         Returns:
             str: Extracted text
         """
-        try:
-            doc = Document(file_path)
-            text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-            return text.strip()
-        except Exception as e:
-            logger.error(f"Error extracting text from DOCX: {e}")
-            raise ValueError(f"Failed to extract text from DOCX: {str(e)}")
+        return extractor_registry.extract(file_path, name="docx")
 
     @staticmethod
     def extract_text_from_pptx(file_path: str) -> str:
@@ -123,22 +105,12 @@ class FileProcessor:
         Returns:
             str: Extracted text
         """
-        try:
-            prs = Presentation(file_path)
-            text = ""
-            for slide in prs.slides:
-                for shape in slide.shapes:
-                    if hasattr(shape, "text"):
-                        text += shape.text + "\n"
-            return text.strip()
-        except Exception as e:
-            logger.error(f"Error extracting text from PPTX: {e}")
-            raise ValueError(f"Failed to extract text from PPTX: {str(e)}")
+        return extractor_registry.extract(file_path, name="pptx")
 
     @staticmethod
     def extract_text_from_txt(file_path: str) -> str:
         """
-        Extract text from TXT file.
+        Extract text from TXT file (UTF-8, then GBK, then Latin-1).
 
         Args:
             file_path: Path to TXT file
@@ -146,69 +118,43 @@ class FileProcessor:
         Returns:
             str: Extracted text
         """
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                return f.read().strip()
-        except UnicodeDecodeError:
-            # Try with different encoding
-            try:
-                with open(file_path, "r", encoding="gbk") as f:
-                    return f.read().strip()
-            except Exception as e:
-                logger.error(f"Error reading TXT file: {e}")
-                raise ValueError(f"Failed to read TXT file: {str(e)}")
-        except Exception as e:
-            logger.error(f"Error reading TXT file: {e}")
-            raise ValueError(f"Failed to read TXT file: {str(e)}")
+        return extractor_registry.extract(file_path, name="txt")
 
     @staticmethod
-    def process_file(file_path: str) -> Tuple[str, str]:
+    def process_file(file_path: str, ext: str | None = None) -> str:
         """
         Process uploaded file and extract text.
 
+        The format is detected from the file's content; ``ext`` is only used
+        in error messages (stored uploads are named by content hash and have
+        no extension).
+
         Args:
             file_path: Path to the uploaded file
+            ext: Extension of the original filename
 
         Returns:
-            Tuple[str, str]: (extracted_text, base64_encoded_file)
+            str: Extracted text
 
         Raises:
             ValueError: If file processing fails
         """
-        ext = Path(file_path).suffix.lower()
-
-        # Extract text based on file type
-        if ext == ".pdf":
-            text = FileProcessor.extract_text_from_pdf(file_path)
-        elif ext == ".docx":
-            text = FileProcessor.extract_text_from_docx(file_path)
-        elif ext == ".pptx":
-            text = FileProcessor.extract_text_from_pptx(file_path)
-        elif ext == ".txt":
-            text = FileProcessor.extract_text_from_txt(file_path)
-        else:
-            raise ValueError(f"Unsupported file type: {ext}")
+        text = extractor_registry.extract(file_path, f"upload{ext or Path(file_path).suffix}")
 
         # For document mode, we don't enforce length limits
         # The text will be sent directly to OpenAI
-        logger.info(f"Extracted {len(text)} characters from document")
+        logger.info(f"File processed successfully: {len(text)} characters extracted")
 
-        # Convert file to base64
-        with open(file_path, "rb") as f:
-            file_content = f.read()
-            base64_content = base64.b64encode(file_content).decode("utf-8")
-
-        logger.info(
-            f"File processed successfully: {len(text)} characters extracted"
-        )
-
-        return text, base64_content
+        return text
 
     @staticmethod
     def cleanup_old_files(max_age_hours: int = 24) -> None:
         """
         Clean up old uploaded files.
 
+        The upload janitor (``app.services.upload_janitor``) does this in the
+        background; this walks the whole tree and is kept for manual use.
+
         Args:
             max_age_hours: Maximum age of files to keep in hours
         """
@@ -217,8 +163,8 @@ class FileProcessor:
         current_time = time.time()
         max_age_seconds = max_age_hours * 3600
 
-        for file_path in UPLOAD_DIR.iterdir():
-            if file_path.is_file():
+        for file_path in UPLOAD_DIR.rglob("*"):
+            if file_path.is_file() and file_path.name != ".gitkeep":
                 file_age = current_time - file_path.stat().st_mtime
                 if file_age > max_age_seconds:
                     try:
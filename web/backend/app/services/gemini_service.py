@@ -1,164 +1,205 @@
-"""Gemini API service for text humanization."""
-import time
+"""Gemini API provider for text humanization using async HTTP requests."""
+import json
 import logging
-import google.generativeai as genai
-from typing import Dict, Any
+from typing import AsyncIterator
+
+import httpx
+
 from app.config import settings
+from app.services.attachment import FileAttachment, json_request_args
+from app.services.http_client import get_http_client
+from app.services.output_budget import output_budget
+from app.services.providers import CompletionProvider, CompletionRequest, UpstreamStatusError
+from app.services.resilience import gemini_breaker
 
 logger = logging.getLogger(__name__)
 
 
-class GeminiService:
-    """Service for Gemini API integration."""
+class GeminiService(CompletionProvider):
+    """Completion provider backed by the Gemini REST API."""
+
+    name = "gemini"
 
     def __init__(self):
         """Initialize Gemini service with API key."""
-        try:
-            genai.configure(api_key=settings.gemini_api_key)
-            self.model = genai.GenerativeModel(
-                settings.gemini_model,
-                generation_config={
-                    "temperature": 0.7,
-                    "top_p": 0.95,
-                    "top_k": 40,
-                    "max_output_tokens": 8192,
-                }
-            )
-            logger.info(f"Gemini service initialized with model: {settings.gemini_model}")
-        except Exception as e:
-            logger.error(f"Failed to initialize Gemini service: {e}")
-            raise
-
-    def humanize(
-        self,
-        text: str,
-        length: str,
-        similarity: str,
-        style: str,
-        custom_style: str | None = None,
-    ) -> Dict[str, Any]:
-        """
-        Humanize text using Gemini API.
+        self.api_key = settings.gemini_api_key
+        self.model = settings.gemini_model
+        self.api_url = settings.gemini_api_url.rstrip("/")
 
-        Args:
-            text: Input text to humanize
-            length: Length option (Normal/Concise/Expanded)
-            similarity: Similarity level (Low/Moderate/High/Neutral)
-            style: Writing style
-            custom_style: Custom style description if style is Custom
+        if not self.api_key or not self.api_key.strip():
+            raise ValueError(
+                "Missing GEMINI_API_KEY – please set it in web/backend/.env or environment variables."
+            )
+        logger.info(f"Gemini service initialized with model: {self.model}")
+
+    def is_available(self) -> bool:
+        """Whether the Gemini circuit currently accepts calls."""
+        return not gemini_breaker.is_open()
+
+    @staticmethod
+    def _to_parts(content: str | list) -> list[dict]:
+        """Convert OpenAI-style message content into Gemini parts."""
+        if isinstance(content, str):
+            return [{"text": content}]
+
+        parts = []
+        for part in content:
+            if part.get("type") == "text":
+                parts.append({"text": part["text"]})
+            elif part.get("type") == "file":
+                file_data = part["file"]["file_data"]
+                if isinstance(file_data, FileAttachment):
+                    # Streamed into the body as bare base64
+                    parts.append(
+                        {"inlineData": {"mimeType": file_data.mime_type, "data": file_data.inline()}}
+                    )
+                    continue
+                # "data:<mime>;base64,<data>" -> inline data
+                header, _, data = file_data.partition(",")
+                mime_type = header[len("data:"):].split(";")[0] or "application/octet-stream"
+                parts.append({"inlineData": {"mimeType": mime_type, "data": data}})
+        return parts
+
+    def _build_payload(self, request: CompletionRequest) -> dict:
+        """Build a generateContent payload from chat messages."""
+        system = "\n\n".join(
+            m["content"] for m in request.messages if m["role"] == "system"
+        )
+        contents = [
+            {
+                "role": "model" if m["role"] == "assistant" else "user",
+                "parts": self._to_parts(m["content"]),
+            }
+            for m in request.messages
+            if m["role"] != "system"
+        ]
+        payload = {
+            "contents": contents,
+            "generationConfig": {
+                "temperature": request.temperature,
+                "topP": 0.95,
+                "topK": 40,
+                "maxOutputTokens": request.max_tokens,
+            },
+        }
+        if system:
+            payload["systemInstruction"] = {"parts": [{"text": system}]}
+        return payload
 
-        Returns:
-            Dictionary with content, chars, and processingTime
-        """
-        start_time = time.time()
+    def _headers(self) -> dict:
+        return {"Content-Type": "application/json", "x-goog-api-key": self.api_key}
 
-        # Build the prompt based on parameters
-        prompt = self._build_prompt(text, length, similarity, style, custom_style)
+    @staticmethod
+    def _timeout(request: CompletionRequest) -> httpx.Timeout:
+        return httpx.Timeout(
+            request.timeout or settings.gemini_timeout, connect=settings.openai_connect_timeout
+        )
 
-        try:
-            logger.info(f"Calling Gemini API with {len(text)} chars, style: {style}")
-            
-            # Call Gemini API with timeout handling
-            response = self.model.generate_content(
-                prompt,
-                request_options={"timeout": 30}  # 30 seconds timeout
+    @staticmethod
+    def _extract_text(data: dict) -> str:
+        """Concatenate the text parts of the first candidate."""
+        candidates = data.get("candidates") or []
+        if not candidates:
+            return ""
+        parts = candidates[0].get("content", {}).get("parts") or []
+        return "".join(part.get("text", "") for part in parts)
+
+    def _check_truncated(self, data: dict, request: CompletionRequest) -> None:
+        """Count a response that stopped at ``max_tokens``."""
+        candidates = data.get("candidates") or []
+        if candidates and candidates[0].get("finishReason") == "MAX_TOKENS":
+            output_budget.record_truncation(self.name, request.max_tokens)
+
+    @staticmethod
+    def _record_outcome(response: httpx.Response) -> None:
+        """Record a response with the breaker (other client errors say nothing about health)."""
+        if response.status_code >= 500 or response.status_code == 429:
+            gemini_breaker.record_failure()
+        elif not response.is_error:
+            gemini_breaker.record_success()
+
+    @staticmethod
+    def _raise_for_status(response: httpx.Response) -> None:
+        """Raise on error responses."""
+        if response.is_error:
+            try:
+                error_msg = response.json().get("error", {}).get("message", response.text)
+            except Exception:
+                error_msg = response.text
+            raise UpstreamStatusError(
+                f"Gemini API request failed with status {response.status_code}: {error_msg}",
+                response.status_code,
             )
-            
-            logger.info(f"Gemini API responded successfully")
-            
-            # Extract the generated text
-            if response.text:
-                humanized_text = response.text.strip()
-            else:
-                logger.warning("Gemini returned empty response")
-                raise ValueError("Gemini API returned empty response")
-
-            processing_time = int((time.time() - start_time) * 1000)
-            
-            logger.info(f"Processing completed in {processing_time}ms, output: {len(humanized_text)} chars")
-
-            return {
-                "content": humanized_text,
-                "chars": len(humanized_text.encode("utf-8")),
-                "processingTime": processing_time,
-            }
 
-        except Exception as e:
-            processing_time = int((time.time() - start_time) * 1000)
-            logger.error(f"Gemini API error after {processing_time}ms: {str(e)}")
-            raise ValueError(f"Gemini API error: {str(e)}")
-
-    def _build_prompt(
-        self,
-        text: str,
-        length: str,
-        similarity: str,
-        style: str,
-        custom_style: str | None,
-    ) -> str:
+    async def _post(
+        self, url: str, request: CompletionRequest, stream: bool = False
+    ) -> httpx.Response:
+        """Send one request through the shared client and circuit breaker."""
+        gemini_breaker.before_call()
+        client = get_http_client()
+        upstream_request = client.build_request(
+            "POST",
+            url,
+            **json_request_args(self._build_payload(request), self._headers()),
+            timeout=self._timeout(request),
+        )
+        try:
+            response = await client.send(upstream_request, stream=stream)
+            self._record_outcome(response)
+        except httpx.TransportError:
+            gemini_breaker.record_failure()
+            raise
+        finally:
+            # A half-open probe that recorded no outcome frees the slot
+            gemini_breaker.release()
+        if stream and response.is_error:
+            await response.aread()
+        return response
+
+    async def complete(self, request: CompletionRequest) -> str:
         """
-        Build the prompt for Gemini API based on user parameters.
+        Generate a completion with Gemini.
 
-        Args:
-            text: Original text
-            length: Length preference
-            similarity: Similarity preference
-            style: Writing style
-            custom_style: Custom style description
-
-        Returns:
-            Formatted prompt string
+        Raises:
+            ValueError: If Gemini returns an error or an empty response
+            httpx.TransportError: If the request could not be sent
         """
-        # Base instruction
-        base_instruction = (
-            "You are a professional text rewriting expert. Please rewrite the following AI-generated text "
-            "into more natural, human-like content that reads more smoothly and authentically.\n\n"
+        logger.info(f"Calling Gemini API (~{request.prompt_tokens} prompt tokens)")
+        response = await self._post(
+            f"{self.api_url}/models/{self.model}:generateContent", request
         )
+        self._raise_for_status(response)
 
-        # Length instruction
-        length_instructions = {
-            "Normal": "Maintain approximately the same length as the original text.",
-            "Concise": "Simplify content, make the text more concise, remove redundant information, keep core points.",
-            "Expanded": "Expand content, add more details, examples or explanations, make the text richer and more complete.",
-        }
-
-        # Similarity instruction
-        similarity_instructions = {
-            "Low": "Feel free to significantly rewrite, change sentence structure and word choice, but maintain the core meaning.",
-            "Moderate": "Moderately rewrite, keep most of the original structure, optimize expression.",
-            "High": "Slightly rewrite, mainly optimize word choice and tone, try to maintain the original structure.",
-            "Neutral": "Naturally rewrite based on content, balance maintaining original meaning and optimizing expression.",
-        }
+        data = response.json()
+        self._check_truncated(data, request)
+        text = self._extract_text(data).strip()
+        if not text:
+            logger.warning("Gemini returned empty response")
+            raise ValueError("Gemini API returned empty response")
+        return text
 
-        # Style instruction
-        style_instructions = {
-            "Neutral": "Use a neutral, balanced tone suitable for most scenarios.",
-            "Academic": "Use academic, formal language style, avoid colloquial expressions.",
-            "Business": "Use professional, business tone, concise and clear with emphasis on key points.",
-            "Creative": "Use creative, imaginative expressions, add literary appeal.",
-            "Technical": "Use technical, precise language with accurate terminology.",
-            "Friendly": "Use friendly, warm tone like a conversation between friends.",
-            "Informal": "Use relaxed, informal language, more conversational.",
-            "Reference": "Use referential, informative tone that is objective and neutral.",
-            "Custom": f"Use the following custom style: {custom_style}",
-        }
+    async def stream(self, request: CompletionRequest) -> AsyncIterator[str]:
+        """
+        Stream a completion from Gemini as text deltas (server-sent events).
 
-        # Build complete prompt
-        prompt = (
-            f"{base_instruction}"
-            f"**Rewriting Requirements:**\n"
-            f"1. Length: {length_instructions.get(length, length_instructions['Normal'])}\n"
-            f"2. Similarity: {similarity_instructions.get(similarity, similarity_instructions['Neutral'])}\n"
-            f"3. Style: {style_instructions.get(style, style_instructions['Neutral'])}\n\n"
-            f"**Important Rules:**\n"
-            f"- Maintain the core meaning and key information of the original text\n"
-            f"- Make the text more natural, flowing, and readable\n"
-            f"- Avoid mechanical, template-like expressions\n"
-            f"- Ensure correct grammar and clear logic\n"
-            f"- Output only the rewritten text directly, without adding any explanation or prefix\n\n"
-            f"**Original Text:**\n{text}\n\n"
-            f"**Rewritten Text:**"
+        Raises:
+            ValueError: If Gemini returns an error
+            httpx.TransportError: If the request could not be sent
+        """
+        response = await self._post(
+            f"{self.api_url}/models/{self.model}:streamGenerateContent?alt=sse",
+            request,
+            stream=True,
         )
-
-        return prompt
-
+        try:
+            self._raise_for_status(response)
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = json.loads(line[len("data:"):].strip())
+                self._check_truncated(data, request)
+                delta = self._extract_text(data)
+                if delta:
+                    yield delta
+        finally:
+            await response.aclose()
@@ -0,0 +1,182 @@
+"""Request hedging to cut tail latency of upstream calls."""
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Awaitable, Callable, TypeVar
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Rolling window of recent successful call latencies."""
+
+    def __init__(self, window: int = 200):
+        """Initialize an empty window."""
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        """Add a latency sample."""
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, p: float) -> float | None:
+        """Return the ``p``-th percentile (0-100) of the window, or None if empty."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+
+class Hedger:
+    """
+    Send a duplicate request when the first one is unusually slow.
+
+    If the primary attempt has not finished within the recent p95 latency, a
+    second identical attempt is started and whichever finishes first wins; the
+    other is cancelled. Hedges are capped at ``budget`` (e.g. 5%) of requests.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        budget: float = 0.05,
+        min_delay: float = 1.0,
+        max_delay: float = 30.0,
+        min_samples: int = 20,
+        window: int = 200,
+    ):
+        """Initialize the hedger."""
+        self.enabled = enabled
+        self.budget = budget
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.latencies = LatencyTracker(window)
+
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.skipped_budget = 0
+        self.skipped_admission = 0
+
+    def threshold(self) -> float | None:
+        """Seconds to wait before hedging, or None while there is too little data."""
+        if len(self.latencies) < self.min_samples:
+            return None
+        p95 = self.latencies.percentile(95)
+        return min(self.max_delay, max(self.min_delay, p95))
+
+    def _within_budget(self) -> bool:
+        return self.hedges + 1 <= self.budget * self.requests
+
+    async def run(
+        self,
+        attempt: Callable[[], Awaitable[T]],
+        discard: Callable[[T], Awaitable[None]] | None = None,
+        admit: Callable[[], bool] | None = None,
+        is_success: Callable[[T], bool] | None = None,
+    ) -> T:
+        """
+        Run ``attempt``, hedging it with a duplicate if it is slow.
+
+        Args:
+            attempt: Coroutine factory performing the full request
+            discard: Optional cleanup for a losing result that completed anyway
+                (e.g. closing a streamed response)
+            admit: Called before sending a hedge; returning False skips it
+                (e.g. when the rate limiter has no room without waiting)
+            is_success: Whether a result's latency is a valid sample; fast error
+                responses would otherwise pull the threshold down
+
+        Returns:
+            The result of whichever attempt finished first successfully
+        """
+        self.requests += 1
+        started = time.monotonic()
+        threshold = self.threshold() if self.enabled else None
+
+        def record(result: T) -> T:
+            if is_success is None or is_success(result):
+                self.latencies.record(time.monotonic() - started)
+            return result
+
+        primary = asyncio.ensure_future(attempt())
+        if threshold is None:
+            return record(await primary)
+
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=threshold)
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        if done:
+            return record(primary.result())
+
+        if not self._within_budget():
+            self.skipped_budget += 1
+            return record(await primary)
+        if admit is not None and not admit():
+            self.skipped_admission += 1
+            return record(await primary)
+
+        self.hedges += 1
+        logger.info(f"Hedging slow upstream request after {threshold:.2f}s")
+        hedge = asyncio.ensure_future(attempt())
+        pending = {primary, hedge}
+        try:
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in done if task.exception() is None), None)
+                if winner is not None:
+                    break
+                if not pending:
+                    # Both attempts failed; surface the primary's error
+                    return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        for task in done:
+            if task is not winner and task.exception() is None and discard is not None:
+                await discard(task.result())
+
+        if winner is hedge:
+            self.hedge_wins += 1
+        return record(winner.result())
+
+    def stats(self) -> dict:
+        """Return hedging counters for monitoring."""
+        threshold = self.threshold()
+        p50 = self.latencies.percentile(50)
+        p95 = self.latencies.percentile(95)
+        return {
+            "enabled": self.enabled,
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedgeWins": self.hedge_wins,
+            "skippedBudget": self.skipped_budget,
+            "skippedAdmission": self.skipped_admission,
+            "hedgeRate": round(self.hedges / self.requests, 4) if self.requests else 0.0,
+            "thresholdMs": int(threshold * 1000) if threshold is not None else None,
+            "p50Ms": int(p50 * 1000) if p50 is not None else None,
+            "p95Ms": int(p95 * 1000) if p95 is not None else None,
+        }
+
+
+# Shared by every OpenAIService instance in this worker
+openai_hedger = Hedger(
+    enabled=settings.openai_hedging_enabled,
+    budget=settings.openai_hedge_budget,
+    min_delay=settings.openai_hedge_min_delay,
+    max_delay=settings.openai_hedge_max_delay,
+    min_samples=settings.openai_hedge_min_samples,
+)
@@ -0,0 +1,112 @@
+"""Shared upstream HTTP client with connection pooling and keep-alive."""
+import asyncio
+import logging
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# One client per worker process, created in the application lifespan hook
+_client: httpx.AsyncClient | None = None
+
+
+def _http2_available() -> bool:
+    """Check whether the optional HTTP/2 dependency (h2) is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _build_client() -> httpx.AsyncClient:
+    """Create a pooled AsyncClient from application settings."""
+    http2 = settings.openai_http2
+    if http2 and not _http2_available():
+        logger.warning("HTTP/2 requested but 'h2' is not installed, falling back to HTTP/1.1")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=settings.openai_max_connections,
+        max_keepalive_connections=settings.openai_max_keepalive_connections,
+        keepalive_expiry=settings.openai_keepalive_expiry,
+    )
+    return httpx.AsyncClient(
+        timeout=settings.openai_timeout,
+        limits=limits,
+        http2=http2,
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared upstream HTTP client.
+
+    The client is normally created by ``init_http_client`` at startup. If it is
+    requested earlier (e.g. from a script that bypasses the app lifespan), it is
+    created lazily so callers never have to open their own client.
+
+    Returns:
+        httpx.AsyncClient: Shared pooled client
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def warm_up(url: str, connections: int) -> int:
+    """
+    Pre-open connections to the upstream host so first requests skip DNS/TCP/TLS setup.
+
+    Args:
+        url: Any URL on the upstream host
+        connections: Number of connections to open concurrently
+
+    Returns:
+        int: Number of warm-up requests that reached the server
+    """
+    if connections <= 0:
+        return 0
+
+    parts = urlsplit(url)
+    origin = f"{parts.scheme}://{parts.netloc}/"
+    client = get_http_client()
+
+    async def _probe() -> bool:
+        try:
+            # Any response (even 404) means the connection is established and pooled
+            await client.head(origin, timeout=10.0)
+            return True
+        except httpx.HTTPError as e:
+            logger.warning(f"Upstream warm-up request failed: {e}")
+            return False
+
+    results = await asyncio.gather(*[_probe() for _ in range(connections)])
+    opened = sum(results)
+    logger.info(f"Upstream warm-up: {opened}/{connections} connections to {parts.netloc}")
+    return opened
+
+
+async def init_http_client() -> httpx.AsyncClient:
+    """Create the shared client and warm up the upstream connection pool."""
+    client = get_http_client()
+    logger.info(
+        f"Upstream HTTP client ready (http2={settings.openai_http2 and _http2_available()}, "
+        f"max_connections={settings.openai_max_connections}, "
+        f"keepalive_expiry={settings.openai_keepalive_expiry}s)"
+    )
+    await warm_up(settings.openai_api_url, settings.openai_warmup_connections)
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the shared client and release pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info("Upstream HTTP client closed")
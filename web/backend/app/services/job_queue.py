@@ -0,0 +1,454 @@
+"""Persistent background job queue backed by SQLite."""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+JOB_DB_PATH = Path(__file__).parent.parent.parent / "data" / "jobs.db"
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED_STATES = (SUCCEEDED, FAILED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+# Reports progress as (fraction 0-1, short status message)
+ProgressCallback = Callable[[float, str], Awaitable[None]]
+JobHandler = Callable[[dict, ProgressCallback], Awaitable[dict]]
+
+
+@dataclass
+class Job:
+    """A queued or finished job."""
+
+    id: str
+    kind: str
+    status: str
+    payload: dict
+    result: dict | None
+    error: str | None
+    progress: float
+    message: str | None
+    attempts: int
+    created_at: float
+    updated_at: float
+    finished_at: float | None
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job has succeeded or failed."""
+        return self.status in FINISHED_STATES
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        return cls(
+            id=row["id"],
+            kind=row["kind"],
+            status=row["status"],
+            payload=json.loads(row["payload"]),
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            progress=row["progress"],
+            message=row["message"],
+            attempts=row["attempts"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            finished_at=row["finished_at"],
+        )
+
+
+class JobStore:
+    """
+    Job table in a SQLite database shared by every API worker process.
+
+    Claiming is a single ``UPDATE ... RETURNING`` statement, so two workers can
+    never pick up the same job. Methods are blocking; call them through
+    ``asyncio.to_thread`` from async code.
+    """
+
+    def __init__(self, path: Path, stale_seconds: float = 300.0, max_attempts: int = 2):
+        """
+        Initialize the store (the database is created on first use).
+
+        Args:
+            path: SQLite database file
+            stale_seconds: A running job not updated for this long is considered
+                abandoned (its worker died) and is picked up again
+            max_attempts: Attempts before an abandoned job is marked failed
+        """
+        self.path = Path(path)
+        self.stale_seconds = stale_seconds
+        self.max_attempts = max_attempts
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        if not self._initialized:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._initialized = True
+        return conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def submit(self, kind: str, payload: dict) -> Job:
+        """Add a job to the queue."""
+        now = time.time()
+        rows = self._execute(
+            "INSERT INTO jobs (id, kind, status, payload, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) RETURNING *",
+            (uuid.uuid4().hex, kind, QUEUED, json.dumps(payload, ensure_ascii=False), now, now),
+        )
+        return Job.from_row(rows[0])
+
+    def get(self, job_id: str) -> Job | None:
+        """Look up a job by ID."""
+        rows = self._execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return Job.from_row(rows[0]) if rows else None
+
+    def claim(self, worker: str, kinds: list[str]) -> Job | None:
+        """
+        Atomically take the oldest runnable job of the given kinds.
+
+        Runnable means queued, or running but abandoned (not updated for
+        ``stale_seconds``) with attempts left.
+        """
+        if not kinds:
+            return None
+        now = time.time()
+        placeholders = ",".join("?" * len(kinds))
+        rows = self._execute(
+            f"""
+            UPDATE jobs
+            SET status = ?, worker = ?, attempts = attempts + 1, updated_at = ?
+            WHERE id = (
+                SELECT id FROM jobs
+                WHERE kind IN ({placeholders})
+                  AND (status = ? OR (status = ? AND updated_at < ? AND attempts < ?))
+                ORDER BY created_at
+                LIMIT 1
+            )
+            RETURNING *
+            """,
+            (
+                RUNNING, worker, now, *kinds,
+                QUEUED, RUNNING, now - self.stale_seconds, self.max_attempts,
+            ),
+        )
+        return Job.from_row(rows[0]) if rows else None
+
+    def update_progress(self, job_id: str, progress: float, message: str | None = None) -> None:
+        """Record progress of a running job (also serves as its heartbeat)."""
+        self._execute(
+            "UPDATE jobs SET progress = ?, message = COALESCE(?, message), updated_at = ? "
+            "WHERE id = ? AND status = ?",
+            (min(max(progress, 0.0), 1.0), message, time.time(), job_id, RUNNING),
+        )
+
+    def touch(self, job_id: str) -> None:
+        """Refresh the heartbeat of a running job."""
+        self._execute(
+            "UPDATE jobs SET updated_at = ? WHERE id = ? AND status = ?",
+            (time.time(), job_id, RUNNING),
+        )
+
+    def complete(self, job_id: str, worker: str, result: dict) -> bool:
+        """
+        Mark a job as succeeded with its result.
+
+        Only the worker that holds the job can finish it; if the job was
+        reclaimed by another worker in the meantime nothing is written.
+
+        Returns:
+            bool: Whether the job was updated
+        """
+        now = time.time()
+        rows = self._execute(
+            "UPDATE jobs SET status = ?, result = ?, progress = 1, message = NULL, "
+            "updated_at = ?, finished_at = ? WHERE id = ? AND worker = ? AND status = ? RETURNING id",
+            (SUCCEEDED, json.dumps(result, ensure_ascii=False), now, now, job_id, worker, RUNNING),
+        )
+        return bool(rows)
+
+    def fail(self, job_id: str, worker: str, error: str) -> bool:
+        """
+        Mark a job as failed (only by the worker that holds it).
+
+        Returns:
+            bool: Whether the job was updated
+        """
+        now = time.time()
+        rows = self._execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ?, finished_at = ? "
+            "WHERE id = ? AND worker = ? AND status = ? RETURNING id",
+            (FAILED, error, now, now, job_id, worker, RUNNING),
+        )
+        return bool(rows)
+
+    def requeue(self, job_id: str, worker: str) -> None:
+        """Put a running job held by ``worker`` back in the queue (e.g. on shutdown)."""
+        self._execute(
+            "UPDATE jobs SET status = ?, attempts = MAX(attempts - 1, 0), updated_at = ? "
+            "WHERE id = ? AND worker = ? AND status = ?",
+            (QUEUED, time.time(), job_id, worker, RUNNING),
+        )
+
+    def fail_abandoned(self) -> int:
+        """Mark abandoned jobs that have no attempts left as failed."""
+        now = time.time()
+        rows = self._execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ?, finished_at = ? "
+            "WHERE status = ? AND updated_at < ? AND attempts >= ? RETURNING id",
+            (
+                FAILED, "Job was abandoned by its worker", now, now,
+                RUNNING, now - self.stale_seconds, self.max_attempts,
+            ),
+        )
+        return len(rows)
+
+    def purge(self, older_than: float) -> int:
+        """Delete finished jobs that finished more than ``older_than`` seconds ago."""
+        rows = self._execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ? RETURNING id",
+            (*FINISHED_STATES, time.time() - older_than),
+        )
+        return len(rows)
+
+    def counts(self) -> dict[str, int]:
+        """Number of jobs per status."""
+        rows = self._execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")
+        return {row["status"]: row["n"] for row in rows}
+
+
+class JobRunner:
+    """
+    Execute queued jobs in the background of an API worker process.
+
+    Each process runs ``concurrency`` consumer tasks that claim jobs from the
+    shared store, so jobs submitted to one worker may run on another. Handlers
+    are registered per job kind and report progress through a callback, which
+    also keeps the job's heartbeat fresh. A handler that runs longer than
+    ``job_timeout`` is cancelled and its job failed, so a hung job cannot keep
+    its heartbeat alive forever.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        concurrency: int = 2,
+        poll_interval: float = 0.5,
+        retention_seconds: float = 86400.0,
+        job_timeout: float = 0.0,
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            store: Shared job store
+            concurrency: Jobs run at once by this process
+            poll_interval: Seconds between queue polls when idle
+            retention_seconds: Finished jobs are deleted after this long
+            job_timeout: Seconds a job may run before it is failed (0 = no limit)
+        """
+        self.store = store
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self.job_timeout = job_timeout
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+        self._handlers: dict[str, JobHandler] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._running: set[str] = set()
+        self._wakeup: asyncio.Event | None = None
+        self.completed = 0
+        self.failed = 0
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Register the coroutine that executes jobs of ``kind``."""
+        self._handlers[kind] = handler
+
+    async def submit(self, kind: str, payload: dict) -> Job:
+        """
+        Queue a job and wake an idle consumer.
+
+        Raises:
+            ValueError: If no handler is registered for ``kind``
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = await asyncio.to_thread(self.store.submit, kind, payload)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Job | None:
+        """Look up a job by ID."""
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    def start(self) -> None:
+        """Start the consumer tasks (idempotent)."""
+        if self._tasks or self.concurrency <= 0:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._consume()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._housekeeping()))
+        logger.info(f"Job runner {self.worker_id} started with {self.concurrency} consumers")
+
+    async def stop(self) -> None:
+        """Stop consuming; jobs still running are put back in the queue."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for job_id in list(self._running):
+            await asyncio.to_thread(self.store.requeue, job_id, self.worker_id)
+        self._running.clear()
+
+    async def _consume(self) -> None:
+        while True:
+            try:
+                job = await asyncio.to_thread(
+                    self.store.claim, self.worker_id, list(self._handlers)
+                )
+            except sqlite3.Error as e:
+                logger.error(f"Failed to claim job: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self.run_job(job)
+
+    async def run_job(self, job: Job) -> None:
+        """Execute one claimed job and record its outcome."""
+        handler = self._handlers[job.kind]
+        self._running.add(job.id)
+
+        async def report(progress: float, message: str) -> None:
+            try:
+                await asyncio.to_thread(self.store.update_progress, job.id, progress, message)
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to record progress of job {job.id}: {e}")
+
+        async def heartbeat() -> None:
+            while True:
+                await asyncio.sleep(self.store.stale_seconds / 3)
+                try:
+                    await asyncio.to_thread(self.store.touch, job.id)
+                except sqlite3.Error as e:
+                    logger.warning(f"Failed to refresh heartbeat of job {job.id}: {e}")
+
+        logger.info(f"Running job {job.id} ({job.kind}, attempt {job.attempts})")
+        beat = asyncio.create_task(heartbeat())
+        cancelled = False
+        try:
+            result = await asyncio.wait_for(handler(job.payload, report), self.job_timeout or None)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                e = ValueError(f"Job timed out after {self.job_timeout:g}s")
+            logger.error(f"Job {job.id} failed: {e}")
+            self.failed += 1
+            await self._record_outcome(job.id, self.store.fail, str(e))
+        else:
+            self.completed += 1
+            await self._record_outcome(job.id, self.store.complete, result)
+        finally:
+            beat.cancel()
+            # On cancellation (shutdown) the job stays in _running and is requeued by stop()
+            if not cancelled:
+                self._running.discard(job.id)
+
+    async def _record_outcome(self, job_id: str, finish: Callable[..., bool], outcome) -> None:
+        """
+        Store a job's result or error.
+
+        A database error is logged rather than raised, so the consumer keeps
+        running; the job is then picked up again once it goes stale.
+        """
+        try:
+            recorded = await asyncio.to_thread(finish, job_id, self.worker_id, outcome)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to record the outcome of job {job_id}; it will be retried: {e}")
+            return
+        if not recorded:
+            logger.warning(f"Job {job_id} was taken over by another worker; outcome discarded")
+
+    async def _housekeeping(self) -> None:
+        """Periodically fail abandoned jobs and delete old finished ones."""
+        while True:
+            try:
+                await asyncio.to_thread(self.store.fail_abandoned)
+                await asyncio.to_thread(self.store.purge, self.retention_seconds)
+            except sqlite3.Error as e:
+                logger.error(f"Job housekeeping failed: {e}")
+            await asyncio.sleep(max(60.0, self.store.stale_seconds / 2))
+
+    def stats(self) -> dict:
+        """Return runner counters for monitoring."""
+        return {
+            "worker": self.worker_id,
+            "consumers": self.concurrency if self._tasks else 0,
+            "running": len(self._running),
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+# The database is shared by all workers; each worker runs its own consumers
+job_store = JobStore(
+    Path(settings.job_queue_db) if settings.job_queue_db else JOB_DB_PATH,
+    stale_seconds=settings.job_stale_seconds,
+    max_attempts=settings.job_max_attempts,
+)
+job_runner = JobRunner(
+    job_store,
+    concurrency=settings.job_workers,
+    poll_interval=settings.job_poll_interval,
+    retention_seconds=settings.job_retention_seconds,
+    job_timeout=settings.job_timeout_seconds,
+)
@@ -0,0 +1,36 @@
+"""Size-checked access to the parts of OOXML (DOCX/PPTX) packages."""
+import zipfile
+from typing import IO
+
+from app.config import settings
+
+
+def _part_info(package: zipfile.ZipFile, name: str) -> zipfile.ZipInfo:
+    """
+    Look up a part and check its decompressed size against the limit.
+
+    ``zipfile`` never inflates a member past its recorded ``file_size``, so
+    checking the header is enough to stop a decompression bomb.
+
+    Raises:
+        KeyError: If the part does not exist
+        ValueError: If the part is larger than ``ooxml_max_part_bytes``
+    """
+    info = package.getinfo(name)
+    limit = settings.ooxml_max_part_bytes
+    if limit and info.file_size > limit:
+        raise ValueError(
+            f"Document part {name} is too large when decompressed "
+            f"({info.file_size / 1024 / 1024:.0f}MB, limit {limit / 1024 / 1024:.0f}MB)"
+        )
+    return info
+
+
+def open_part(package: zipfile.ZipFile, name: str) -> IO[bytes]:
+    """Open a package part for streaming (see ``_part_info`` for errors)."""
+    return package.open(_part_info(package, name))
+
+
+def read_part(package: zipfile.ZipFile, name: str) -> bytes:
+    """Read a whole package part (see ``_part_info`` for errors)."""
+    return package.read(_part_info(package, name))
@@ -1,143 +1,562 @@
-"""OpenAI service for text humanization using HTTP requests."""
+"""Humanize service and the OpenAI completion provider (HTTP requests)."""
+import asyncio
 import httpx
+import json
 import logging
 import time
 import os
-import tiktoken
+from typing import AsyncIterator, Awaitable, Callable
 from app.config import settings
+from app.services.attachment import FileAttachment, json_request_args
+from app.services.gemini_service import GeminiService
+from app.services.hedging import openai_hedger
+from app.services.http_client import get_http_client
+from app.services.output_budget import output_budget
+from app.services.prompt_templates import PromptTemplates
+from app.services.providers import (
+    CompletionProvider,
+    CompletionRequest,
+    FakeProvider,
+    ProviderRouter,
+)
+from app.services.rate_limiter import parse_duration, rate_limiter
+from app.services.resilience import (
+    RETRYABLE_STATUS_CODES,
+    openai_breaker,
+    openai_retry_policy,
+)
+from app.services.result_cache import ResultCache, result_cache
+from app.services.single_flight import humanize_flights
+from app.services.text_chunker import TextChunk
+from app.services.tokenizer import TokenizedText, Tokenizer
 
 logger = logging.getLogger(__name__)
 
 
-class OpenAIService:
-    """Service for interacting with OpenAI API via HTTP."""
-    
-    # Token limits for different models
-    MAX_CONTEXT_TOKENS = 128000  # gpt-4o and gpt-4o-mini max context
-    MAX_OUTPUT_TOKENS = 4000     # Reserve for output
-    MAX_INPUT_TOKENS = MAX_CONTEXT_TOKENS - MAX_OUTPUT_TOKENS - 1000  # Reserve 1000 for prompt and overhead
+class OpenAIProvider(CompletionProvider):
+    """Completion provider backed by the OpenAI chat completions API."""
+
+    name = "openai"
 
     def __init__(self):
-        """Initialize OpenAI service."""
+        """Initialize OpenAI provider."""
         self.api_key = settings.openai_api_key
         self.model = settings.openai_model
         self.api_url = settings.openai_api_url
-        
+
         # Validate API key early to avoid sending an empty Authorization header
         if not self.api_key or not self.api_key.strip():
             raise ValueError(
                 "Missing OPENAI_API_KEY – please set it in web/backend/.env or environment variables."
             )
-        
-        # Initialize tokenizer for the model
-        try:
-            self.encoding = tiktoken.encoding_for_model(self.model)
-        except KeyError:
-            # Fallback to cl100k_base encoding (used by gpt-4 and gpt-3.5-turbo)
-            logger.warning(f"Model {self.model} not found, using cl100k_base encoding")
-            self.encoding = tiktoken.get_encoding("cl100k_base")
-
-    def _count_tokens(self, text: str) -> int:
-        """Count the number of tokens in a text string."""
-        try:
-            return len(self.encoding.encode(text))
-        except Exception as e:
-            logger.error(f"Error counting tokens: {e}")
-            # Fallback: rough estimate (1 token ≈ 4 characters for English, 1-2 for Chinese)
-            return len(text) // 2
 
-    def _truncate_text(self, text: str, max_tokens: int) -> tuple[str, bool]:
+    def is_available(self) -> bool:
+        """Whether the OpenAI circuit currently accepts calls."""
+        return not openai_breaker.is_open()
+
+    def _build_payload(self, request: CompletionRequest) -> dict:
+        """Build a chat completion payload."""
+        payload = {
+            "model": self.model,
+            "messages": request.messages,
+            "temperature": request.temperature,
+        }
+        if request.has_attachment:
+            payload["max_completion_tokens"] = request.max_tokens
+            payload["response_format"] = {"type": "text"}
+        else:
+            payload["max_tokens"] = request.max_tokens
+        return payload
+
+    def _headers(self) -> dict:
+        return {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}",
+        }
+
+    @staticmethod
+    def _request_cost(request: CompletionRequest) -> int:
+        """Tokens a request counts against the TPM limit (prompt + max completion)."""
+        return request.prompt_tokens + request.max_tokens
+
+    @staticmethod
+    def _is_retryable(response: httpx.Response) -> bool:
+        """Whether an error response is transient (quota exhaustion is not)."""
+        if response.status_code not in RETRYABLE_STATUS_CODES:
+            return False
+        if response.status_code == 429:
+            try:
+                return response.json().get("error", {}).get("code") != "insufficient_quota"
+            except Exception:
+                return True
+        return True
+
+    async def _send_with_retries(
+        self,
+        send: Callable[[], Awaitable[httpx.Response]],
+        cost: int,
+        discard: Callable[[httpx.Response], Awaitable[None]] | None = None,
+    ) -> httpx.Response:
         """
-        Truncate text to fit within token limit.
-        
+        Send an upstream request with rate limiting, retries and a circuit breaker.
+
+        Connection errors, per-attempt timeouts, 5xx and transient 429 responses
+        are retried with jittered exponential backoff (honoring ``Retry-After``).
+        While the circuit is open, calls fail immediately instead of waiting on a
+        dead upstream. Once the limiter admits an attempt, a slow one may be
+        hedged with a duplicate if the limiter has room for it right away;
+        limiter waits and backoff are never hedged or counted as upstream
+        latency, and neither are error responses.
+
+        Args:
+            send: Coroutine factory performing one attempt
+            cost: Tokens the request counts against the TPM limit
+            discard: Cleanup for a hedged response that lost the race
+
         Returns:
-            tuple: (truncated_text, was_truncated)
+            httpx.Response: The final response (possibly an error status)
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            httpx.TransportError: If the last attempt failed at the transport level
         """
-        try:
-            tokens = self.encoding.encode(text)
-            
-            if len(tokens) <= max_tokens:
-                return text, False
-            
-            # Truncate tokens
-            truncated_tokens = tokens[:max_tokens]
-            truncated_text = self.encoding.decode(truncated_tokens)
-            
-            logger.warning(
-                f"Text truncated from {len(tokens)} tokens to {max_tokens} tokens"
+        max_retries = openai_retry_policy.max_retries
+        for attempt in range(max_retries + 1):
+            openai_breaker.before_call()
+            try:
+                await rate_limiter.acquire(cost)
+                try:
+                    response = await openai_hedger.run(
+                        send,
+                        discard=discard,
+                        # A hedge is a second request and must fit the rate limits too
+                        admit=lambda: rate_limiter.try_acquire(cost),
+                        is_success=lambda response: not response.is_error,
+                    )
+                except httpx.TransportError as e:
+                    # Covers connection errors and per-attempt timeouts
+                    openai_breaker.record_failure()
+                    if attempt >= max_retries:
+                        raise
+                    delay = openai_retry_policy.delay(attempt)
+                    logger.warning(
+                        f"Upstream attempt {attempt + 1} failed ({e!r}); retrying in {delay:.2f}s"
+                    )
+                else:
+                    retry_after = parse_duration(response.headers.get("retry-after"))
+                    if response.status_code == 429:
+                        # Rate limiting is not an outage; the scheduler pauses admissions
+                        rate_limiter.on_rate_limited(response.headers)
+                    else:
+                        rate_limiter.update_from_headers(response.headers)
+                        if response.status_code >= 500:
+                            openai_breaker.record_failure()
+                        else:
+                            openai_breaker.record_success()
+
+                    if attempt >= max_retries or not self._is_retryable(response):
+                        return response
+                    # The scheduler already waits out a 429; only back off for 5xx
+                    delay = (
+                        0.0
+                        if response.status_code == 429
+                        else openai_retry_policy.delay(attempt, retry_after)
+                    )
+                    logger.warning(
+                        f"Upstream attempt {attempt + 1} returned {response.status_code}; "
+                        f"retrying in {delay:.2f}s"
+                    )
+                    await response.aclose()
+            finally:
+                # A half-open probe ending in a 429 or a limiter rejection frees the slot
+                openai_breaker.release()
+
+            openai_retry_policy.retries += 1
+            await asyncio.sleep(delay)
+
+        raise AssertionError("unreachable")
+
+    @staticmethod
+    def _attempt_timeout(request: CompletionRequest) -> httpx.Timeout:
+        """Timeout applied to each individual upstream attempt (sized by the output budget)."""
+        return httpx.Timeout(
+            request.timeout or settings.openai_attempt_timeout, connect=settings.openai_connect_timeout
+        )
+
+    async def complete(self, request: CompletionRequest) -> str:
+        """
+        Send a chat completion request and return the generated text.
+
+        Raises:
+            httpx.HTTPError: If the request fails (translated by ``OpenAIService``)
+        """
+        client = get_http_client()
+        # Attached files are streamed into the body; it is re-read on every attempt
+        body = json_request_args(self._build_payload(request), self._headers())
+        response = await self._send_with_retries(
+            lambda: client.post(self.api_url, **body, timeout=self._attempt_timeout(request)),
+            self._request_cost(request),
+        )
+        response.raise_for_status()
+        choice = response.json()["choices"][0]
+        if choice.get("finish_reason") == "length":
+            output_budget.record_truncation(self.name, request.max_tokens)
+        return choice["message"]["content"].strip()
+
+    async def stream(self, request: CompletionRequest) -> AsyncIterator[str]:
+        """
+        Send a streaming chat completion request and yield content deltas.
+
+        Opening the stream is retried (and hedged) like a normal request; once
+        output has started flowing, failures are not retried to avoid duplicated
+        text.
+
+        Raises:
+            httpx.HTTPError: If the request fails
+        """
+        client = get_http_client()
+        body = json_request_args({**self._build_payload(request), "stream": True}, self._headers())
+
+        async def _open() -> httpx.Response:
+            upstream_request = client.build_request(
+                "POST", self.api_url, **body, timeout=self._attempt_timeout(request)
             )
-            
-            return truncated_text, True
-            
-        except Exception as e:
-            logger.error(f"Error truncating text: {e}")
-            # Fallback: character-based truncation
-            char_limit = max_tokens * 2  # Rough estimate
-            if len(text) > char_limit:
-                return text[:char_limit], True
-            return text, False
-
-    def _build_prompt(
+            response = await client.send(upstream_request, stream=True)
+            if response.is_error:
+                # Read the body so the error message is available to the caller
+                await response.aread()
+            return response
+
+        async def _discard(response: httpx.Response) -> None:
+            await response.aclose()
+
+        # Attempts are hedged on time to first byte: the first stream to respond wins
+        response = await self._send_with_retries(_open, self._request_cost(request), _discard)
+        try:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or []
+                if choices:
+                    if choices[0].get("finish_reason") == "length":
+                        output_budget.record_truncation(self.name, request.max_tokens)
+                    delta = choices[0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+        finally:
+            await response.aclose()
+
+
+# Built on first use, like the shared HTTP client
+_router: ProviderRouter | None = None
+
+
+def _build_provider(name: str) -> CompletionProvider:
+    """Create a provider by its configured name."""
+    if name == "openai":
+        return OpenAIProvider()
+    if name == "gemini":
+        return GeminiService()
+    if name == "fake":
+        return FakeProvider()
+    raise ValueError(f"Unknown completion provider: {name}")
+
+
+def get_provider_router() -> ProviderRouter:
+    """
+    Return the shared provider router for this worker.
+
+    Providers are taken from ``humanize_providers`` (comma-separated, in order
+    of preference).
+
+    Raises:
+        ValueError: If a configured provider is unknown or misconfigured
+    """
+    global _router
+    if _router is None:
+        names = [name.strip().lower() for name in settings.humanize_providers.split(",") if name.strip()]
+        _router = ProviderRouter(
+            [_build_provider(name) for name in names],
+            max_error_rate=settings.provider_max_error_rate,
+            min_samples=settings.provider_min_samples,
+            window_seconds=settings.provider_health_window,
+        )
+        logger.info(f"Completion providers: {_router.signature}")
+    return _router
+
+
+class OpenAIService:
+    """Humanize orchestration: tokenizing, chunking, caching and provider routing."""
+    
+    # Token limits for different models
+    MAX_CONTEXT_TOKENS = 128000  # gpt-4o and gpt-4o-mini max context
+    MAX_OUTPUT_TOKENS = settings.openai_max_output_tokens  # Cap; per-call budgets are smaller
+    MAX_INPUT_TOKENS = MAX_CONTEXT_TOKENS - MAX_OUTPUT_TOKENS - 1000  # Reserve 1000 for prompt and overhead
+
+    def __init__(self):
+        """Initialize the service and validate the configured providers."""
+        self.model = settings.openai_model
+        get_provider_router()
+        
+        # Shared tokenizer: one encode per request, large encodes off the event loop
+        self.tokenizer = Tokenizer(self.model)
+        self.encoding = self.tokenizer.encoding
+
+        # Static instruction prefixes for every parameter combination, compiled once
+        self.templates = PromptTemplates(count_tokens=self.tokenizer.count)
+
+    @property
+    def router(self) -> ProviderRouter:
+        """Shared provider router."""
+        return get_provider_router()
+
+    def _build_file_messages(
         self,
         text: str,
         length: str,
         similarity: str,
         style: str,
+        custom_style: str | None,
+        file_data: dict,
+    ) -> list[dict]:
+        """
+        Build chat messages that attach the original file as base64.
+
+        The file is referenced by path and base64-encoded while the request
+        body is sent (see ``app.services.attachment``).
+        """
+        # Get file extension to determine MIME type
+        filename = file_data.get('filename', 'document.pdf')
+        ext = filename.lower().split('.')[-1]
+        mime_types = {
+            'pdf': 'application/pdf',
+            'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+            'pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+            'txt': 'text/plain'
+        }
+        mime_type = mime_types.get(ext, 'application/octet-stream')
+
+        # Static instructions first so the prefix is shared with text requests
+        system_message, user_message = self.templates.build_messages(
+            text or f"(see the attached file {filename})", length, similarity, style, custom_style
+        )
+
+        return [
+            system_message,
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "file",
+                        "file": {
+                            "filename": filename,
+                            "file_data": FileAttachment(file_data["path"], mime_type),
+                        }
+                    }
+                ]
+            },
+            {
+                "role": "assistant",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": f"I understand. This is the extracted content from {filename}:\n\n{text[:500]}..."
+                    }
+                ]
+            },
+            user_message,
+        ]
+
+    def _completion_request(
+        self,
+        messages: list[dict],
+        prompt_tokens: int,
+        text_tokens: int,
+        length: str,
+        has_attachment: bool = False,
+    ) -> CompletionRequest:
+        """
+        Wrap messages in a provider-neutral completion request.
+
+        ``max_tokens`` and the timeout are sized from the input and Length option
+        rather than always allowing the model's full output cap. An attached
+        file's text is not counted here, so those requests get the full cap.
+        """
+        if has_attachment:
+            budget = output_budget.full()
+        else:
+            budget = output_budget.estimate(text_tokens, length)
+            if budget.exceeds_cap:
+                logger.warning(
+                    f"Expected output for ~{budget.input_tokens} input tokens ({length}) exceeds "
+                    f"the {output_budget.max_output_tokens}-token cap; output may be cut short"
+                )
+        return CompletionRequest(
+            messages=messages,
+            max_tokens=budget.max_tokens,
+            prompt_tokens=prompt_tokens,
+            has_attachment=has_attachment,
+            timeout=budget.timeout,
+        )
+
+    @staticmethod
+    def _chunk_tokens(length: str) -> int:
+        """Chunk size for a Length option, small enough that each chunk's output fits the cap."""
+        return max(1, min(settings.humanize_chunk_tokens, output_budget.max_input_tokens(length)))
+
+    async def _rewrite_chunk(
+        self,
+        chunk: TextChunk,
+        total: int,
+        semaphore: asyncio.Semaphore,
+        length: str,
+        similarity: str,
+        style: str,
+        custom_style: str | None = None,
+    ) -> str:
+        """Rewrite a single chunk once a concurrency slot is available."""
+        async with semaphore:
+            messages = self.templates.build_messages(chunk.text, length, similarity, style, custom_style)
+            prompt_tokens = self._prompt_tokens(length, similarity, style, custom_style, chunk.token_count)
+            started = time.time()
+            content = await self.router.complete(
+                self._completion_request(messages, prompt_tokens, chunk.token_count, length)
+            )
+            logger.info(
+                f"Chunk {chunk.index + 1}/{total} rewritten: "
+                f"{chunk.token_count} tokens in {int((time.time() - started) * 1000)}ms"
+            )
+            return content
+
+    async def _humanize_chunks(
+        self,
+        chunks: list[TextChunk],
+        length: str,
+        similarity: str,
+        style: str,
         custom_style: str | None = None,
     ) -> str:
         """
-        Build prompt for text humanization based on parameters.
+        Rewrite chunks concurrently and reassemble them in document order.
 
-        Args:
-            text: Original text to humanize
-            length: Length parameter (Normal, Concise, Expanded)
-            similarity: Similarity parameter (Low, Moderate, High, Neutral)
-            style: Style parameter (Neutral, Academic, Business, etc.)
-            custom_style: Custom style description if style is Custom
+        At most ``humanize_chunk_concurrency`` chunk requests are in flight at once.
+        """
+        semaphore = asyncio.Semaphore(max(1, settings.humanize_chunk_concurrency))
+        results = await asyncio.gather(*[
+            self._rewrite_chunk(chunk, len(chunks), semaphore, length, similarity, style, custom_style)
+            for chunk in chunks
+        ])
+        return "\n\n".join(results)
+
+    async def _prepare_text(self, text: str) -> tuple[TokenizedText, int, bool]:
+        """
+        Tokenize input text once and truncate it to the document token limit.
+
+        The count sizes the output budget and the rate limiter reservation, so
+        it is always exact (short texts are encoded inline, which is cheap); the
+        token array is reused for truncation and chunking.
 
         Returns:
-            str: Formatted prompt for OpenAI
+            tuple: (tokenized_text, original_token_count, was_truncated)
         """
-        # Base instruction
-        prompt = "You are a text rewriting assistant. Rewrite the following text to make it sound more natural and human-like.\n\n"
-
-        # Length instructions
-        length_instructions = {
-            "Normal": "Maintain approximately the same length as the original text.",
-            "Concise": "Make the text more concise and to the point, reducing unnecessary words.",
-            "Expanded": "Expand the text with more details and explanations.",
-        }
-        prompt += f"Length: {length_instructions.get(length, length_instructions['Normal'])}\n"
-
-        # Similarity instructions
-        similarity_instructions = {
-            "Low": "Feel free to significantly rephrase and restructure the content while maintaining the core meaning.",
-            "Moderate": "Moderately rephrase the content, balancing between originality and similarity.",
-            "High": "Stay very close to the original phrasing, making only minor adjustments for naturalness.",
-            "Neutral": "Use balanced similarity to the original text.",
+        doc = await self.tokenizer.tokenize(text)
+        logger.info(f"Input text tokens: {doc.token_count}")
+
+        max_document_tokens = settings.humanize_max_document_tokens
+        if doc.token_count <= max_document_tokens:
+            return doc, doc.token_count, False
+
+        text_tokens = doc.token_count
+        doc = await self.tokenizer.truncate(doc, max_document_tokens)
+        logger.warning(
+            f"Text was truncated to {max_document_tokens} tokens "
+            f"(original: {text_tokens} tokens)"
+        )
+        return doc, text_tokens, True
+
+    def _prompt_tokens(
+        self,
+        length: str,
+        similarity: str,
+        style: str,
+        custom_style: str | None,
+        text_tokens: int,
+    ) -> int:
+        """Estimate prompt size from the precompiled prefix size, without re-encoding the text."""
+        template = self.templates.get(length, similarity, style)
+        custom_tokens = self.tokenizer.count(custom_style) if style == "Custom" and custom_style else 0
+        return template.prefix_tokens + self.templates.frame_tokens + custom_tokens + text_tokens
+
+    def _build_response(
+        self,
+        rewritten_text: str,
+        start_time: float,
+        text_tokens: int,
+        was_truncated: bool,
+    ) -> dict:
+        """Build the response dict, appending a notice if the input was truncated."""
+        response_data = {
+            "content": rewritten_text,
+            "chars": len(rewritten_text),
+            "processingTime": int((time.time() - start_time) * 1000),
         }
-        prompt += f"Similarity: {similarity_instructions.get(similarity, similarity_instructions['Neutral'])}\n"
 
-        # Style instructions
-        if style == "Custom" and custom_style:
-            prompt += f"Style: {custom_style}\n"
-        else:
-            style_instructions = {
-                "Neutral": "Use a neutral, balanced tone.",
-                "Academic": "Use formal academic language with proper terminology.",
-                "Business": "Use professional business communication style.",
-                "Creative": "Use creative and engaging language.",
-                "Technical": "Use technical and precise language.",
-                "Friendly": "Use warm and friendly conversational tone.",
-                "Informal": "Use casual and relaxed language.",
-                "Reference": "Use objective and informative reference style.",
-            }
-            prompt += f"Style: {style_instructions.get(style, style_instructions['Neutral'])}\n"
-
-        # Add the original text
-        prompt += f"\nOriginal text:\n{text}\n\nOutput only the rewritten text without any explanation or additional notes:"
-
-        return prompt
+        if was_truncated:
+            truncation_notice = (
+                "\n\n[Note: The original text was too long and has been truncated. "
+                f"Original: ~{text_tokens:,} tokens, "
+                f"truncated to {settings.humanize_max_document_tokens:,} tokens]"
+            )
+            response_data["content"] = rewritten_text + truncation_notice
+            response_data["wasTruncated"] = True
+            response_data["originalTokens"] = text_tokens
+
+        return response_data
+
+    def _to_value_error(self, e: Exception) -> ValueError:
+        """Translate an upstream failure into a user-facing ValueError."""
+        if isinstance(e, ValueError):
+            return e
+        if isinstance(e, httpx.TimeoutException):
+            logger.error(f"OpenAI API request timeout: {e}")
+            return ValueError("Request timeout - please try again")
+        if isinstance(e, httpx.ConnectError):
+            logger.error(f"OpenAI API connection error (check proxy settings): {e}")
+            return ValueError(f"Connection failed - please check network/proxy settings: {str(e)}")
+        if isinstance(e, httpx.HTTPStatusError):
+            logger.error(f"OpenAI API HTTP error: {e.response.status_code} - {e.response.text}")
+            try:
+                error_detail = e.response.json()
+                error_msg = error_detail.get("error", {}).get("message", str(e))
+            except Exception:
+                error_msg = e.response.text
+            return ValueError(f"OpenAI API request failed with status {e.response.status_code}: {error_msg}")
+        if isinstance(e, httpx.RequestError):
+            logger.error(f"OpenAI API request error: {e}", exc_info=True)
+            return ValueError(f"Request failed: {str(e)}")
+        logger.error(f"Unexpected error in OpenAI service: {e}", exc_info=True)
+        return ValueError(f"Failed to process text: {str(e)}")
+
+    def _request_key(
+        self,
+        text: str,
+        length: str,
+        similarity: str,
+        style: str,
+        custom_style: str | None,
+        file_data: dict | None,
+        use_cache: bool,
+    ) -> str | None:
+        """Return the key identifying equivalent requests, or None if results must not be shared."""
+        if not use_cache or file_data:
+            return None
+        return ResultCache.make_key(
+            text, length, similarity, style, custom_style, self.router.signature, self.templates.version
+        )
 
     async def humanize(
         self,
@@ -147,9 +566,16 @@ class OpenAIService:
         style: str,
         custom_style: str | None = None,
         file_data: dict | None = None,
+        use_cache: bool = True,
     ) -> dict:
         """
-        Humanize text using OpenAI API.
+        Humanize text using the configured completion providers.
+
+        Text longer than the chunk size (``humanize_chunk_tokens``, smaller for
+        Expanded output) is split into sentence-aligned
+        chunks that are rewritten in parallel and joined back in order. Text-based
+        results are cached per normalized input and parameters, and identical
+        requests arriving while one is in flight wait for its result.
 
         Args:
             text: Text to humanize
@@ -157,7 +583,8 @@ class OpenAIService:
             similarity: Similarity parameter
             style: Style parameter
             custom_style: Custom style description
-            file_data: Optional dict with 'filename' and 'base64_content' for file-based requests
+            file_data: Optional dict with 'filename' and 'path' of the file for file-based requests
+            use_cache: Whether to reuse/store a cached result (text requests only)
 
         Returns:
             dict: Response with content, character count, and processing time
@@ -166,135 +593,181 @@ class OpenAIService:
             ValueError: If API request fails
         """
         start_time = time.time()
-        
+
+        request_key = self._request_key(text, length, similarity, style, custom_style, file_data, use_cache)
+        cache_key = request_key if settings.result_cache_enabled else None
+        if cache_key:
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                cached["processingTime"] = int((time.time() - start_time) * 1000)
+                logger.info(f"Result cache hit: {cache_key[:12]}")
+                return cached
+
+        if not request_key or not settings.single_flight_enabled:
+            return await self._humanize_uncached(
+                text, length, similarity, style, custom_style, file_data, cache_key, start_time
+            )
+
+        # Identical requests already in flight share one upstream rewrite
+        shared = await humanize_flights.do(
+            request_key,
+            lambda: self._humanize_uncached(
+                text, length, similarity, style, custom_style, file_data, cache_key, start_time
+            ),
+        )
+        result = dict(shared)
+        result["processingTime"] = int((time.time() - start_time) * 1000)
+        return result
+
+    async def _humanize_uncached(
+        self,
+        text: str,
+        length: str,
+        similarity: str,
+        style: str,
+        custom_style: str | None,
+        file_data: dict | None,
+        cache_key: str | None,
+        start_time: float,
+    ) -> dict:
+        """
+        Rewrite text upstream and store the result in the cache.
+
+        Raises:
+            ValueError: If API request fails
+        """
         try:
-            # Check and truncate text if necessary
-            text_tokens = self._count_tokens(text)
-            logger.info(f"Input text tokens: {text_tokens}")
-            
-            was_truncated = False
-            if text_tokens > self.MAX_INPUT_TOKENS:
-                text, was_truncated = self._truncate_text(text, self.MAX_INPUT_TOKENS)
-                logger.warning(
-                    f"Text was truncated to {self.MAX_INPUT_TOKENS} tokens "
-                    f"(original: {text_tokens} tokens)"
-                )
+            chunk_tokens = self._chunk_tokens(length)
+            doc, text_tokens, was_truncated = await self._prepare_text(text)
+            text = doc.text
             
             # If file_data is provided, use file-based message format
             if file_data:
-                # Build prompt for file mode
-                prompt = self._build_prompt(text, length, similarity, style, custom_style)
-                
-                # Get file extension to determine MIME type
-                filename = file_data.get('filename', 'document.pdf')
-                ext = filename.lower().split('.')[-1]
-                mime_types = {
-                    'pdf': 'application/pdf',
-                    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-                    'pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
-                    'txt': 'text/plain'
-                }
-                mime_type = mime_types.get(ext, 'application/octet-stream')
-                
-                # Prepare file-based payload
-                payload = {
-                    "model": self.model,
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": [
-                                {
-                                    "type": "file",
-                                    "file": {
-                                        "filename": filename,
-                                        "file_data": f"data:{mime_type};base64,{file_data['base64_content']}"
-                                    }
-                                }
-                            ]
-                        },
-                        {
-                            "role": "assistant",
-                            "content": [
-                                {
-                                    "type": "text",
-                                    "text": f"I understand. This is the extracted content from {filename}:\n\n{text[:500]}..."
-                                }
-                            ]
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "temperature": 0.7,
-                    "max_completion_tokens": 4000,
-                    "response_format": {"type": "text"}
-                }
+                messages = self._build_file_messages(
+                    text, length, similarity, style, custom_style, file_data
+                )
+                prompt_tokens = self._prompt_tokens(length, similarity, style, custom_style, doc.token_count)
+                logger.info(f"Total prompt tokens: ~{prompt_tokens} (excluding attached file)")
+                # The attachment cannot be chunked; the request gets the full output cap
+                rewritten_text = await self.router.complete(
+                    self._completion_request(
+                        messages, prompt_tokens, doc.token_count, length, has_attachment=True
+                    )
+                )
+            elif doc.token_count > chunk_tokens:
+                chunks = await self.tokenizer.split(doc, chunk_tokens)
+                logger.info(
+                    f"Splitting {doc.token_count} tokens into {len(chunks)} chunks "
+                    f"(concurrency: {settings.humanize_chunk_concurrency})"
+                )
+                rewritten_text = await self._humanize_chunks(
+                    chunks, length, similarity, style, custom_style
+                )
             else:
                 # Standard text-based request
-                prompt = self._build_prompt(text, length, similarity, style, custom_style)
-                
-                payload = {
-                    "model": self.model,
-                    "messages": [
-                        {"role": "system", "content": "You are a professional text rewriting assistant that makes AI-generated text sound more natural and human-like."},
-                        {"role": "user", "content": prompt},
-                    ],
-                    "temperature": 0.7,
-                    "max_tokens": 4000,
-                }
-
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}",
-            }
-            
-            # Log request details
-            prompt_tokens = self._count_tokens(prompt)
-            logger.info(f"Total prompt tokens: {prompt_tokens}")
-            
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                response = await client.post(self.api_url, json=payload, headers=headers)
-                response.raise_for_status()
-                result = response.json()
-                rewritten_text = result["choices"][0]["message"]["content"].strip()
-                processing_time = int((time.time() - start_time) * 1000)
-                
-                # Add truncation warning to result if text was truncated
-                response_data = {
-                    "content": rewritten_text,
-                    "chars": len(rewritten_text),
-                    "processingTime": processing_time
-                }
-                
-                if was_truncated:
-                    truncation_notice = (
-                        "\n\n[Note: The original text was too long and has been truncated. "
-                        f"Original: ~{text_tokens:,} tokens, truncated to {self.MAX_INPUT_TOKENS:,} tokens]"
+                messages = self.templates.build_messages(text, length, similarity, style, custom_style)
+                prompt_tokens = self._prompt_tokens(length, similarity, style, custom_style, doc.token_count)
+                logger.info(f"Total prompt tokens: ~{prompt_tokens} (template v{self.templates.version})")
+                rewritten_text = await self.router.complete(
+                    self._completion_request(messages, prompt_tokens, doc.token_count, length)
+                )
+
+            response_data = self._build_response(rewritten_text, start_time, text_tokens, was_truncated)
+            if cache_key:
+                result_cache.put(cache_key, response_data)
+            return response_data
+
+        except Exception as e:
+            raise self._to_value_error(e)
+
+    async def humanize_stream(
+        self,
+        text: str,
+        length: str,
+        similarity: str,
+        style: str,
+        custom_style: str | None = None,
+        use_cache: bool = True,
+    ) -> AsyncIterator[dict]:
+        """
+        Humanize text and yield the output as it is generated.
+
+        Yields ``{"event": "delta", "content": ...}`` for each piece of output and a
+        final ``{"event": "done", "result": ...}`` whose result matches ``humanize``.
+        For chunked documents the first chunk is streamed token by token while the
+        remaining chunks are rewritten in the background and emitted in order.
+        A cached result is emitted as a single delta.
+
+        Raises:
+            ValueError: If API request fails
+        """
+        start_time = time.time()
+        pending: list[asyncio.Task] = []
+
+        cache_key = self._request_key(text, length, similarity, style, custom_style, None, use_cache)
+        if not settings.result_cache_enabled:
+            cache_key = None
+        if cache_key:
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                cached["processingTime"] = int((time.time() - start_time) * 1000)
+                yield {"event": "delta", "content": cached["content"]}
+                yield {"event": "done", "result": cached}
+                return
+
+        try:
+            chunk_tokens = self._chunk_tokens(length)
+            doc, text_tokens, was_truncated = await self._prepare_text(text)
+            chunks = await self.tokenizer.split(doc, chunk_tokens)
+
+            # Later chunks start immediately; the first one streams meanwhile
+            semaphore = asyncio.Semaphore(max(1, settings.humanize_chunk_concurrency))
+            pending = [
+                asyncio.create_task(
+                    self._rewrite_chunk(
+                        chunk, len(chunks), semaphore, length, similarity, style, custom_style
                     )
-                    response_data["content"] = rewritten_text + truncation_notice
-                    response_data["wasTruncated"] = True
-                    response_data["originalTokens"] = text_tokens
-                
-                return response_data
-                
-        except httpx.TimeoutException as e:
-            logger.error(f"OpenAI API request timeout: {e}")
-            raise ValueError("Request timeout - please try again")
-        except httpx.ConnectError as e:
-            logger.error(f"OpenAI API connection error (check proxy settings): {e}")
-            raise ValueError(f"Connection failed - please check network/proxy settings: {str(e)}")
-        except httpx.HTTPStatusError as e:
-            logger.error(f"OpenAI API HTTP error: {e.response.status_code} - {e.response.text}")
-            try:
-                error_detail = e.response.json()
-                error_msg = error_detail.get("error", {}).get("message", str(e))
-            except:
-                error_msg = e.response.text
-            raise ValueError(f"OpenAI API request failed with status {e.response.status_code}: {error_msg}")
-        except httpx.RequestError as e:
-            logger.error(f"OpenAI API request error: {e}", exc_info=True)
-            raise ValueError(f"Request failed: {str(e)}")
+                )
+                for chunk in chunks[1:]
+            ]
+
+            parts: list[str] = []
+            if chunks:
+                messages = self.templates.build_messages(
+                    chunks[0].text, length, similarity, style, custom_style
+                )
+                prompt_tokens = self._prompt_tokens(
+                    length, similarity, style, custom_style, chunks[0].token_count
+                )
+                streamed: list[str] = []
+                async with semaphore:
+                    async for delta in self.router.stream(
+                        self._completion_request(
+                            messages,
+                            prompt_tokens,
+                            chunks[0].token_count,
+                            length,
+                        )
+                    ):
+                        streamed.append(delta)
+                        yield {"event": "delta", "content": delta}
+                parts.append("".join(streamed).strip())
+
+            for task in pending:
+                content = await task
+                yield {"event": "delta", "content": "\n\n" + content}
+                parts.append(content)
+
+            rewritten_text = "\n\n".join(parts)
+            result = self._build_response(rewritten_text, start_time, text_tokens, was_truncated)
+            if was_truncated:
+                yield {"event": "delta", "content": result["content"][len(rewritten_text):]}
+            if cache_key:
+                result_cache.put(cache_key, result)
+            yield {"event": "done", "result": result}
+
         except Exception as e:
-            logger.error(f"Unexpected error in OpenAI service: {e}", exc_info=True)
-            raise ValueError(f"Failed to process text: {str(e)}")
+            raise self._to_value_error(e)
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,121 @@
+"""Output token and timeout budgets derived from input size and the Length option."""
+import logging
+import math
+from dataclasses import dataclass
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Expected output tokens per input token for each Length option, with headroom
+LENGTH_OUTPUT_RATIOS = {
+    "Concise": 0.8,
+    "Normal": 1.3,
+    "Expanded": 2.2,
+}
+
+# Fixed allowance for short inputs and the model's formatting
+OUTPUT_SLACK_TOKENS = 64
+
+
+@dataclass(frozen=True)
+class OutputBudget:
+    """Completion limits for one upstream call."""
+
+    max_tokens: int
+    timeout: float
+    input_tokens: int
+    exceeds_cap: bool = False
+
+
+class OutputBudgetEstimator:
+    """
+    Size ``max_tokens`` and the request timeout to the expected output.
+
+    The expected output is the input size times a per-Length ratio plus some
+    slack, capped at the model's output limit. The timeout is a fixed base plus
+    time to generate that many tokens. Inputs whose expected output would exceed
+    the cap are flagged so the caller can chunk them instead, and completions
+    that still stop at ``max_tokens`` are counted so the ratios can be tuned.
+    """
+
+    def __init__(
+        self,
+        max_output_tokens: int = 4000,
+        min_output_tokens: int = 256,
+        base_timeout: float = 15.0,
+        seconds_per_token: float = 0.025,
+        max_timeout: float = 120.0,
+    ):
+        """Initialize the estimator."""
+        self.max_output_tokens = max_output_tokens
+        self.min_output_tokens = min_output_tokens
+        self.base_timeout = base_timeout
+        self.seconds_per_token = seconds_per_token
+        self.max_timeout = max_timeout
+        self.truncations = 0
+
+    @staticmethod
+    def ratio(length: str) -> float:
+        """Expected output/input token ratio for a Length option."""
+        return LENGTH_OUTPUT_RATIOS.get(length, LENGTH_OUTPUT_RATIOS["Normal"])
+
+    def estimate(self, input_tokens: int, length: str) -> OutputBudget:
+        """
+        Estimate the output budget for rewriting ``input_tokens`` tokens.
+
+        Args:
+            input_tokens: Tokens of user text (excluding the prompt template);
+                an upper bound is used as it is, so the budget errs on the large side
+            length: Length option (Concise/Normal/Expanded)
+
+        Returns:
+            OutputBudget: ``max_tokens``, timeout and whether the cap was hit
+        """
+        wanted = math.ceil(input_tokens * self.ratio(length)) + OUTPUT_SLACK_TOKENS
+        max_tokens = min(self.max_output_tokens, max(self.min_output_tokens, wanted))
+        timeout = min(self.max_timeout, self.base_timeout + max_tokens * self.seconds_per_token)
+        return OutputBudget(
+            max_tokens=max_tokens,
+            timeout=timeout,
+            input_tokens=input_tokens,
+            exceeds_cap=wanted > self.max_output_tokens,
+        )
+
+    def full(self) -> OutputBudget:
+        """Budget for an input of unknown size (e.g. an attached file): the cap and the longest timeout."""
+        return OutputBudget(
+            max_tokens=self.max_output_tokens,
+            timeout=self.max_timeout,
+            input_tokens=0,
+        )
+
+    def max_input_tokens(self, length: str) -> int:
+        """Largest input (in tokens) whose expected output still fits the cap."""
+        return max(1, int((self.max_output_tokens - OUTPUT_SLACK_TOKENS) / self.ratio(length)))
+
+    def record_truncation(self, provider: str, max_tokens: int) -> None:
+        """Count a completion that stopped because it reached ``max_tokens``."""
+        self.truncations += 1
+        logger.warning(
+            f"Completion from '{provider}' was cut off at max_tokens={max_tokens}; "
+            f"the output budget was too small"
+        )
+
+    def stats(self) -> dict:
+        """Return the budget settings and truncation count for monitoring."""
+        return {
+            "maxOutputTokens": self.max_output_tokens,
+            "minOutputTokens": self.min_output_tokens,
+            "truncations": self.truncations,
+        }
+
+
+# Shared by every OpenAIService instance in this worker
+output_budget = OutputBudgetEstimator(
+    max_output_tokens=settings.openai_max_output_tokens,
+    min_output_tokens=settings.output_budget_min_tokens,
+    base_timeout=settings.output_budget_base_timeout,
+    seconds_per_token=settings.output_budget_seconds_per_token,
+    max_timeout=settings.openai_timeout,
+)
@@ -0,0 +1,295 @@
+"""Page-parallel PDF text extraction."""
+import asyncio
+import logging
+from typing import AsyncIterator, BinaryIO, Callable, Iterator
+
+from PyPDF2 import PdfReader
+
+from app.config import settings
+from app.services.extraction_cache import ExtractionResult
+from app.services.extraction_pool import ExtractionPool, extraction_pool, split_ranges
+from app.services.tokenizer import Tokenizer
+
+logger = logging.getLogger(__name__)
+
+
+def iter_pdf_pages(reader: PdfReader, start: int = 0, stop: int | None = None) -> Iterator[str]:
+    """
+    Yield the text of each page in ``[start, stop)``, in order.
+
+    Args:
+        reader: Open PDF reader
+        start: First page index
+        stop: Page index to stop before (defaults to the last page)
+    """
+    pages = reader.pages
+    stop = len(pages) if stop is None else min(stop, len(pages))
+    for index in range(start, stop):
+        yield pages[index].extract_text() or ""
+
+
+def read_pdf_text(file: str | BinaryIO) -> str:
+    """
+    Extract the text of a whole PDF in one pass.
+
+    Page texts are collected and joined once, so assembly is linear in the
+    document size.
+
+    Args:
+        file: Path or binary file object
+
+    Returns:
+        str: Page texts separated by newlines
+    """
+    return "\n".join(iter_pdf_pages(PdfReader(file))).strip()
+
+
+def pdf_page_count(file_path: str) -> int:
+    """
+    Count the pages of a PDF (runs in a worker process).
+
+    Raises:
+        ValueError: If the file cannot be read as a PDF
+    """
+    try:
+        return len(PdfReader(file_path).pages)
+    except Exception as e:
+        raise ValueError(f"Failed to extract text from PDF: {str(e)}")
+
+
+def extract_pdf_pages(file_path: str, start: int, stop: int) -> list[str]:
+    """
+    Extract the text of pages ``[start, stop)`` (runs in a worker process).
+
+    Raises:
+        ValueError: If the pages cannot be extracted
+    """
+    try:
+        return list(iter_pdf_pages(PdfReader(file_path), start, stop))
+    except Exception as e:
+        raise ValueError(f"Failed to extract text from PDF: {str(e)}")
+
+
+class _TokenBudget:
+    """
+    Running token count of extracted pages, checked against a budget.
+
+    Pages are only encoded once the cheap upper bound can no longer rule out
+    exceeding the budget; from then on each page is counted exactly.
+    """
+
+    def __init__(self, budget: int, count_tokens: Callable[[str], int]):
+        self.budget = budget
+        self.count_tokens = count_tokens
+        self._pending: list[str] = []
+        self._bound = 0
+        self.tokens: int | None = None  # Exact count once known
+
+    def add(self, text: str) -> bool:
+        """Account for one page; return True once the budget is reached."""
+        if self.tokens is None:
+            self._pending.append(text)
+            self._bound += Tokenizer.upper_bound(text) + 1
+            if self._bound < self.budget:
+                return False
+            self.tokens = sum(self.count_tokens(page) + 1 for page in self._pending)
+            self._pending = []
+        else:
+            self.tokens += self.count_tokens(text) + 1
+        return self.tokens >= self.budget
+
+
+def read_pdf_within_budget(
+    file: str | BinaryIO,
+    start_page: int = 0,
+    end_page: int | None = None,
+    token_budget: int | None = None,
+    count_tokens: Callable[[str], int] | None = None,
+) -> ExtractionResult:
+    """
+    Extract a page range in the calling thread, stopping at the token budget.
+
+    The single-pass counterpart of ``PdfExtractor.extract_within_budget``,
+    used for small PDFs that are parsed straight from the upload buffer.
+
+    Raises:
+        ValueError: If the PDF cannot be read or ``start_page`` is past the end
+    """
+    try:
+        reader = PdfReader(file)
+        page_count = len(reader.pages)
+    except Exception as e:
+        raise ValueError(f"Failed to extract text from PDF: {str(e)}")
+    if start_page >= page_count and page_count:
+        raise ValueError(f"Start page {start_page + 1} is beyond the last page ({page_count})")
+
+    budget = _TokenBudget(token_budget, count_tokens or Tokenizer.upper_bound) if token_budget else None
+    pages: list[str] = []
+    stop_reason = None
+    last_page = page_count if end_page is None else min(end_page, page_count)
+    try:
+        for index, text in enumerate(iter_pdf_pages(reader, start_page, end_page), start_page):
+            pages.append(text)
+            if budget is not None and budget.add(text) and index + 1 < last_page:
+                stop_reason = "token_budget"
+                break
+    except Exception as e:
+        raise ValueError(f"Failed to extract text from PDF: {str(e)}")
+
+    return ExtractionResult.from_pages(
+        pages, start_page=start_page, page_count=page_count, stop_reason=stop_reason
+    )
+
+
+class PdfExtractor:
+    """
+    Extract PDF text by fanning page ranges out across the extraction pool.
+
+    Each range is an independent job; only as many ranges as there are workers
+    are in flight at once, so stopping early (page range or token budget)
+    leaves the rest of the document unparsed. Results come back in page order.
+    """
+
+    def __init__(self, pool: ExtractionPool, pages_per_job: int = 16):
+        """
+        Initialize the extractor.
+
+        Args:
+            pool: Pool that runs the page-range jobs
+            pages_per_job: Pages extracted per job
+        """
+        self.pool = pool
+        self.pages_per_job = pages_per_job
+
+    async def page_count(self, file_path: str) -> int:
+        """
+        Count the pages of a PDF in a worker process.
+
+        Raises:
+            ValueError: If the file cannot be read as a PDF
+        """
+        return await self.pool.run(pdf_page_count, file_path)
+
+    async def stream_pages(
+        self,
+        file_path: str,
+        start_page: int = 0,
+        end_page: int | None = None,
+        page_count: int | None = None,
+    ) -> AsyncIterator[tuple[int, str]]:
+        """
+        Yield ``(page_index, text)`` in page order as ranges complete.
+
+        Ranges still running when the consumer stops finish in the background
+        and are discarded; ranges not yet started are skipped.
+
+        Args:
+            file_path: Path to the PDF
+            start_page: First page index
+            end_page: Page index to stop before (defaults to the last page)
+            page_count: Known page count (saves a job)
+
+        Raises:
+            ValueError: If the PDF cannot be read or a range fails
+        """
+        if page_count is None:
+            page_count = await self.page_count(file_path)
+        end_page = page_count if end_page is None else min(end_page, page_count)
+        ranges = [
+            (start_page + start, start_page + stop)
+            for start, stop in split_ranges(max(0, end_page - start_page), self.pages_per_job)
+        ]
+        logger.info(
+            f"Extracting PDF pages {start_page}-{end_page} of {page_count} in {len(ranges)} jobs"
+        )
+
+        jobs = [(file_path, start, stop) for start, stop in ranges]
+        results = self.pool.run_ordered(extract_pdf_pages, jobs)
+        try:
+            index = start_page
+            async for texts in results:
+                for text in texts:
+                    yield index, text
+                    index += 1
+        finally:
+            await results.aclose()
+
+    async def extract_pages(self, file_path: str) -> list[str]:
+        """
+        Extract the text of every page of a PDF.
+
+        Raises:
+            ValueError: If the PDF cannot be read
+        """
+        return [text async for _, text in self.stream_pages(file_path)]
+
+    async def extract(self, file_path: str) -> str:
+        """
+        Extract the full text of a PDF.
+
+        Returns:
+            str: Page texts separated by newlines
+
+        Raises:
+            ValueError: If the PDF cannot be read
+        """
+        return "\n".join(await self.extract_pages(file_path)).strip()
+
+    async def extract_within_budget(
+        self,
+        file_path: str,
+        start_page: int = 0,
+        end_page: int | None = None,
+        token_budget: int | None = None,
+        count_tokens: Callable[[str], int] | None = None,
+    ) -> ExtractionResult:
+        """
+        Extract a page range, stopping once ``token_budget`` tokens are reached.
+
+        The page that crosses the budget is kept (so downstream truncation has
+        a full budget to work with) and no later pages are parsed.
+
+        Args:
+            file_path: Path to the PDF
+            start_page: First page index
+            end_page: Page index to stop before (defaults to the last page)
+            token_budget: Stop after this many tokens (no limit if None)
+            count_tokens: Exact token counter (the cheap upper bound if None)
+
+        Returns:
+            ExtractionResult: Text of the extracted pages, the document's page
+            count, and ``stop_reason="token_budget"`` if extraction stopped early
+
+        Raises:
+            ValueError: If the PDF cannot be read
+        """
+        page_count = await self.page_count(file_path)
+        if start_page >= page_count and page_count:
+            raise ValueError(f"Start page {start_page + 1} is beyond the last page ({page_count})")
+
+        budget = _TokenBudget(token_budget, count_tokens or Tokenizer.upper_bound) if token_budget else None
+        pages: list[str] = []
+        stop_reason = None
+        last_page = page_count if end_page is None else min(end_page, page_count)
+        stream = self.stream_pages(file_path, start_page, end_page, page_count)
+        try:
+            async for index, text in stream:
+                pages.append(text)
+                if budget is not None and budget.add(text) and index + 1 < last_page:
+                    stop_reason = "token_budget"
+                    logger.info(
+                        f"Token budget of {token_budget} reached at page {index + 1} "
+                        f"of {page_count}; skipping the remaining pages"
+                    )
+                    break
+        finally:
+            # Drop look-ahead ranges now rather than when the generator is collected
+            await stream.aclose()
+
+        return ExtractionResult.from_pages(
+            pages, start_page=start_page, page_count=page_count, stop_reason=stop_reason
+        )
+
+
+# Shares the extraction pool's worker processes
+pdf_extractor = PdfExtractor(extraction_pool, pages_per_job=settings.pdf_pages_per_job)
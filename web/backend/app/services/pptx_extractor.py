@@ -0,0 +1,263 @@
+"""Streaming PPTX text extraction straight from the package XML."""
+import logging
+import posixpath
+import zipfile
+from typing import AsyncIterator, BinaryIO, Iterator
+from xml.etree.ElementTree import fromstring, iterparse
+
+from app.config import settings
+from app.services.extraction_pool import ExtractionPool, extraction_pool, split_ranges
+from app.services.ooxml import open_part, read_part
+
+logger = logging.getLogger(__name__)
+
+A_NS = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+P_NS = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+R_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+_P = f"{A_NS}p"
+_T = f"{A_NS}t"
+_BR = f"{A_NS}br"
+_SP = f"{P_NS}sp"
+_PH = f"{P_NS}ph"
+_NOTES_REL = "/notesSlide"
+
+
+def _rels_path(part: str) -> str:
+    directory, name = posixpath.split(part)
+    return posixpath.join(directory, "_rels", f"{name}.rels")
+
+
+def _read_rels(package: zipfile.ZipFile, part: str) -> dict[str, tuple[str, str]]:
+    """Map relationship IDs of ``part`` to ``(type, absolute target)``."""
+    try:
+        root = fromstring(read_part(package, _rels_path(part)))
+    except KeyError:
+        return {}
+    base = posixpath.dirname(part)
+    return {
+        rel.get("Id"): (
+            rel.get("Type", ""),
+            posixpath.normpath(posixpath.join(base, rel.get("Target", ""))),
+        )
+        for rel in root.iter(f"{REL_NS}Relationship")
+    }
+
+
+def slide_parts(package: zipfile.ZipFile) -> list[str]:
+    """
+    Return slide part names in presentation order.
+
+    Order comes from ``p:sldIdLst`` in ``ppt/presentation.xml`` (file names
+    do not reflect reordering in PowerPoint).
+
+    Raises:
+        ValueError: If the package is not a presentation
+    """
+    try:
+        presentation = fromstring(read_part(package, "ppt/presentation.xml"))
+    except KeyError:
+        raise ValueError("Not a PPTX file: ppt/presentation.xml is missing")
+    rels = _read_rels(package, "ppt/presentation.xml")
+    return [
+        rels[slide_id.get(f"{R_NS}id")][1]
+        for slide_id in presentation.iter(f"{P_NS}sldId")
+        if slide_id.get(f"{R_NS}id") in rels
+    ]
+
+
+def _iter_paragraphs(stream: BinaryIO, placeholder_types: set[str] | None = None) -> Iterator[str]:
+    """
+    Yield non-empty DrawingML paragraph texts of one slide part in order.
+
+    Paragraphs inside group shapes and table cells are included because
+    every ``a:p`` is visited wherever it is nested. With
+    ``placeholder_types`` only shapes that are placeholders of those types
+    are read (used for the body of notes pages).
+    """
+    buffer: list[str] | None = None
+    fallback_depth = 0
+    shape_depth = 0
+    shape_included = placeholder_types is None
+    stack = []
+
+    for event, elem in iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            stack.append(elem)
+            if tag == MC_FALLBACK:
+                fallback_depth += 1
+            elif tag == _SP:
+                shape_depth += 1
+                shape_included = placeholder_types is None
+            elif tag == _P and not fallback_depth:
+                buffer = []
+            continue
+
+        stack.pop()
+        if tag == MC_FALLBACK:
+            fallback_depth -= 1
+        elif fallback_depth:
+            continue
+        elif tag == _PH and placeholder_types is not None:
+            shape_included = elem.get("type", "obj") in placeholder_types
+        elif tag == _T:
+            if buffer is not None and elem.text:
+                buffer.append(elem.text)
+        elif tag == _BR:
+            if buffer is not None:
+                buffer.append("\n")
+        elif tag == _P:
+            text = "".join(buffer or []).strip()
+            buffer = None
+            if text and (placeholder_types is None or (shape_depth and shape_included)):
+                yield text
+        elif tag == _SP:
+            shape_depth -= 1
+            shape_included = placeholder_types is None
+            # Shapes are self-contained; drop them from the tree once read
+            if stack:
+                stack[-1].remove(elem)
+
+
+def _slide_text(package: zipfile.ZipFile, part: str, include_notes: bool) -> str:
+    """Text of one slide, followed by its speaker notes."""
+    with open_part(package, part) as stream:
+        paragraphs = list(_iter_paragraphs(stream))
+
+    if include_notes:
+        rels = _read_rels(package, part).values()
+        for notes_part in (target for kind, target in rels if kind.endswith(_NOTES_REL)):
+            with open_part(package, notes_part) as stream:
+                paragraphs.extend(_iter_paragraphs(stream, placeholder_types={"body"}))
+
+    return "\n".join(paragraphs)
+
+
+def iter_pptx_slides(
+    file: str | BinaryIO,
+    start: int = 0,
+    stop: int | None = None,
+    include_notes: bool = True,
+) -> Iterator[str]:
+    """
+    Yield the text of each slide in ``[start, stop)`` in presentation order.
+
+    Args:
+        file: Path or binary file object
+        start: First slide index
+        stop: Slide index to stop before (defaults to the last slide)
+        include_notes: Append each slide's speaker notes
+
+    Raises:
+        ValueError: If the file is not a valid PPTX package or a part is too large
+    """
+    try:
+        package = zipfile.ZipFile(file)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Not a PPTX file: {str(e)}")
+
+    with package:
+        for part in slide_parts(package)[start:stop]:
+            yield _slide_text(package, part, include_notes)
+
+
+def read_pptx_text(file: str | BinaryIO, include_notes: bool = True) -> str:
+    """
+    Extract the text of a whole PPTX file in one pass.
+
+    Returns:
+        str: Slide texts separated by newlines (empty slides skipped)
+    """
+    return "\n".join(s for s in iter_pptx_slides(file, include_notes=include_notes) if s).strip()
+
+
+def pptx_slide_count(file_path: str) -> int:
+    """
+    Count the slides of a PPTX file (runs in a worker process).
+
+    Raises:
+        ValueError: If the file is not a valid PPTX package
+    """
+    try:
+        with zipfile.ZipFile(file_path) as package:
+            return len(slide_parts(package))
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Failed to extract text from PPTX: {str(e)}")
+
+
+def extract_pptx_slides(file_path: str, start: int, stop: int, include_notes: bool) -> list[str]:
+    """
+    Extract the text of slides ``[start, stop)`` (runs in a worker process).
+
+    Raises:
+        ValueError: If the slides cannot be extracted
+    """
+    try:
+        return list(iter_pptx_slides(file_path, start, stop, include_notes))
+    except Exception as e:
+        raise ValueError(f"Failed to extract text from PPTX: {str(e)}")
+
+
+class PptxExtractor:
+    """Extract PPTX text, spreading ranges of slides across the extraction pool."""
+
+    def __init__(
+        self, pool: ExtractionPool, slides_per_job: int = 20, include_notes: bool = True
+    ):
+        """
+        Initialize the extractor.
+
+        Args:
+            pool: Pool that runs the slide-range jobs
+            slides_per_job: Slides extracted per job
+            include_notes: Append each slide's speaker notes
+        """
+        self.pool = pool
+        self.slides_per_job = slides_per_job
+        self.include_notes = include_notes
+
+    async def stream_slides(self, file_path: str) -> AsyncIterator[str]:
+        """
+        Yield slide texts in presentation order.
+
+        Raises:
+            ValueError: If the file cannot be read
+        """
+        count = await self.pool.run(pptx_slide_count, file_path)
+        jobs = [
+            (file_path, start, stop, self.include_notes)
+            for start, stop in split_ranges(count, self.slides_per_job)
+        ]
+        logger.info(f"Extracting PPTX: {count} slides in {len(jobs)} jobs")
+
+        results = self.pool.run_ordered(extract_pptx_slides, jobs)
+        try:
+            async for slides in results:
+                for text in slides:
+                    yield text
+        finally:
+            await results.aclose()
+
+    async def extract(self, file_path: str) -> str:
+        """
+        Extract the full text of a PPTX file.
+
+        Returns:
+            str: Slide texts separated by newlines (empty slides skipped)
+
+        Raises:
+            ValueError: If the file cannot be read
+        """
+        slides = [text async for text in self.stream_slides(file_path) if text]
+        return "\n".join(slides).strip()
+
+
+# Shares the extraction pool's worker processes
+pptx_extractor = PptxExtractor(
+    extraction_pool,
+    slides_per_job=settings.pptx_slides_per_job,
+    include_notes=settings.pptx_include_notes,
+)
@@ -0,0 +1,146 @@
+"""Versioned prompt templates laid out for upstream prefix caching.
+
+All static instructions for a length/similarity/style combination live in the
+system message, which is identical for every request with those parameters.
+Request-specific content (custom style, user text) goes last, so providers that
+cache and discount repeated prompt prefixes can reuse the whole instruction block.
+"""
+import itertools
+from dataclasses import dataclass
+from typing import Callable
+
+# Bump whenever any instruction text below changes; it is part of result cache keys
+PROMPT_TEMPLATE_VERSION = "2"
+
+BASE_INSTRUCTION = (
+    "You are a professional text rewriting assistant. Rewrite the text provided by "
+    "the user so that it sounds more natural and human-like."
+)
+
+LENGTH_INSTRUCTIONS = {
+    "Normal": "Maintain approximately the same length as the original text.",
+    "Concise": "Make the text more concise and to the point, reducing unnecessary words.",
+    "Expanded": "Expand the text with more details and explanations.",
+}
+
+SIMILARITY_INSTRUCTIONS = {
+    "Low": "Feel free to significantly rephrase and restructure the content while maintaining the core meaning.",
+    "Moderate": "Moderately rephrase the content, balancing between originality and similarity.",
+    "High": "Stay very close to the original phrasing, making only minor adjustments for naturalness.",
+    "Neutral": "Use balanced similarity to the original text.",
+}
+
+STYLE_INSTRUCTIONS = {
+    "Neutral": "Use a neutral, balanced tone.",
+    "Academic": "Use formal academic language with proper terminology.",
+    "Business": "Use professional business communication style.",
+    "Creative": "Use creative and engaging language.",
+    "Technical": "Use technical and precise language.",
+    "Friendly": "Use warm and friendly conversational tone.",
+    "Informal": "Use casual and relaxed language.",
+    "Reference": "Use objective and informative reference style.",
+    "Custom": "Use the custom style described by the user before the original text.",
+}
+
+RULES = (
+    "Rules:\n"
+    "- Keep the core meaning and all key information of the original text.\n"
+    "- Keep the language of the original text.\n"
+    "- Avoid mechanical, template-like phrasing.\n"
+    "- Output only the rewritten text without any explanation or additional notes."
+)
+
+CUSTOM_STYLE_PREFIX = "Custom style: "
+TEXT_PREFIX = "Original text:\n"
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """Precompiled static prompt prefix for one parameter combination."""
+
+    version: str
+    length: str
+    similarity: str
+    style: str
+    system: str
+    prefix_tokens: int = 0
+
+
+def _render_system(length: str, similarity: str, style: str) -> str:
+    """Render the static system message for a parameter combination."""
+    return (
+        f"{BASE_INSTRUCTION}\n\n"
+        f"Length: {LENGTH_INSTRUCTIONS[length]}\n"
+        f"Similarity: {SIMILARITY_INSTRUCTIONS[similarity]}\n"
+        f"Style: {STYLE_INSTRUCTIONS[style]}\n\n"
+        f"{RULES}"
+    )
+
+
+class PromptTemplates:
+    """Lookup table of precompiled templates for every parameter combination."""
+
+    def __init__(self, count_tokens: Callable[[str], int] | None = None):
+        """
+        Precompile all templates.
+
+        Args:
+            count_tokens: Optional token counter used to record each prefix size
+        """
+        self.version = PROMPT_TEMPLATE_VERSION
+        self._templates: dict[tuple[str, str, str], PromptTemplate] = {}
+
+        for length, similarity, style in itertools.product(
+            LENGTH_INSTRUCTIONS, SIMILARITY_INSTRUCTIONS, STYLE_INSTRUCTIONS
+        ):
+            system = _render_system(length, similarity, style)
+            self._templates[(length, similarity, style)] = PromptTemplate(
+                version=self.version,
+                length=length,
+                similarity=similarity,
+                style=style,
+                system=system,
+                prefix_tokens=count_tokens(system) if count_tokens else 0,
+            )
+
+        self.frame_tokens = (
+            count_tokens(CUSTOM_STYLE_PREFIX + "\n\n" + TEXT_PREFIX) if count_tokens else 0
+        )
+
+    def get(self, length: str, similarity: str, style: str) -> PromptTemplate:
+        """Return the template for a combination, falling back to neutral defaults."""
+        key = (
+            length if length in LENGTH_INSTRUCTIONS else "Normal",
+            similarity if similarity in SIMILARITY_INSTRUCTIONS else "Neutral",
+            style if style in STYLE_INSTRUCTIONS else "Neutral",
+        )
+        return self._templates[key]
+
+    @staticmethod
+    def user_content(text: str, style: str, custom_style: str | None = None) -> str:
+        """Build the request-specific user message (custom style first, text last)."""
+        if style == "Custom" and custom_style:
+            return f"{CUSTOM_STYLE_PREFIX}{custom_style}\n\n{TEXT_PREFIX}{text}"
+        return f"{TEXT_PREFIX}{text}"
+
+    def build_messages(
+        self,
+        text: str,
+        length: str,
+        similarity: str,
+        style: str,
+        custom_style: str | None = None,
+    ) -> list[dict]:
+        """
+        Build chat messages with the static prefix first and the user text last.
+
+        Returns:
+            list[dict]: System and user messages
+        """
+        if style == "Custom" and not custom_style:
+            style = "Neutral"
+        template = self.get(length, similarity, style)
+        return [
+            {"role": "system", "content": template.system},
+            {"role": "user", "content": self.user_content(text, style, custom_style)},
+        ]
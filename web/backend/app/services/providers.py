@@ -0,0 +1,314 @@
+"""Completion provider interface and a latency-aware router across providers."""
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable
+
+import httpx
+
+from app.services.hedging import LatencyTracker
+from app.services.prompt_templates import TEXT_PREFIX
+from app.services.rate_limiter import RateLimitWaitExceeded
+from app.services.resilience import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamStatusError(ValueError):
+    """An error response from a provider, with its HTTP status code."""
+
+    def __init__(self, message: str, status_code: int):
+        """Initialize the error."""
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def is_outage(error: Exception) -> bool:
+    """
+    Whether an error means the provider is down rather than the request is bad.
+
+    Transport failures, open circuits, 5xx and 429 responses are outages, and
+    so is a local rate limiter rejection (the provider is known to be
+    saturated); other 4xx responses and validation errors would fail on any
+    provider.
+    """
+    outages = (
+        CircuitOpenError,
+        RateLimitWaitExceeded,
+        httpx.TransportError,
+        ConnectionError,
+        TimeoutError,
+    )
+    if isinstance(error, outages):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+    elif isinstance(error, UpstreamStatusError):
+        status_code = error.status_code
+    else:
+        return False
+    return status_code >= 500 or status_code == 429
+
+
+@dataclass
+class CompletionRequest:
+    """Provider-neutral chat completion request (OpenAI-style messages)."""
+
+    messages: list[dict]
+    max_tokens: int
+    prompt_tokens: int = 0
+    temperature: float = 0.7
+    has_attachment: bool = False
+    timeout: float | None = None  # Per-attempt read timeout; provider default if None
+
+
+class CompletionProvider:
+    """
+    Base class for upstream completion backends.
+
+    Subclasses implement ``complete`` and ``stream``; both raise on failure so the
+    router can fail over to the next provider.
+    """
+
+    name: str = "provider"
+    model: str = ""
+
+    def is_available(self) -> bool:
+        """Whether the provider currently accepts calls (e.g. its circuit is not open)."""
+        return True
+
+    async def complete(self, request: CompletionRequest) -> str:
+        """Return the full completion text."""
+        raise NotImplementedError
+
+    async def stream(self, request: CompletionRequest) -> AsyncIterator[str]:
+        """Yield completion text deltas."""
+        raise NotImplementedError
+        yield  # pragma: no cover
+
+
+class FakeProvider(CompletionProvider):
+    """
+    Offline provider for local development and routing tests.
+
+    By default it echoes the user text back; ``reply`` can compute any response.
+    """
+
+    def __init__(
+        self,
+        name: str = "fake",
+        latency: float = 0.0,
+        fail: bool = False,
+        reply: Callable[[CompletionRequest], str] | None = None,
+    ):
+        """Initialize the fake provider."""
+        self.name = name
+        self.model = name
+        self.latency = latency
+        self.fail = fail
+        self.reply = reply
+        self.calls = 0
+
+    def _reply(self, request: CompletionRequest) -> str:
+        if self.reply is not None:
+            return self.reply(request)
+        content = request.messages[-1]["content"]
+        if isinstance(content, str) and TEXT_PREFIX in content:
+            content = content.split(TEXT_PREFIX, 1)[1]
+        return str(content).strip()
+
+    async def complete(self, request: CompletionRequest) -> str:
+        """Return the canned reply after the configured latency."""
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.fail:
+            raise ConnectionError(f"Provider '{self.name}' is unavailable")
+        return self._reply(request)
+
+    async def stream(self, request: CompletionRequest) -> AsyncIterator[str]:
+        """Yield the canned reply word by word."""
+        text = await self.complete(request)
+        for index, word in enumerate(text.split(" ")):
+            yield word if index == 0 else " " + word
+
+
+class ProviderHealth:
+    """Rolling latency and error rate for one provider."""
+
+    def __init__(self, window_seconds: float = 60.0, max_samples: int = 200):
+        """Initialize empty health state."""
+        self.window_seconds = window_seconds
+        self.latencies = LatencyTracker(max_samples)
+        self._outcomes: deque[tuple[float, bool]] = deque(maxlen=max_samples)
+        self.successes = 0
+        self.failures = 0
+
+    def record_success(self, seconds: float) -> None:
+        """Record a successful call and its latency."""
+        self.successes += 1
+        self.latencies.record(seconds)
+        self._outcomes.append((time.monotonic(), True))
+
+    def record_failure(self) -> None:
+        """Record a failed call."""
+        self.failures += 1
+        self._outcomes.append((time.monotonic(), False))
+
+    def error_rate(self) -> tuple[float, int]:
+        """Return (error rate, sample count) over the recent window."""
+        cutoff = time.monotonic() - self.window_seconds
+        recent = [ok for at, ok in self._outcomes if at >= cutoff]
+        if not recent:
+            return 0.0, 0
+        return recent.count(False) / len(recent), len(recent)
+
+
+class ProviderRouter:
+    """
+    Route completions to the fastest healthy provider and fail over on outages.
+
+    Providers with latency samples are ranked by median latency of recent
+    successful calls; a provider without samples keeps its configured position,
+    so a backup is only measured once traffic fails over to it. A provider is
+    unhealthy while its circuit is open or its recent error rate exceeds
+    ``max_error_rate``; unhealthy providers are only tried after all healthy
+    ones have failed. Only outages (see ``is_outage``) count as failures and
+    trigger fail-over; a request the upstream rejects is raised as it is.
+    """
+
+    def __init__(
+        self,
+        providers: list[CompletionProvider],
+        max_error_rate: float = 0.5,
+        min_samples: int = 5,
+        window_seconds: float = 60.0,
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            providers: Providers in order of preference (used to break ties)
+            max_error_rate: Error rate above which a provider is deprioritized
+            min_samples: Outcomes needed before the error rate is trusted
+            window_seconds: Age of outcomes considered for the error rate
+        """
+        if not providers:
+            raise ValueError("At least one completion provider must be configured")
+        self.providers = providers
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.health = {p.name: ProviderHealth(window_seconds) for p in providers}
+        self.failovers = 0
+
+    @property
+    def signature(self) -> str:
+        """Identifies the configured provider set (part of result cache keys)."""
+        return ",".join(f"{p.name}:{p.model}" for p in self.providers)
+
+    def is_healthy(self, provider: CompletionProvider) -> bool:
+        """Whether a provider should receive traffic ahead of unhealthy ones."""
+        if not provider.is_available():
+            return False
+        error_rate, samples = self.health[provider.name].error_rate()
+        return samples < self.min_samples or error_rate <= self.max_error_rate
+
+    def ranked(self) -> list[CompletionProvider]:
+        """Return providers in the order they should be tried."""
+        order = list(self.providers)
+        # Sampled providers swap places by latency; unsampled ones stay where configured
+        sampled = [
+            position
+            for position, provider in enumerate(order)
+            if self.health[provider.name].latencies.percentile(50) is not None
+        ]
+        by_latency = sorted(
+            (order[position] for position in sampled),
+            key=lambda provider: self.health[provider.name].latencies.percentile(50),
+        )
+        for position, provider in zip(sampled, by_latency):
+            order[position] = provider
+        return sorted(order, key=lambda provider: not self.is_healthy(provider))
+
+    async def complete(self, request: CompletionRequest) -> str:
+        """
+        Run a completion on the best provider, failing over on outages.
+
+        Raises:
+            Exception: The last provider's error if every provider failed, or
+                the first error that is not an outage
+        """
+        last_error: Exception | None = None
+        for attempt, provider in enumerate(self.ranked()):
+            if attempt:
+                self.failovers += 1
+                logger.warning(f"Failing over to provider '{provider.name}' after: {last_error!r}")
+            health = self.health[provider.name]
+            started = time.monotonic()
+            try:
+                content = await provider.complete(request)
+            except Exception as e:
+                if not is_outage(e):
+                    raise
+                health.record_failure()
+                last_error = e
+                continue
+            health.record_success(time.monotonic() - started)
+            return content
+        raise last_error
+
+    async def stream(self, request: CompletionRequest) -> AsyncIterator[str]:
+        """
+        Stream a completion from the best provider.
+
+        Fails over on outages only before the first delta; once output has been
+        emitted, errors are raised to avoid mixing output from two providers.
+        """
+        last_error: Exception | None = None
+        for attempt, provider in enumerate(self.ranked()):
+            if attempt:
+                self.failovers += 1
+                logger.warning(f"Failing over to provider '{provider.name}' after: {last_error!r}")
+            health = self.health[provider.name]
+            started = time.monotonic()
+            emitted = False
+            try:
+                async for delta in provider.stream(request):
+                    if not emitted:
+                        # Latency to first output is what a streaming client waits for
+                        health.record_success(time.monotonic() - started)
+                        emitted = True
+                    yield delta
+            except Exception as e:
+                if emitted or not is_outage(e):
+                    raise
+                health.record_failure()
+                last_error = e
+                continue
+            if not emitted:
+                health.record_success(time.monotonic() - started)
+            return
+        raise last_error
+
+    def stats(self) -> dict:
+        """Return per-provider routing state for monitoring."""
+        providers = {}
+        for provider in self.providers:
+            health = self.health[provider.name]
+            error_rate, samples = health.error_rate()
+            p50 = health.latencies.percentile(50)
+            providers[provider.name] = {
+                "model": provider.model,
+                "healthy": self.is_healthy(provider),
+                "successes": health.successes,
+                "failures": health.failures,
+                "errorRate": round(error_rate, 4),
+                "recentSamples": samples,
+                "p50Ms": int(p50 * 1000) if p50 is not None else None,
+            }
+        return {
+            "order": [p.name for p in self.ranked()],
+            "failovers": self.failovers,
+            "providers": providers,
+        }
@@ -0,0 +1,268 @@
+"""Upstream rate-limit scheduler driven by OpenAI rate-limit headers."""
+import asyncio
+import logging
+import re
+import time
+from typing import Mapping
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+class RateLimitWaitExceeded(ValueError):
+    """Raised when a request would have to wait longer than ``max_wait`` for admission."""
+
+
+def parse_duration(value: str | None) -> float | None:
+    """
+    Parse an OpenAI reset duration such as ``"1s"``, ``"6m0s"`` or ``"20ms"``.
+
+    Plain numbers (as used by ``Retry-After``) are treated as seconds.
+
+    Returns:
+        float | None: Seconds, or None if the value cannot be parsed
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def _parse_int(value: str | None) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously over a one-minute window.
+
+    A capacity of 0 means the limit is unknown, and the bucket never blocks.
+    """
+
+    def __init__(self, capacity: int):
+        """Initialize a full bucket."""
+        self.capacity = capacity
+        self.level = float(capacity)
+        self.refill_per_second = capacity / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self.updated)
+        self.level = min(float(self.capacity), self.level + elapsed * self.refill_per_second)
+        self.updated = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` can be consumed (0 if available now)."""
+        if self.capacity <= 0:
+            return 0.0
+        self._refill(now)
+        # Requests larger than the whole bucket only wait for a full bucket
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        if self.refill_per_second <= 0:
+            return float("inf")
+        return (amount - self.level) / self.refill_per_second
+
+    def consume(self, amount: float, now: float) -> None:
+        """Take ``amount`` from the bucket (may go negative for oversized requests)."""
+        if self.capacity <= 0:
+            return
+        self._refill(now)
+        self.level -= amount
+
+    def sync(self, limit: int | None, remaining: int | None, reset: float | None, now: float) -> None:
+        """Align the bucket with the authoritative state reported by the server."""
+        if limit:
+            if self.capacity <= 0:
+                self.level = float(limit)
+            self.capacity = limit
+            self.refill_per_second = limit / 60.0
+        if remaining is None or self.capacity <= 0:
+            return
+
+        self._refill(now)
+        self.level = min(self.level, float(remaining))
+        if reset and remaining < self.capacity:
+            # The server reports how long until the bucket is full again
+            self.refill_per_second = max(self.refill_per_second, (self.capacity - remaining) / reset)
+
+
+class RateLimitScheduler:
+    """
+    Queue upstream requests so they stay within requests- and tokens-per-minute limits.
+
+    Limits start from settings (0 = unknown) and are continuously corrected from
+    ``x-ratelimit-*`` response headers. Callers are admitted in FIFO order; a
+    request that would have to wait longer than ``max_wait`` is rejected instead
+    of piling up. Limits are tracked per worker process.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_wait: float = 30.0,
+    ):
+        """Initialize the scheduler."""
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_wait = max_wait
+
+        self._lock = asyncio.Lock()
+        self._blocked_until = 0.0
+
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.admitted = 0
+        self.delayed = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait_seen = 0.0
+
+    async def acquire(self, tokens: int) -> float:
+        """
+        Wait until a request of ``tokens`` tokens may be sent.
+
+        Args:
+            tokens: Estimated prompt plus maximum completion tokens
+
+        Returns:
+            float: Seconds spent waiting
+
+        Raises:
+            RateLimitWaitExceeded: If the required wait exceeds ``max_wait``
+        """
+        started = time.monotonic()
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    wait = max(
+                        self._blocked_until - now,
+                        self.requests.time_until(1, now),
+                        self.tokens.time_until(tokens, now),
+                    )
+                    if wait <= 0:
+                        self.requests.consume(1, now)
+                        self.tokens.consume(tokens, now)
+                        break
+                    if now - started + wait > self.max_wait:
+                        self.rejected += 1
+                        raise RateLimitWaitExceeded(
+                            "Upstream rate limit reached - please try again shortly"
+                        )
+                    await asyncio.sleep(wait)
+        finally:
+            self.queue_depth -= 1
+
+        waited = time.monotonic() - started
+        self.admitted += 1
+        if waited > 0.001:
+            self.delayed += 1
+            self.total_wait += waited
+            self.max_wait_seen = max(self.max_wait_seen, waited)
+        return waited
+
+    def try_acquire(self, tokens: int) -> bool:
+        """
+        Admit a request only if it can be sent right now, without waiting.
+
+        Used for optional extra requests (hedges): it never queues and never
+        jumps ahead of callers already waiting in ``acquire``.
+
+        Returns:
+            bool: Whether the request was admitted (and counted against the limits)
+        """
+        if self._lock.locked() or self.queue_depth:
+            return False
+        now = time.monotonic()
+        if (
+            self._blocked_until > now
+            or self.requests.time_until(1, now) > 0
+            or self.tokens.time_until(tokens, now) > 0
+        ):
+            return False
+        self.requests.consume(1, now)
+        self.tokens.consume(tokens, now)
+        self.admitted += 1
+        return True
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Correct bucket state from ``x-ratelimit-*`` response headers."""
+        now = time.monotonic()
+        self.requests.sync(
+            _parse_int(headers.get("x-ratelimit-limit-requests")),
+            _parse_int(headers.get("x-ratelimit-remaining-requests")),
+            parse_duration(headers.get("x-ratelimit-reset-requests")),
+            now,
+        )
+        self.tokens.sync(
+            _parse_int(headers.get("x-ratelimit-limit-tokens")),
+            _parse_int(headers.get("x-ratelimit-remaining-tokens")),
+            parse_duration(headers.get("x-ratelimit-reset-tokens")),
+            now,
+        )
+
+    def on_rate_limited(self, headers: Mapping[str, str]) -> float:
+        """
+        Record a 429 response and pause all admissions until the limit resets.
+
+        Returns:
+            float: Seconds admissions are paused for
+        """
+        self.throttled += 1
+        self.update_from_headers(headers)
+        pause = (
+            parse_duration(headers.get("retry-after"))
+            or max(
+                parse_duration(headers.get("x-ratelimit-reset-requests")) or 0.0,
+                parse_duration(headers.get("x-ratelimit-reset-tokens")) or 0.0,
+            )
+            or 1.0
+        )
+        self._blocked_until = max(self._blocked_until, time.monotonic() + pause)
+        logger.warning(f"Upstream rate limited (429); pausing admissions for {pause:.2f}s")
+        return pause
+
+    def stats(self) -> dict:
+        """Return scheduler counters for monitoring."""
+        return {
+            "queueDepth": self.queue_depth,
+            "maxQueueDepth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "delayed": self.delayed,
+            "rejected": self.rejected,
+            "throttled429": self.throttled,
+            "totalWaitSeconds": round(self.total_wait, 3),
+            "avgWaitSeconds": round(self.total_wait / self.delayed, 3) if self.delayed else 0.0,
+            "maxWaitSeconds": round(self.max_wait_seen, 3),
+            "requestsPerMinute": self.requests.capacity,
+            "tokensPerMinute": self.tokens.capacity,
+        }
+
+
+# Shared by every OpenAIService instance in this worker
+rate_limiter = RateLimitScheduler(
+    requests_per_minute=settings.openai_rpm_limit,
+    tokens_per_minute=settings.openai_tpm_limit,
+    max_wait=settings.openai_rate_limit_max_wait,
+)
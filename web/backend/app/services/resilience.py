@@ -0,0 +1,163 @@
+"""Retry and circuit-breaker primitives for upstream API calls."""
+import logging
+import random
+import time
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Upstream statuses worth retrying (429 is handled together with the rate limiter)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(ValueError):
+    """Raised instead of calling the upstream while the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Fail fast after consecutive upstream failures.
+
+    * closed: calls pass through; ``failure_threshold`` consecutive failures open it
+    * open: calls fail immediately until ``reset_timeout`` has elapsed
+    * half-open: a single probe call is let through; success closes the circuit,
+      failure opens it again. Callers ``release()`` after every attempt so a
+      probe that ends without an outcome (a 429, a rate limiter rejection, a
+      cancellation) frees the slot for the next call.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """Initialize a closed circuit."""
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+
+        self.times_opened = 0
+        self.rejected = 0
+
+    def is_open(self) -> bool:
+        """Whether calls are currently rejected (without changing state)."""
+        return self.state == self.OPEN and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def before_call(self) -> None:
+        """
+        Check whether a call may proceed.
+
+        Raises:
+            CircuitOpenError: If the circuit is open (or a half-open probe is running)
+        """
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+                logger.info(f"Circuit '{self.name}' half-open, probing upstream")
+            else:
+                self.rejected += 1
+                raise CircuitOpenError(
+                    "Upstream service is temporarily unavailable - please try again shortly"
+                )
+
+        if self.state == self.HALF_OPEN:
+            # A probe that never reported back (e.g. cancelled) is replaced after a while
+            now = time.monotonic()
+            if self._probe_in_flight and now - self._probe_started < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(
+                    "Upstream service is temporarily unavailable - please try again shortly"
+                )
+            self._probe_in_flight = True
+            self._probe_started = now
+
+    def release(self) -> None:
+        """End a call; a half-open probe that recorded no outcome lets the next call probe."""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        """Record a successful call and close the circuit."""
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit '{self.name}' closed")
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the circuit if the threshold is reached."""
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+                logger.warning(
+                    f"Circuit '{self.name}' opened after {self.consecutive_failures} "
+                    f"consecutive failures"
+                )
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        """Return breaker state for monitoring."""
+        return {
+            "state": self.state,
+            "consecutiveFailures": self.consecutive_failures,
+            "timesOpened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+class RetryPolicy:
+    """Jittered exponential backoff that honors server-provided retry delays."""
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 0.5, max_delay: float = 8.0):
+        """Initialize the policy."""
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """
+        Seconds to wait before retry number ``attempt`` (0-based).
+
+        Uses "full jitter" (uniform between 0 and the exponential cap) so that
+        clients retrying after a shared failure do not stampede together. A
+        ``Retry-After`` value from the server is used as a lower bound.
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = random.uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    def stats(self) -> dict:
+        """Return retry counters for monitoring."""
+        return {"maxRetries": self.max_retries, "retries": self.retries}
+
+
+# Shared by every OpenAIService instance in this worker
+openai_breaker = CircuitBreaker(
+    "openai",
+    failure_threshold=settings.openai_breaker_failure_threshold,
+    reset_timeout=settings.openai_breaker_reset_timeout,
+)
+# Gemini uses the same thresholds; the provider router handles its failover
+gemini_breaker = CircuitBreaker(
+    "gemini",
+    failure_threshold=settings.openai_breaker_failure_threshold,
+    reset_timeout=settings.openai_breaker_reset_timeout,
+)
+openai_retry_policy = RetryPolicy(
+    max_retries=settings.openai_max_retries,
+    base_delay=settings.openai_retry_base_delay,
+    max_delay=settings.openai_retry_max_delay,
+)
@@ -0,0 +1,181 @@
+"""In-memory LRU + TTL cache for humanize results."""
+import hashlib
+import json
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Rough per-variant bookkeeping overhead added to the content size
+_ENTRY_OVERHEAD_BYTES = 256
+_HORIZONTAL_WHITESPACE = re.compile(r"[ \t\u00a0\u3000]+")
+
+
+@dataclass
+class _CacheEntry:
+    """Cached variants for one key."""
+
+    variants: list[dict] = field(default_factory=list)
+    size: int = 0
+    expires_at: float = 0.0
+    next_variant: int = 0
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for cache keying.
+
+    Unicode is NFC-normalized, line endings are unified, runs of spaces/tabs are
+    collapsed and leading/trailing whitespace is removed. Line and paragraph
+    structure is preserved since it affects the rewrite.
+    """
+    text = unicodedata.normalize("NFC", text)
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    lines = [_HORIZONTAL_WHITESPACE.sub(" ", line).strip() for line in text.split("\n")]
+    return "\n".join(lines).strip()
+
+
+class ResultCache:
+    """
+    LRU cache with TTL expiry, a byte-size cap and optional result variants.
+
+    With ``max_variants > 1`` a key keeps missing until that many distinct results
+    have been stored (so retries still get fresh rewrites), after which lookups
+    rotate among the stored variants.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 3600.0,
+        max_variants: int = 1,
+    ):
+        """Initialize an empty cache."""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_variants = max(1, max_variants)
+
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(
+        text: str,
+        length: str,
+        similarity: str,
+        style: str,
+        custom_style: str | None,
+        model: str,
+        template_version: str = "",
+    ) -> str:
+        """
+        Build a content-hash cache key from the request inputs.
+
+        Returns:
+            str: Hex SHA-256 digest
+        """
+        parts = [
+            normalize_text(text),
+            length,
+            similarity,
+            style,
+            (custom_style or "").strip() if style == "Custom" else "",
+            model,
+            template_version,
+        ]
+        payload = json.dumps(parts, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def get(self, key: str) -> dict | None:
+        """
+        Look up a cached result.
+
+        Returns:
+            dict | None: A copy of a cached result, or None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            self._remove(key)
+            entry = None
+
+        if entry is None or len(entry.variants) < self.max_variants:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        variant = entry.variants[entry.next_variant % len(entry.variants)]
+        entry.next_variant += 1
+        self.hits += 1
+        return dict(variant)
+
+    def put(self, key: str, result: dict) -> None:
+        """Store a result, adding it as a new variant if the key already exists."""
+        size = len(result.get("content", "").encode("utf-8")) + _ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            entry = _CacheEntry(expires_at=time.monotonic() + self.ttl_seconds)
+            self._entries[key] = entry
+        elif len(entry.variants) >= self.max_variants:
+            return
+
+        entry.variants.append(dict(result))
+        entry.size += size
+        self._bytes += size
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until both caps are satisfied."""
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries and reset counters."""
+        self._entries.clear()
+        self._bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """Return cache counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Shared by every OpenAIService instance in this worker
+result_cache = ResultCache(
+    max_entries=settings.result_cache_max_entries,
+    max_bytes=settings.result_cache_max_bytes,
+    ttl_seconds=settings.result_cache_ttl_seconds,
+    max_variants=settings.result_cache_variants,
+)
@@ -0,0 +1,85 @@
+"""Single-flight coalescing of identical concurrent requests."""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Call:
+    """One in-flight computation and the number of callers waiting on it."""
+
+    task: asyncio.Future
+    waiters: int = 0
+
+
+class SingleFlight:
+    """
+    Run at most one computation per key at a time.
+
+    Callers arriving while a computation for the same key is in flight wait for
+    its result instead of starting their own. The computation runs in its own
+    task, so a waiter disconnecting does not cancel it for the others; it is
+    only cancelled once every waiter has gone away.
+    """
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._calls: dict[str, _Call] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _finished(self, key: str, call: _Call, task: asyncio.Future) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every waiter is gone
+            task.exception()
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Return the result of ``func()``, sharing it with concurrent callers of ``key``.
+
+        Args:
+            key: Identity of the computation
+            func: Coroutine factory, only called if no computation is in flight
+
+        Returns:
+            The (shared) result; callers must not mutate it
+
+        Raises:
+            Exception: Whatever ``func`` raised, delivered to every waiter
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(task=asyncio.ensure_future(func()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task: self._finished(key, call, task))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+            logger.info(f"Joined in-flight request {key[:12]} ({call.waiters} already waiting)")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def stats(self) -> dict:
+        """Return coalescing counters for monitoring."""
+        return {
+            "inFlight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
+
+
+# Shared by every OpenAIService instance in this worker
+humanize_flights = SingleFlight()
@@ -0,0 +1,111 @@
+"""Token-bounded text chunking aligned to paragraph and sentence boundaries."""
+import bisect
+import re
+from dataclasses import dataclass
+from typing import Sequence
+
+# Sentence terminators for both Latin and CJK punctuation
+_SENTENCE_END = re.compile(r"[.!?。！？;；]+[\"'”’)\]]*\s+|[。！？]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class TextChunk:
+    """A contiguous piece of the source text."""
+
+    index: int
+    text: str
+    token_count: int
+
+
+def _find_boundary(text: str, start: int, end: int) -> int:
+    """
+    Find the best split position in ``text[start:end]``.
+
+    Paragraph breaks are preferred over line breaks, line breaks over sentence
+    ends, and sentence ends over plain whitespace. Only the second half of the
+    window is searched so chunks never become much smaller than the budget.
+
+    Returns:
+        int: Character offset to split at, or ``end`` if no boundary was found
+    """
+    floor = start + (end - start) // 2
+    window = text[floor:end]
+
+    for separator in ("\n\n", "\n"):
+        pos = window.rfind(separator)
+        if pos != -1:
+            return floor + pos + len(separator)
+
+    last = None
+    for last in _SENTENCE_END.finditer(window):
+        pass
+    if last is not None:
+        return floor + last.end()
+
+    last = None
+    for last in _WHITESPACE.finditer(window):
+        pass
+    if last is not None:
+        return floor + last.end()
+
+    return end
+
+
+def split_into_chunks(
+    text: str,
+    tokens: Sequence[int],
+    encoding,
+    max_tokens: int,
+) -> list[TextChunk]:
+    """
+    Split text into chunks of at most ``max_tokens`` tokens.
+
+    The already-computed token array is reused: token character offsets map
+    token budgets back onto the text, and each cut is moved back to the
+    nearest paragraph/sentence boundary. No part of the text is encoded twice.
+
+    Args:
+        text: Source text
+        tokens: Token ids of ``text`` from ``encoding``
+        encoding: tiktoken encoding used to produce ``tokens``
+        max_tokens: Maximum tokens per chunk
+
+    Returns:
+        list[TextChunk]: Non-empty chunks in document order
+    """
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be positive")
+
+    total = len(tokens)
+    if total <= max_tokens:
+        stripped = text.strip()
+        return [TextChunk(index=0, text=stripped, token_count=total)] if stripped else []
+
+    decoded, offsets = encoding.decode_with_offsets(list(tokens))
+    chunks: list[TextChunk] = []
+    token_start = 0
+
+    while token_start < total:
+        char_start = offsets[token_start]
+        token_end = token_start + max_tokens
+
+        if token_end >= total:
+            token_end = total
+            char_end = len(decoded)
+        else:
+            boundary = _find_boundary(decoded, char_start, offsets[token_end])
+            # First token that starts at or after the boundary
+            split_token = bisect.bisect_left(offsets, boundary, token_start + 1, token_end + 1)
+            if split_token > token_start:
+                token_end = split_token
+            char_end = offsets[token_end]
+
+        piece = decoded[char_start:char_end].strip()
+        if piece:
+            chunks.append(
+                TextChunk(index=len(chunks), text=piece, token_count=token_end - token_start)
+            )
+        token_start = token_end
+
+    return chunks
@@ -0,0 +1,132 @@
+"""Tokenization helpers that encode once and keep large encodes off the event loop."""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, TypeVar
+
+import tiktoken
+
+from app.config import settings
+from app.services.text_chunker import TextChunk, split_into_chunks
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# tiktoken releases the GIL while encoding, so a small thread pool gives real parallelism
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.tokenizer_threads),
+            thread_name_prefix="tokenizer",
+        )
+    return _executor
+
+
+@dataclass
+class TokenizedText:
+    """Text together with its token array (or a cheap upper bound on its length)."""
+
+    text: str
+    tokens: list[int] | None
+    token_count: int
+
+    @property
+    def exact(self) -> bool:
+        """Whether ``token_count`` is exact rather than an upper bound."""
+        return self.tokens is not None
+
+
+class Tokenizer:
+    """Model-aware tokenizer shared by counting, truncation and chunking."""
+
+    def __init__(self, model: str):
+        """Initialize tokenizer for the model."""
+        try:
+            self.encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            # Fallback to cl100k_base encoding (used by gpt-4 and gpt-3.5-turbo)
+            logger.warning(f"Model {model} not found, using cl100k_base encoding")
+            self.encoding = tiktoken.get_encoding("cl100k_base")
+
+    @staticmethod
+    def upper_bound(text: str) -> int:
+        """
+        Cheap upper bound on the token count.
+
+        Byte-level BPE never produces more tokens than UTF-8 bytes, and for ASCII
+        text (the common case) the byte count is just the character count.
+        """
+        if text.isascii():
+            return len(text)
+        return len(text.encode("utf-8"))
+
+    def encode(self, text: str) -> list[int]:
+        """Encode text into tokens."""
+        # User text may legitimately contain strings like "<|endoftext|>"
+        return self.encoding.encode(text, disallowed_special=())
+
+    def count(self, text: str) -> int:
+        """Count the number of tokens in a (short) text string."""
+        try:
+            return len(self.encode(text))
+        except Exception as e:
+            logger.error(f"Error counting tokens: {e}")
+            # Fallback: rough estimate (1 token ≈ 4 characters for English, 1-2 for Chinese)
+            return len(text) // 2
+
+    async def _run(self, size: int, func: Callable[..., T], *args) -> T:
+        """Run ``func`` inline for small inputs, or in the tokenizer thread pool."""
+        if size < settings.tokenizer_thread_threshold_chars:
+            return func(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), func, *args)
+
+    async def tokenize(self, text: str, budget: int | None = None) -> TokenizedText:
+        """
+        Tokenize text, skipping the encode when it obviously fits ``budget``.
+
+        Args:
+            text: Text to tokenize
+            budget: If the upper bound is within this many tokens, no encoding is done
+
+        Returns:
+            TokenizedText: With exact tokens, or ``tokens=None`` and an upper-bound count
+        """
+        if budget is not None:
+            bound = self.upper_bound(text)
+            if bound <= budget:
+                return TokenizedText(text=text, tokens=None, token_count=bound)
+
+        tokens = await self._run(len(text), self.encode, text)
+        return TokenizedText(text=text, tokens=tokens, token_count=len(tokens))
+
+    async def truncate(self, doc: TokenizedText, max_tokens: int) -> TokenizedText:
+        """Truncate tokenized text to ``max_tokens`` using its existing token array."""
+        if doc.token_count <= max_tokens:
+            return doc
+        if doc.tokens is None:
+            doc = await self.tokenize(doc.text)
+            if doc.token_count <= max_tokens:
+                return doc
+
+        tokens = doc.tokens[:max_tokens]
+        text = await self._run(len(doc.text), self.encoding.decode, tokens)
+        return TokenizedText(text=text, tokens=tokens, token_count=len(tokens))
+
+    async def split(self, doc: TokenizedText, max_tokens: int) -> list[TextChunk]:
+        """Split tokenized text into sentence-aligned chunks of at most ``max_tokens``."""
+        if doc.token_count <= max_tokens:
+            stripped = doc.text.strip()
+            return [TextChunk(index=0, text=stripped, token_count=doc.token_count)] if stripped else []
+        if doc.tokens is None:
+            doc = await self.tokenize(doc.text)
+
+        return await self._run(
+            len(doc.text), split_into_chunks, doc.text, doc.tokens, self.encoding, max_tokens
+        )
@@ -0,0 +1,267 @@
+"""Background cleanup of the upload store by age and total size."""
+import asyncio
+import heapq
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.services.upload_store import FILE_ID_PATTERN, StoredFile, UploadStore, upload_store
+
+logger = logging.getLogger(__name__)
+
+# Temporary files left by interrupted uploads are removed after this long
+TMP_MAX_AGE = 3600.0
+
+
+class UploadJanitor:
+    """
+    Delete uploads that are too old or push the store over its size quota.
+
+    The directory is scanned once at startup (and again every
+    ``rescan_interval`` to pick up files written by other workers); after
+    that the janitor keeps an in-memory index of ``file_id -> (mtime, size)``
+    and a heap ordered by mtime, updated as files are stored. A sweep pops
+    the oldest entries instead of walking the directory, so its cost depends
+    on how much is deleted rather than on how many files are kept. Sweeps
+    and scans run in a thread, so the index is guarded by a lock.
+    """
+
+    def __init__(
+        self,
+        store: UploadStore,
+        max_age: float,
+        max_total_bytes: int,
+        interval: float = 60.0,
+        rescan_interval: float = 3600.0,
+    ):
+        """
+        Initialize the janitor.
+
+        Args:
+            store: Upload store to clean
+            max_age: Files not stored or re-uploaded for this many seconds are deleted (0 = no limit)
+            max_total_bytes: Oldest files are deleted while the store is larger (0 = no limit)
+            interval: Seconds between sweeps
+            rescan_interval: Seconds between full directory scans
+        """
+        self.store = store
+        self.max_age = max_age
+        self.max_total_bytes = max_total_bytes
+        self.interval = interval
+        self.rescan_interval = rescan_interval
+        self._index: dict[str, tuple[float, int]] = {}
+        self._heap: list[tuple[float, str]] = []
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._last_scan = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sweeps = 0
+        self._deleted_files = 0
+        self._reclaimed_bytes = 0
+        store.add_listener(self.record)
+
+    @property
+    def total_bytes(self) -> int:
+        """Bytes of blobs currently indexed."""
+        return self._total_bytes
+
+    def _set(self, file_id: str, mtime: float, size: int) -> None:
+        old = self._index.get(file_id)
+        if old is not None:
+            self._total_bytes -= old[1]
+        self._index[file_id] = (mtime, size)
+        self._total_bytes += size
+        # Superseded heap entries are skipped when popped
+        heapq.heappush(self._heap, (mtime, file_id))
+
+    def _forget(self, file_id: str) -> None:
+        old = self._index.pop(file_id, None)
+        if old is not None:
+            self._total_bytes -= old[1]
+
+    def record(self, stored: StoredFile) -> None:
+        """Index a file that was just stored or deduplicated."""
+        with self._lock:
+            self._set(stored.file_id, time.time(), stored.size)
+        if (
+            self.max_total_bytes
+            and self._total_bytes > self.max_total_bytes
+            and self._wakeup is not None
+            and self._loop is not None
+        ):
+            # Uploads run on the event loop thread or in a worker thread
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def scan(self) -> None:
+        """Rebuild the index from the directory tree and remove stale temporary files."""
+        now = time.time()
+        self.store.migrate_flat_layout()
+        found: dict[str, tuple[float, int]] = {}
+
+        with os.scandir(self.store.root) as shards:
+            for shard in shards:
+                if shard.is_file() and shard.name.startswith(".tmp-"):
+                    try:
+                        if now - shard.stat().st_mtime > TMP_MAX_AGE:
+                            os.unlink(shard.path)
+                    except FileNotFoundError:
+                        pass
+                    continue
+                if not shard.is_dir():
+                    continue
+                with os.scandir(shard.path) as entries:
+                    for entry in entries:
+                        if not FILE_ID_PATTERN.match(entry.name):
+                            continue
+                        try:
+                            info = entry.stat()
+                        except FileNotFoundError:
+                            continue
+                        found[entry.name] = (info.st_mtime, info.st_size)
+
+        with self._lock:
+            # Files recorded while the scan ran keep their newer mtime, and are
+            # kept even if the walk had already passed their shard
+            for file_id, (mtime, size) in self._index.items():
+                if file_id in found:
+                    if mtime > max(now, found[file_id][0]):
+                        found[file_id] = (mtime, found[file_id][1])
+                elif mtime >= now:
+                    found[file_id] = (mtime, size)
+            self._index = found
+            self._heap = [(mtime, file_id) for file_id, (mtime, _) in found.items()]
+            heapq.heapify(self._heap)
+            self._total_bytes = sum(size for _, size in found.values())
+        self._last_scan = time.monotonic()
+        logger.info(
+            f"Upload index built: {len(self._index)} files, "
+            f"{self._total_bytes / 1024 / 1024:.1f}MB"
+        )
+
+    def _pop_oldest(self) -> Optional[tuple[float, str]]:
+        """Pop the oldest live heap entry, discarding superseded ones."""
+        while self._heap:
+            mtime, file_id = heapq.heappop(self._heap)
+            entry = self._index.get(file_id)
+            if entry is not None and entry[0] == mtime:
+                return mtime, file_id
+        return None
+
+    def _evict(self, mtime: float, file_id: str) -> bool:
+        """Delete one file unless another worker refreshed it since it was indexed."""
+        try:
+            info = self.store.blob_path(file_id).stat()
+        except FileNotFoundError:
+            self._forget(file_id)
+            return False
+        if info.st_mtime > mtime:
+            self._set(file_id, info.st_mtime, info.st_size)
+            return False
+
+        reclaimed = self.store.delete(file_id)
+        self._forget(file_id)
+        self._deleted_files += 1
+        self._reclaimed_bytes += reclaimed
+        return True
+
+    def sweep(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Delete expired files, then the oldest files while over the quota.
+
+        Args:
+            now: Current time (defaults to ``time.time()``)
+
+        Returns:
+            Dict with ``deletedFiles`` and ``reclaimedBytes`` for this sweep
+        """
+        now = time.time() if now is None else now
+        deleted_before = self._deleted_files
+        reclaimed_before = self._reclaimed_bytes
+
+        with self._lock:
+            while True:
+                oldest = self._pop_oldest()
+                if oldest is None:
+                    break
+                mtime, file_id = oldest
+                expired = self.max_age > 0 and now - mtime > self.max_age
+                over_quota = self.max_total_bytes > 0 and self._total_bytes > self.max_total_bytes
+                if not expired and not over_quota:
+                    heapq.heappush(self._heap, oldest)
+                    break
+                self._evict(mtime, file_id)
+
+            self._sweeps += 1
+            result = {
+                "deletedFiles": self._deleted_files - deleted_before,
+                "reclaimedBytes": self._reclaimed_bytes - reclaimed_before,
+            }
+        if result["deletedFiles"]:
+            logger.info(
+                f"Upload janitor deleted {result['deletedFiles']} files, "
+                f"reclaimed {result['reclaimedBytes'] / 1024 / 1024:.1f}MB"
+            )
+        return result
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                if time.monotonic() - self._last_scan >= self.rescan_interval:
+                    await asyncio.to_thread(self.scan)
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                logger.error(f"Upload janitor sweep failed: {e}")
+
+    async def start(self) -> None:
+        """Build the index, run a first sweep and start the background loop."""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        await asyncio.to_thread(self.scan)
+        await asyncio.to_thread(self.sweep)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background loop."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._wakeup = None
+        self._loop = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return index size and cleanup counters."""
+        return {
+            "files": len(self._index),
+            "totalBytes": self._total_bytes,
+            "maxTotalBytes": self.max_total_bytes,
+            "maxAgeSeconds": self.max_age,
+            "sweeps": self._sweeps,
+            "deletedFiles": self._deleted_files,
+            "reclaimedBytes": self._reclaimed_bytes,
+        }
+
+
+upload_janitor = UploadJanitor(
+    upload_store,
+    max_age=settings.upload_max_age_hours * 3600,
+    max_total_bytes=settings.upload_max_total_bytes,
+    interval=settings.upload_janitor_interval,
+    rescan_interval=settings.upload_janitor_rescan_interval,
+)
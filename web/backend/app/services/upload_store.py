@@ -0,0 +1,264 @@
+"""Content-addressed storage for uploaded documents."""
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Callable
+
+from app.services.file_processor import UPLOAD_DIR
+
+logger = logging.getLogger(__name__)
+
+FILE_ID_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+MIME_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    ".txt": "text/plain",
+}
+
+
+@dataclass
+class StoredFile:
+    """An uploaded file and its metadata."""
+
+    file_id: str
+    filename: str
+    size: int
+    created_at: float
+    path: Path
+
+    @property
+    def ext(self) -> str:
+        """Lower-cased extension of the original filename."""
+        return Path(self.filename).suffix.lower()
+
+    @property
+    def content_type(self) -> str:
+        """MIME type derived from the original filename."""
+        return MIME_TYPES.get(self.ext, "application/octet-stream")
+
+
+class UploadStore:
+    """
+    Store uploads under their SHA-256 content hash.
+
+    Identical content is stored once; each blob has a JSON metadata sidecar
+    holding the most recent original filename. Blobs are sharded into
+    subdirectories by the first two hex digits of their ID so no directory
+    grows without bound. Writes go to a temporary file that is atomically
+    renamed, so readers never see partial files.
+    """
+
+    def __init__(self, root: Path):
+        """Initialize the store, creating its directory if needed."""
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._listeners: list[Callable[[StoredFile], None]] = []
+
+    def add_listener(self, callback: Callable[[StoredFile], None]) -> None:
+        """Call ``callback`` with every stored (or deduplicated) file."""
+        self._listeners.append(callback)
+
+    @staticmethod
+    def validate_id(file_id: str) -> str:
+        """
+        Check that ``file_id`` is a SHA-256 hex digest.
+
+        Raises:
+            ValueError: If the ID is malformed (this also blocks path traversal)
+        """
+        file_id = file_id.lower()
+        if not FILE_ID_PATTERN.match(file_id):
+            raise ValueError(f"Invalid file ID: {file_id}")
+        return file_id
+
+    def shard_dir(self, file_id: str) -> Path:
+        """Subdirectory holding ``file_id``."""
+        return self.root / file_id[:2]
+
+    def blob_path(self, file_id: str) -> Path:
+        """Path of the raw bytes for ``file_id``."""
+        return self.shard_dir(file_id) / file_id
+
+    def meta_path(self, file_id: str) -> Path:
+        """Path of the metadata sidecar for ``file_id``."""
+        return self.shard_dir(file_id) / f"{file_id}.json"
+
+    def delete(self, file_id: str) -> int:
+        """
+        Remove a stored file and its metadata.
+
+        Returns:
+            int: Bytes reclaimed
+        """
+        reclaimed = 0
+        for path in (self.blob_path(file_id), self.meta_path(file_id)):
+            try:
+                reclaimed += path.stat().st_size
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        return reclaimed
+
+    def migrate_flat_layout(self) -> int:
+        """
+        Move blobs stored directly under ``root`` (older layout) into shards.
+
+        Returns:
+            int: Number of files moved
+        """
+        moved = 0
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                file_id = entry.name.removesuffix(".json")
+                if not entry.is_file() or not FILE_ID_PATTERN.match(file_id):
+                    continue
+                target = self.shard_dir(file_id) / entry.name
+                target.parent.mkdir(exist_ok=True)
+                os.replace(entry.path, target)
+                moved += 1
+        if moved:
+            logger.info(f"Moved {moved} upload files into sharded directories")
+        return moved
+
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def _write_meta(self, stored: StoredFile) -> None:
+        meta = {
+            "fileId": stored.file_id,
+            "filename": stored.filename,
+            "size": stored.size,
+            "createdAt": stored.created_at,
+        }
+        self._write_atomic(self.meta_path(stored.file_id), json.dumps(meta).encode("utf-8"))
+
+    def _commit(self, tmp_path: str, file_id: str, filename: str, size: int) -> StoredFile:
+        """Move a fully written temporary file into place under its content ID."""
+        path = self.blob_path(file_id)
+        path.parent.mkdir(exist_ok=True)
+        if path.exists():
+            Path(tmp_path).unlink(missing_ok=True)
+            # Refresh the mtime so age-based cleanup keeps recently used files
+            path.touch()
+            logger.info(f"Upload deduplicated: {file_id[:12]} ({filename})")
+        else:
+            os.replace(tmp_path, path)
+            logger.info(f"File stored: {file_id[:12]} ({filename}, {size} bytes)")
+
+        stored = StoredFile(
+            file_id=file_id,
+            filename=Path(filename).name,
+            size=size,
+            created_at=time.time(),
+            path=path,
+        )
+        self._write_meta(stored)
+        for callback in self._listeners:
+            callback(stored)
+        return stored
+
+    def put(self, filename: str, content: bytes) -> StoredFile:
+        """
+        Store file content, reusing the existing blob if the content is known.
+
+        Args:
+            filename: Original filename (kept as metadata)
+            content: File content
+
+        Returns:
+            StoredFile: The stored file
+        """
+        file_id = hashlib.sha256(content).hexdigest()
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            return self._commit(tmp_path, file_id, filename, len(content))
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    async def put_stream(
+        self,
+        filename: str,
+        chunks: AsyncIterator[bytes],
+        max_size: int,
+    ) -> StoredFile:
+        """
+        Store a file from a stream of chunks, hashing it as it is written.
+
+        Only one chunk is held in memory at a time. The data goes to a temporary
+        file that is renamed into place once the content ID is known.
+
+        Args:
+            filename: Original filename (kept as metadata)
+            chunks: File content in pieces
+            max_size: Maximum size in bytes
+
+        Returns:
+            StoredFile: The stored file
+
+        Raises:
+            ValueError: As soon as the running size exceeds ``max_size``
+        """
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > max_size:
+                        raise ValueError(
+                            f"File size exceeds maximum allowed size "
+                            f"({max_size / 1024 / 1024:.0f}MB)"
+                        )
+                    digest.update(chunk)
+                    f.write(chunk)
+            return self._commit(tmp_path, digest.hexdigest(), filename, size)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def get(self, file_id: str) -> StoredFile:
+        """
+        Look up a stored file.
+
+        Raises:
+            ValueError: If the ID is malformed
+            FileNotFoundError: If no file with this ID is stored
+        """
+        file_id = self.validate_id(file_id)
+        path = self.blob_path(file_id)
+        try:
+            meta = json.loads(self.meta_path(file_id).read_text(encoding="utf-8"))
+            size = path.stat().st_size
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File not found: {file_id}")
+
+        return StoredFile(
+            file_id=file_id,
+            filename=meta.get("filename", file_id),
+            size=size,
+            created_at=meta.get("createdAt", 0.0),
+            path=path,
+        )
+
+
+# Shared by the upload and humanize-file endpoints
+upload_store = UploadStore(UPLOAD_DIR)
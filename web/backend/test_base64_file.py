@@ -34,7 +34,7 @@ async def test_base64_file_upload():
     upload_url = "http://localhost:18201/api/v1/upload"
     humanize_file_url = "http://localhost:18201/api/v1/humanize-file"
     
-    uploaded_file_path = None
+    uploaded_file_id = None
     extracted_text = None
     
     try:
@@ -50,13 +50,12 @@ async def test_base64_file_upload():
                 response.raise_for_status()
                 upload_result = response.json()
             
-            uploaded_file_path = upload_result["file_path"]
+            uploaded_file_id = upload_result["fileId"]
             extracted_text = upload_result["text"]
             
             print("✅ 上传成功!")
-            print(f"   服务器路径: {uploaded_file_path}")
+            print(f"   文件 ID: {uploaded_file_id}")
             print(f"   提取字符数: {upload_result['chars']}")
-            print(f"   Base64 长度: {len(upload_result['base64'])} 字符")
             
             # Step 3: Call humanize-file (which will use base64)
             print("\n🤖 步骤 2: 调用 humanize-file 接口 (使用 Base64)")
@@ -66,7 +65,7 @@ async def test_base64_file_upload():
             print("   3. 以 Base64 格式传递给 OpenAI API")
             
             payload = {
-                "file_path": uploaded_file_path,
+                "file_id": uploaded_file_id,
                 "text": extracted_text,
                 "params": {
                     "length": "Normal",
@@ -116,10 +115,6 @@ async def test_base64_file_upload():
             os.remove(test_file_path)
             print(f"   已删除: {test_filename}")
         
-        if uploaded_file_path and Path(uploaded_file_path).exists():
-            os.remove(Path(uploaded_file_path))
-            print(f"   已删除: {uploaded_file_path}")
-        
         print("\n✅ 清理完成")
 
 
@@ -36,20 +36,20 @@ async def test_humanize_file():
                 return
             
             upload_data = upload_response.json()
-            file_path = upload_data.get("file_path")
+            file_id = upload_data.get("fileId")
             extracted_text = upload_data.get("text")
             
             print(f"✅ 上传成功!")
-            print(f"   文件路径: {file_path}")
+            print(f"   文件 ID: {file_id}")
             print(f"   提取字符数: {upload_data['chars']}")
             print()
             
             # Step 2: Humanize file using the new endpoint
             print("🤖 步骤 2: 调用 humanize-file 接口")
-            print(f"   发送文件路径: {file_path}")
+            print(f"   发送文件 ID: {file_id}")
             
             humanize_payload = {
-                "file_path": file_path,
+                "file_id": file_id,
                 "text": extracted_text,
                 "params": {
                     "length": "Normal",
@@ -3,7 +3,7 @@ import json
 
 # 模拟请求
 request_text_mode = {
-    "file_path": "/path/to/file.txt",
+    "file_id": "<sha256 returned by /upload>",
     "text": "人工智能正在改变世界",  # 有文本
     "params": {
         "length": "Normal",
@@ -13,7 +13,7 @@ request_text_mode = {
 }
 
 request_base64_mode = {
-    "file_path": "/path/to/file.txt",
+    "file_id": "<sha256 returned by /upload>",
     "text": "",  # 无文本
     "params": {
         "length": "Normal",
@@ -28,13 +28,13 @@ async def test_text_mode():
                 response.raise_for_status()
                 upload_result = response.json()
             
-            print(f"✅ 上传成功: {upload_result['file_path']}")
+            print(f"✅ 上传成功: {upload_result['fileId']}")
             print(f"   提取的文本: {upload_result['text'][:50]}...")
             
             # 2. Call humanize-file with text (text mode)
             print("\n🤖 调用 humanize-file (文本模式)...")
             payload = {
-                "file_path": upload_result['file_path'],
+                "file_id": upload_result['fileId'],
                 "text": upload_result['text'],  # 传递文本
                 "params": {
                     "length": "Normal",
@@ -65,10 +65,6 @@ async def test_text_mode():
         # Cleanup
         if test_file.exists():
             test_file.unlink()
-        if 'upload_result' in locals():
-            uploaded_path = Path(upload_result['file_path'])
-            if uploaded_path.exists():
-                uploaded_path.unlink()
 
 
 async def test_file_base64_mode():
@@ -95,12 +91,12 @@ async def test_file_base64_mode():
                 response.raise_for_status()
                 upload_result = response.json()
             
-            print(f"✅ 上传成功: {upload_result['file_path']}")
+            print(f"✅ 上传成功: {upload_result['fileId']}")
             
             # 2. Call humanize-file without text (file base64 mode)
             print("\n🤖 调用 humanize-file (文件 Base64 模式)...")
             payload = {
-                "file_path": upload_result['file_path'],
+                "file_id": upload_result['fileId'],
                 "text": "",  # 空文本,触发 base64 模式
                 "params": {
                     "length": "Normal",
@@ -131,10 +127,6 @@ async def test_file_base64_mode():
         # Cleanup
         if test_file.exists():
             test_file.unlink()
-        if 'upload_result' in locals():
-            uploaded_path = Path(upload_result['file_path'])
-            if uploaded_path.exists():
-                uploaded_path.unlink()
 
 
 async def main():
@@ -0,0 +1,98 @@
+"""Shared test fixtures."""
+import pytest
+import tiktoken
+
+
+@pytest.fixture
+def byte_encoding():
+    """Offline byte-level tiktoken encoding (one token per UTF-8 byte)."""
+    return tiktoken.Encoding(
+        name="test_bytes",
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={},
+    )
+
+
+@pytest.fixture
+def upstream(monkeypatch, byte_encoding):
+    """
+    Route the shared upstream client to an in-process handler.
+
+    Tests set ``upstream.handler`` to a function taking an ``httpx.Request`` and
+    returning an ``httpx.Response``. Requests are recorded in ``upstream.requests``.
+    """
+    import httpx
+
+    from app.config import settings
+    from app.services import gemini_service, http_client, openai_service
+    from app.services.hedging import Hedger
+    from app.services.rate_limiter import RateLimitScheduler
+    from app.services.resilience import CircuitBreaker, RetryPolicy
+    from app.services.result_cache import result_cache
+    from app.services.single_flight import SingleFlight
+
+    class Upstream:
+        def __init__(self):
+            self.requests = []
+            self.handler = None
+
+        def __call__(self, request):
+            self.requests.append(request)
+            return self.handler(request)
+
+    fake = Upstream()
+    result_cache.clear()
+    monkeypatch.setattr(settings, "openai_api_key", "sk-test")
+    monkeypatch.setattr(tiktoken, "encoding_for_model", lambda model: byte_encoding)
+    monkeypatch.setattr(http_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(fake)))
+    monkeypatch.setattr(openai_service, "_router", None)
+    monkeypatch.setattr(openai_service, "rate_limiter", RateLimitScheduler())
+    monkeypatch.setattr(openai_service, "openai_hedger", Hedger())
+    monkeypatch.setattr(openai_service, "humanize_flights", SingleFlight())
+    monkeypatch.setattr(openai_service, "openai_breaker", CircuitBreaker("test"))
+    monkeypatch.setattr(gemini_service, "gemini_breaker", CircuitBreaker("test-gemini"))
+    monkeypatch.setattr(
+        openai_service, "openai_retry_policy", RetryPolicy(base_delay=0.001, max_delay=0.01)
+    )
+    yield fake
+    monkeypatch.setattr(http_client, "_client", None)
+    monkeypatch.setattr(openai_service, "_router", None)
+
+
+def _build_pdf(pages: list[str]) -> bytes:
+    """Write a minimal PDF with one line of Helvetica text per page."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b""]
+    kids = []
+    for text in pages:
+        page_number = len(objects) + 1
+        kids.append(f"{page_number} 0 R")
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("latin-1")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 << /Type /Font /Subtype /Type1 "
+            f"/BaseFont /Helvetica >> >> >> /Contents {page_number + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(out)
+
+
+@pytest.fixture
+def make_pdf():
+    """Build PDF bytes from a list of page texts."""
+    return _build_pdf
@@ -0,0 +1,97 @@
+"""Tests for the streaming DOCX extractor."""
+import io
+import zipfile
+
+import docx
+import pytest
+
+from app.services.docx_extractor import iter_docx_paragraphs, read_docx_text
+from app.services.document_parser import DocumentParserService
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+MC = 'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+
+
+def _docx_bytes() -> bytes:
+    document = docx.Document()
+    document.sections[0].header.paragraphs[0].text = "Header"
+    document.sections[0].footer.paragraphs[0].text = "Footer"
+    document.add_paragraph("Intro ").add_run("continues")
+    table = document.add_table(rows=1, cols=2)
+    table.cell(0, 0).text = "Cell A"
+    table.cell(0, 1).text = "Cell B"
+    document.add_paragraph("")
+    document.add_paragraph("Closing")
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _raw_docx(body: str) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as package:
+        package.writestr("word/document.xml", f"<w:document {W} {MC}><w:body>{body}</w:body></w:document>")
+    buffer.seek(0)
+    return buffer
+
+
+def test_paragraphs_tables_headers_in_order():
+    paragraphs = list(iter_docx_paragraphs(io.BytesIO(_docx_bytes())))
+
+    assert paragraphs == ["Header", "Intro continues", "Cell A", "Cell B", "", "Closing", "Footer"]
+
+
+def test_headers_can_be_excluded():
+    paragraphs = list(iter_docx_paragraphs(io.BytesIO(_docx_bytes()), include_headers=False))
+
+    assert paragraphs[0] == "Intro continues"
+    assert "Footer" not in paragraphs
+
+
+def test_tabs_breaks_and_text_box_fallback():
+    """Text boxes are read once (the mc:Fallback duplicate is skipped)."""
+    body = (
+        "<w:p><w:r><w:t>a</w:t><w:tab/><w:t>b</w:t><w:br/><w:t>c</w:t></w:r></w:p>"
+        "<w:p><w:r><mc:AlternateContent>"
+        "<mc:Choice><w:txbxContent><w:p><w:r><w:t>Boxed</w:t></w:r></w:p></w:txbxContent></mc:Choice>"
+        "<mc:Fallback><w:txbxContent><w:p><w:r><w:t>Boxed</w:t></w:r></w:p></w:txbxContent></mc:Fallback>"
+        "</mc:AlternateContent><w:t>Anchor</w:t></w:r></w:p>"
+    )
+
+    assert list(iter_docx_paragraphs(_raw_docx(body))) == ["a\tb\nc", "Boxed", "Anchor"]
+
+
+def test_document_parser_matches_upload_extraction():
+    """Both entry points go through the same extractor, keeping paragraph breaks."""
+    text = DocumentParserService().parse_docx(io.BytesIO(_docx_bytes()))
+
+    assert text == "Header\nIntro continues\nCell A\nCell B\n\nClosing\nFooter"
+    assert text == read_docx_text(io.BytesIO(_docx_bytes()))
+    assert read_docx_text(io.BytesIO(_docx_bytes()), skip_empty=True).count("\n\n") == 0
+
+
+def test_invalid_package_raises_value_error():
+    with pytest.raises(ValueError, match="Not a DOCX file"):
+        read_docx_text(io.BytesIO(b"plain text"))
+
+
+def test_oversized_part_is_rejected(monkeypatch):
+    """A part that inflates past the limit is refused before it is decompressed."""
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "ooxml_max_part_bytes", 1024)
+    bomb = _raw_docx("<w:p><w:r><w:t>" + "x" * 4096 + "</w:t></w:r></w:p>")
+
+    with pytest.raises(ValueError, match="too large when decompressed"):
+        read_docx_text(bomb)
+
+
+def test_parser_does_not_rewrap_value_errors(monkeypatch):
+    """Extraction errors reach the caller with their original message."""
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "ooxml_max_part_bytes", 1024)
+    bomb = _raw_docx("<w:p><w:r><w:t>" + "x" * 4096 + "</w:t></w:r></w:p>")
+
+    with pytest.raises(ValueError, match="^Document part word/document.xml is too large"):
+        DocumentParserService().parse_docx(bomb)
@@ -0,0 +1,87 @@
+"""Tests for the extraction result cache."""
+import asyncio
+import os
+
+from app.services.extraction_cache import ExtractionCache, ExtractionResult
+
+FILE_ID = "a" * 64
+
+
+def test_from_pages_records_page_offsets():
+    result = ExtractionResult.from_pages(["  One", "Two", "Three  "])
+
+    assert result.text == "One\nTwo\nThree"
+    assert result.page_count == 3
+    assert [result.text[offset:].split("\n")[0] for offset in result.page_offsets] == [
+        "One",
+        "Two",
+        "Three",
+    ]
+
+
+def test_memory_then_disk_hits(tmp_path):
+    """A second worker (fresh memory) is served from the shared directory."""
+    result = ExtractionResult.from_pages(["Page one", "Page two"])
+    asyncio.run(ExtractionCache(tmp_path).put(FILE_ID, ".pdf", result))
+    other_worker = ExtractionCache(tmp_path)
+
+    assert asyncio.run(other_worker.get(FILE_ID, ".pdf")) == result
+    assert asyncio.run(other_worker.get(FILE_ID, ".pdf")) == result
+    assert other_worker.stats()["diskHits"] == 1
+    assert other_worker.stats()["memoryHits"] == 1
+
+
+def test_key_includes_extension_and_version(tmp_path):
+    asyncio.run(ExtractionCache(tmp_path).put(FILE_ID, ".txt", ExtractionResult(text="plain")))
+
+    assert asyncio.run(ExtractionCache(tmp_path).get(FILE_ID, ".pdf")) is None
+    assert asyncio.run(ExtractionCache(tmp_path, version="0").get(FILE_ID, ".txt")) is None
+
+
+def test_memory_is_size_bounded(tmp_path):
+    cache = ExtractionCache(tmp_path, max_memory_bytes=10)
+    asyncio.run(cache.put("b" * 64, ".txt", ExtractionResult(text="12345678")))
+    asyncio.run(cache.put("c" * 64, ".txt", ExtractionResult(text="12345678")))
+
+    assert cache.stats()["memoryEntries"] == 1
+    assert cache.stats()["memoryBytes"] <= 10
+
+
+def test_disk_evicts_least_recently_used(tmp_path):
+    cache = ExtractionCache(tmp_path, max_memory_bytes=0, max_disk_bytes=250)
+    for index, file_id in enumerate(["b" * 64, "c" * 64, "d" * 64]):
+        asyncio.run(cache.put(file_id, ".txt", ExtractionResult(text="x" * 60)))
+        path = cache._path(cache.make_key(file_id, ".txt"))
+        os.utime(path, (1000 + index, 1000 + index))
+    asyncio.run(cache.put("e" * 64, ".txt", ExtractionResult(text="x" * 60)))
+
+    assert asyncio.run(cache.get("b" * 64, ".txt")) is None
+    assert asyncio.run(cache.get("e" * 64, ".txt")) is not None
+    assert cache.stats()["diskBytes"] <= 250
+    assert cache.evictions >= 1
+
+
+def test_disk_tier_runs_off_the_event_loop(tmp_path, monkeypatch):
+    """Disk reads and writes happen in a worker thread, not on the loop thread."""
+    import threading
+
+    cache = ExtractionCache(tmp_path, max_memory_bytes=0)
+    threads = []
+    for name in ("_read_disk", "_write_disk"):
+        method = getattr(cache, name)
+
+        def recording(*args, method=method):
+            threads.append(threading.get_ident())
+            return method(*args)
+
+        monkeypatch.setattr(cache, name, recording)
+
+    async def main():
+        await cache.put(FILE_ID, ".txt", ExtractionResult(text="plain"))
+        assert (await cache.get(FILE_ID, ".txt")).text == "plain"
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(main())
+
+    assert len(threads) == 2
+    assert loop_thread not in threads
@@ -0,0 +1,86 @@
+"""Tests for the extraction process pool."""
+import asyncio
+import os
+import time
+
+import pytest
+
+from app.services.extraction_pool import ExtractionPool
+
+
+def _pid() -> int:
+    return os.getpid()
+
+
+def _sleep(seconds: float) -> str:
+    time.sleep(seconds)
+    return "done"
+
+
+def _fail() -> None:
+    raise ValueError("cannot parse")
+
+
+@pytest.fixture
+def pool():
+    pool = ExtractionPool(workers=1, timeout=10)
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+def test_jobs_run_in_a_worker_process(pool):
+    """Jobs run outside the API process and reuse the pre-warmed worker."""
+    async def main():
+        return [await pool.run(_pid), await pool.run(_pid)]
+
+    first, second = asyncio.run(main())
+
+    assert first != os.getpid()
+    assert first == second
+    assert pool.stats()["completed"] == 2
+
+
+def test_errors_are_raised_as_value_error(pool):
+    """Job failures surface as ValueError in the caller."""
+    with pytest.raises(ValueError, match="cannot parse"):
+        asyncio.run(pool.run(_fail))
+    assert pool.stats()["failed"] == 1
+
+
+def test_overrunning_job_is_killed_and_slot_replaced(pool):
+    """A job past its timeout is killed; the next job gets a fresh worker."""
+    async def main():
+        first = await pool.run(_pid)
+        with pytest.raises(ValueError, match="timed out"):
+            await pool.run(_sleep, 30, timeout=0.5)
+        return first, await pool.run(_pid)
+
+    before, after = asyncio.run(main())
+
+    assert before != after
+    assert pool.stats()["timedOut"] == 1
+    assert pool.stats()["restarts"] == 1
+
+
+def test_inline_mode_without_workers():
+    """With no worker processes, jobs run in a thread."""
+    assert asyncio.run(ExtractionPool(workers=0).run(_sleep, 0)) == "done"
+
+
+def test_cancelled_caller_does_not_kill_the_worker(pool):
+    """An abandoned job finishes in the background and its worker is reused."""
+    async def main():
+        first = await pool.run(_pid)
+        task = asyncio.create_task(pool.run(_sleep, 0.3))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return first, await pool.run(_pid)
+
+    before, after = asyncio.run(main())
+
+    assert before == after
+    assert pool.stats()["restarts"] == 0
+    assert pool.stats()["completed"] == 3
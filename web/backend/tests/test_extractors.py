@@ -0,0 +1,78 @@
+"""Tests for format detection and the extractor registry."""
+import io
+import zipfile
+
+import pytest
+
+from app.services.extractors import BufferReader, ExtractorRegistry, decode_text, extractor_registry
+
+
+def _zip(member: str) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as package:
+        package.writestr(member, "<x/>")
+    return buffer.getvalue()
+
+
+def test_detects_formats_by_content(make_pdf):
+    """Magic bytes and OOXML part names decide the format, not the name."""
+    assert extractor_registry.detect(make_pdf(["x"]), "a.txt").name == "pdf"
+    assert extractor_registry.detect(_zip("word/document.xml"), "a.pptx").name == "docx"
+    assert extractor_registry.detect(_zip("ppt/presentation.xml")).name == "pptx"
+    assert extractor_registry.detect(b"just text", "a.pdf").name == "txt"
+
+
+def test_rejects_unsupported_content():
+    with pytest.raises(ValueError, match="Legacy"):
+        extractor_registry.detect(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + b"\x00" * 16)
+    with pytest.raises(ValueError, match="Unsupported file type: .zip"):
+        extractor_registry.detect(_zip("other.xml"), "a.zip")
+    with pytest.raises(ValueError, match="Unsupported file type"):
+        extractor_registry.detect(b"\x00\x01binary")
+
+
+def test_extracts_from_buffers_paths_and_files(make_pdf, tmp_path):
+    """The same document gives the same text from any kind of source."""
+    data = make_pdf(["One", "Two"])
+    path = tmp_path / "doc"
+    path.write_bytes(data)
+    registry = ExtractorRegistry()
+    for extractor in extractor_registry._extractors.values():
+        registry.register(extractor)
+
+    sources = [data, bytearray(data), memoryview(data), io.BytesIO(data), str(path), path]
+    texts = {registry.extract(source) for source in sources}
+
+    assert texts == {"One\nTwo"}
+    stats = registry.stats()["pdf"]
+    assert (stats["calls"], stats["failures"], stats["bytes"]) == (6, 0, 6 * len(data))
+
+
+def test_failures_are_counted():
+    registry = ExtractorRegistry()
+    for extractor in extractor_registry._extractors.values():
+        registry.register(extractor)
+
+    with pytest.raises(ValueError, match="PDF"):
+        registry.extract(b"%PDF-1.4 truncated")
+
+    assert registry.stats()["pdf"]["failures"] == 1
+
+
+def test_text_decoding_fallbacks():
+    """UTF-8 (BOM stripped), then GBK, then Latin-1."""
+    assert decode_text("﻿Hello ✓\n".encode("utf-8")) == "Hello ✓"
+    assert decode_text("中文".encode("gbk")) == "中文"
+    assert decode_text(b"caf\xe9 \xff") == "café ÿ"
+
+
+def test_buffer_reader_reads_in_place():
+    """Reads and seeks work on a bytearray without copying it up front."""
+    data = bytearray(b"0123456789")
+    reader = io.BufferedReader(BufferReader(data))
+
+    assert reader.read(3) == b"012"
+    reader.seek(-2, io.SEEK_END)
+    assert reader.read() == b"89"
+    reader.close()
+    data.extend(b"!")  # The buffer can be resized once the reader is closed
@@ -0,0 +1,124 @@
+"""Tests for request hedging."""
+import asyncio
+
+import pytest
+
+from app.services.hedging import Hedger, LatencyTracker
+
+
+def _warm(hedger: Hedger, seconds: float, count: int = 20) -> None:
+    for _ in range(count):
+        hedger.latencies.record(seconds)
+    hedger.requests = 100  # Leave room in the hedge budget
+
+
+def test_percentile():
+    """Percentiles use nearest-rank over the window."""
+    tracker = LatencyTracker()
+    for value in range(1, 101):
+        tracker.record(value)
+    assert tracker.percentile(95) == 95
+    assert tracker.percentile(50) == 50
+
+
+def test_no_hedge_without_enough_samples():
+    """Hedging waits until latency data is available."""
+    hedger = Hedger(enabled=True, min_samples=5)
+    assert hedger.threshold() is None
+
+
+def test_slow_primary_is_hedged_and_loser_cancelled():
+    """A slow primary gets a duplicate; the faster result wins."""
+    hedger = Hedger(enabled=True, min_delay=0.01, min_samples=1)
+    _warm(hedger, 0.01)
+    calls = []
+    cancelled = []
+
+    async def attempt():
+        index = len(calls)
+        calls.append(index)
+        try:
+            await asyncio.sleep(1.0 if index == 0 else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(index)
+            raise
+        return index
+
+    assert asyncio.run(hedger.run(attempt)) == 1
+    assert cancelled == [0]
+    assert hedger.stats()["hedges"] == 1
+    assert hedger.stats()["hedgeWins"] == 1
+
+
+def test_hedge_budget_is_respected():
+    """No hedge is sent when the budget is exhausted."""
+    hedger = Hedger(enabled=True, budget=0.05, min_delay=0.01, min_samples=1)
+    _warm(hedger, 0.01)
+    hedger.requests = 0
+
+    async def attempt():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    assert asyncio.run(hedger.run(attempt)) == "ok"
+    assert hedger.stats()["hedges"] == 0
+    assert hedger.stats()["skippedBudget"] == 1
+
+
+def test_hedge_needs_admission():
+    """No hedge is sent when ``admit`` refuses it (e.g. no rate limit room)."""
+    hedger = Hedger(enabled=True, min_delay=0.01, min_samples=1)
+    _warm(hedger, 0.01)
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    assert asyncio.run(hedger.run(attempt, admit=lambda: False)) == "ok"
+    assert len(calls) == 1
+    assert hedger.stats()["skippedAdmission"] == 1
+
+
+def test_only_successful_results_are_timed():
+    """Error results do not become latency samples."""
+    hedger = Hedger()
+
+    async def attempt():
+        return 503
+
+    asyncio.run(hedger.run(attempt, is_success=lambda status: status < 500))
+
+    assert len(hedger.latencies) == 0
+
+
+def test_failed_attempt_falls_back_to_other():
+    """If one attempt fails the other attempt's result is used."""
+    hedger = Hedger(enabled=True, min_delay=0.01, min_samples=1)
+    _warm(hedger, 0.01)
+    calls = []
+
+    async def attempt():
+        index = len(calls)
+        calls.append(index)
+        if index == 0:
+            await asyncio.sleep(0.05)
+            raise RuntimeError("primary failed")
+        await asyncio.sleep(0.1)
+        return "hedge"
+
+    assert asyncio.run(hedger.run(attempt)) == "hedge"
+
+
+def test_both_failing_raises():
+    """When both attempts fail the error is raised."""
+    hedger = Hedger(enabled=True, min_delay=0.01, min_samples=1)
+    _warm(hedger, 0.01)
+
+    async def attempt():
+        await asyncio.sleep(0.02)
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(hedger.run(attempt))
@@ -0,0 +1,20 @@
+"""Tests for the shared upstream HTTP client."""
+import asyncio
+
+from app.services import http_client
+
+
+def test_get_http_client_is_shared():
+    """The same pooled client is returned until it is closed."""
+    client = http_client.get_http_client()
+    assert http_client.get_http_client() is client
+
+    asyncio.run(http_client.close_http_client())
+    assert client.is_closed
+    assert http_client.get_http_client() is not client
+    asyncio.run(http_client.close_http_client())
+
+
+def test_warm_up_disabled():
+    """Warm-up is skipped when no connections are requested."""
+    assert asyncio.run(http_client.warm_up("https://example.invalid/v1", 0)) == 0
@@ -0,0 +1,51 @@
+"""Tests for the humanize API routes against a fake upstream."""
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def client(upstream):
+    from app.api import humanize
+
+    app = FastAPI()
+    app.include_router(humanize.router)
+    return TestClient(app)
+
+
+def _item(text: str) -> dict:
+    return {
+        "source": {"mode": "text", "text": text},
+        "params": {"length": "Normal", "similarity": "Moderate", "style": "Neutral"},
+    }
+
+
+def test_batch_streams_results_and_errors_per_item(client, upstream):
+    """Each item yields its own NDJSON line; failures do not fail the batch."""
+
+    def handler(request):
+        content = json.loads(request.content)["messages"][-1]["content"]
+        if "FAIL" in content:
+            return httpx.Response(400, json={"error": {"message": "rejected"}})
+        return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+    upstream.handler = handler
+    items = [_item("a" * 300), _item("FAIL" + "b" * 300), _item("c" * 300)]
+
+    response = client.post("/api/v1/humanize/batch", json={"items": items})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    by_index = {line["index"]: line for line in lines}
+    assert sorted(by_index) == [0, 1, 2]
+    assert by_index[0]["result"]["content"] == "ok"
+    assert "rejected" in by_index[1]["error"]
+
+
+def test_batch_rejects_empty_list(client):
+    """An empty batch is a validation error."""
+    assert client.post("/api/v1/humanize/batch", json={"items": []}).status_code == 422
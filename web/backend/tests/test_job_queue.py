@@ -0,0 +1,186 @@
+"""Tests for the SQLite job store and runner."""
+import asyncio
+import time
+
+import pytest
+
+from app.services.job_queue import FAILED, QUEUED, RUNNING, SUCCEEDED, JobRunner, JobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(tmp_path / "jobs.db", stale_seconds=60, max_attempts=2)
+
+
+def test_claim_is_exclusive_and_fifo(store):
+    first = store.submit("echo", {"n": 1})
+    second = store.submit("echo", {"n": 2})
+
+    assert store.claim("a", ["echo"]).id == first.id
+    assert store.claim("b", ["echo"]).id == second.id
+    assert store.claim("c", ["echo"]) is None
+    assert store.get(first.id).status == RUNNING
+
+
+def test_claim_only_takes_registered_kinds(store):
+    store.submit("other", {})
+
+    assert store.claim("a", ["echo"]) is None
+
+
+def test_abandoned_job_is_retried_then_failed(store):
+    job = store.submit("echo", {})
+    store.claim("dead-worker", ["echo"])
+    store._execute("UPDATE jobs SET updated_at = ?", (time.time() - 120,))
+
+    retried = store.claim("b", ["echo"])
+    assert (retried.id, retried.attempts) == (job.id, 2)
+
+    store._execute("UPDATE jobs SET updated_at = ?", (time.time() - 120,))
+    assert store.claim("c", ["echo"]) is None
+    assert store.fail_abandoned() == 1
+    assert store.get(job.id).status == FAILED
+
+
+def test_only_the_current_holder_can_finish_a_job(store):
+    """A worker whose job was reclaimed cannot overwrite the new attempt."""
+    job = store.submit("echo", {})
+    store.claim("slow-worker", ["echo"])
+    store._execute("UPDATE jobs SET updated_at = ?", (time.time() - 120,))
+    store.claim("b", ["echo"])
+
+    assert not store.fail(job.id, "slow-worker", "late failure")
+    assert store.get(job.id).status == RUNNING
+    assert store.complete(job.id, "b", {"ok": True})
+    assert not store.complete(job.id, "b", {"ok": False})
+    assert store.get(job.id).result == {"ok": True}
+
+
+def test_purge_removes_old_finished_jobs(store):
+    job = store.submit("echo", {})
+    store.claim("a", ["echo"])
+    store.complete(job.id, "a", {"ok": True})
+    store._execute("UPDATE jobs SET finished_at = ?", (time.time() - 100,))
+
+    assert store.purge(older_than=50) == 1
+    assert store.get(job.id) is None
+
+
+def test_runner_executes_jobs_with_progress(store):
+    runner = JobRunner(store, concurrency=2, poll_interval=0.01)
+    seen = []
+
+    async def echo(payload, report):
+        await report(0.5, "Halfway")
+        seen.append(store.get(job_ids[payload["n"] - 1]).progress)
+        if payload.get("fail"):
+            raise ValueError("bad input")
+        return {"echo": payload["n"]}
+
+    runner.register("echo", echo)
+    job_ids = []
+
+    async def main():
+        # Both jobs are queued before any runs, so handlers can look up their IDs
+        job_ids.append((await runner.submit("echo", {"n": 1})).id)
+        job_ids.append((await runner.submit("echo", {"n": 2, "fail": True})).id)
+        runner.start()
+        for _ in range(200):
+            jobs = [await runner.get(job_id) for job_id in job_ids]
+            if all(job.finished for job in jobs):
+                break
+            await asyncio.sleep(0.01)
+        await runner.stop()
+        return jobs
+
+    done, failed = asyncio.run(main())
+
+    assert (done.status, done.result, done.progress) == (SUCCEEDED, {"echo": 1}, 1.0)
+    assert (failed.status, failed.error) == (FAILED, "bad input")
+    assert seen == [0.5, 0.5]
+    assert runner.stats()["completed"] == 1
+
+
+def test_stop_requeues_running_jobs(store):
+    runner = JobRunner(store, concurrency=1, poll_interval=0.01)
+    started = []
+
+    async def slow(payload, report):
+        started.append(True)
+        await asyncio.sleep(10)
+        return {}
+
+    runner.register("slow", slow)
+
+    async def main():
+        runner.start()
+        job = await runner.submit("slow", {})
+        while not started:
+            await asyncio.sleep(0.01)
+        await runner.stop()
+        return job
+
+    job = asyncio.run(main())
+
+    requeued = store.get(job.id)
+    assert (requeued.status, requeued.attempts) == (QUEUED, 0)
+
+
+def test_overrunning_job_is_failed(store):
+    """A handler past the job timeout is cancelled and its job failed."""
+    runner = JobRunner(store, concurrency=1, poll_interval=0.01, job_timeout=0.05)
+
+    async def hang(payload, report):
+        await asyncio.sleep(10)
+        return {}
+
+    runner.register("hang", hang)
+
+    async def main():
+        job = await runner.submit("hang", {})
+        await runner.run_job(store.claim(runner.worker_id, ["hang"]))
+        return job
+
+    job = store.get(asyncio.run(main()).id)
+
+    assert (job.status, job.error) == (FAILED, "Job timed out after 0.05s")
+    assert runner.stats()["failed"] == 1
+
+
+def test_database_error_on_complete_keeps_the_consumer_running(store, monkeypatch):
+    """A failed write is logged; the consumer goes on to the next job."""
+    import sqlite3
+
+    runner = JobRunner(store, concurrency=1, poll_interval=0.01)
+    runner.register("echo", lambda payload, report: asyncio.sleep(0, {"n": payload["n"]}))
+    complete = store.complete
+    calls = []
+
+    def flaky_complete(*args):
+        calls.append(args[0])
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return complete(*args)
+
+    monkeypatch.setattr(store, "complete", flaky_complete)
+
+    async def main():
+        first = await runner.submit("echo", {"n": 1})
+        second = await runner.submit("echo", {"n": 2})
+        runner.start()
+        for _ in range(200):
+            if (await runner.get(second.id)).finished:
+                break
+            await asyncio.sleep(0.01)
+        await runner.stop()
+        return first, second
+
+    first, second = asyncio.run(main())
+
+    assert store.get(second.id).status == SUCCEEDED
+    assert store.get(first.id).status == RUNNING  # Left for the stale-job reclaim
+
+
+def test_submit_rejects_unknown_kind(store):
+    with pytest.raises(ValueError, match="Unknown job kind"):
+        asyncio.run(JobRunner(store).submit("missing", {}))
@@ -0,0 +1,91 @@
+"""Tests for the background job routes."""
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services.job_queue import JobRunner, JobStore
+from app.services.upload_store import UploadStore
+
+PARAMS = {"length": "Normal", "similarity": "Moderate", "style": "Neutral"}
+
+
+@pytest.fixture
+def client(upstream, monkeypatch, tmp_path):
+    from app.api import humanize_file, jobs
+
+    store = UploadStore(tmp_path / "uploads")
+    monkeypatch.setattr(humanize_file, "upload_store", store)
+    monkeypatch.setattr(jobs, "upload_store", store)
+    monkeypatch.setattr(jobs.settings, "job_poll_interval", 0.01)
+
+    runner = JobRunner(JobStore(tmp_path / "jobs.db"), concurrency=1, poll_interval=0.01)
+    runner.register(jobs.HUMANIZE_FILE_JOB, jobs._run_humanize_file)
+    monkeypatch.setattr(jobs, "job_runner", runner)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        runner.start()
+        yield
+        await runner.stop()
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(jobs.router)
+    with TestClient(app) as client:
+        client.file_id = store.put("notes.txt", b"Some uploaded text.").file_id
+        yield client
+
+
+def _stream_reply(request):
+    body = (
+        'data: {"choices":[{"delta":{"content":"Rewritten "}}]}\n\n'
+        'data: {"choices":[{"delta":{"content":"text."}}]}\n\n'
+        "data: [DONE]\n\n"
+    )
+    return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+
+def test_submit_returns_immediately_and_events_carry_result(client, upstream):
+    upstream.handler = _stream_reply
+
+    submitted = client.post(
+        "/api/v1/jobs/humanize-file",
+        json={"file_id": client.file_id, "text": "Some uploaded text.", "params": PARAMS},
+    )
+    assert submitted.status_code == 202
+    job_id = submitted.json()["jobId"]
+    assert submitted.json()["status"] == "queued"
+
+    events = client.get(f"/api/v1/jobs/{job_id}/events").text
+    assert "event: done" in events
+
+    job = client.get(f"/api/v1/jobs/{job_id}").json()
+    assert job["status"] == "succeeded"
+    assert job["progress"] == 1.0
+    assert job["result"]["content"] == "Rewritten text."
+
+
+def test_failed_job_reports_error(client, upstream):
+    upstream.handler = lambda request: httpx.Response(400, json={"error": {"message": "bad request"}})
+
+    job_id = client.post(
+        "/api/v1/jobs/humanize-file",
+        json={"file_id": client.file_id, "text": "Some uploaded text.", "params": PARAMS},
+    ).json()["jobId"]
+
+    assert "event: error" in client.get(f"/api/v1/jobs/{job_id}/events").text
+    job = client.get(f"/api/v1/jobs/{job_id}").json()
+    assert job["status"] == "failed"
+    assert "bad request" in job["error"]
+
+
+def test_unknown_file_and_job_ids(client):
+    missing_file = client.post(
+        "/api/v1/jobs/humanize-file",
+        json={"file_id": "0" * 64, "text": "x", "params": PARAMS},
+    )
+
+    assert missing_file.status_code == 404
+    assert client.get("/api/v1/jobs/nope").status_code == 404
@@ -0,0 +1,37 @@
+"""Tests for the application lifespan."""
+import asyncio
+
+import pytest
+
+from app.config import settings
+
+
+def test_failed_startup_stops_what_already_started(monkeypatch):
+    monkeypatch.setattr(settings, "openai_api_key", "sk-test")
+    from app import main
+
+    calls = []
+
+    async def init_http_client():
+        calls.append("http start")
+
+    async def close_http_client():
+        calls.append("http close")
+
+    def fail_job_runner():
+        raise RuntimeError("job runner failed")
+
+    monkeypatch.setattr(main, "init_http_client", init_http_client)
+    monkeypatch.setattr(main, "close_http_client", close_http_client)
+    monkeypatch.setattr(main.extraction_pool, "workers", 1)
+    monkeypatch.setattr(main.extraction_pool, "start", lambda: calls.append("pool start"))
+    monkeypatch.setattr(main.extraction_pool, "shutdown", lambda: calls.append("pool stop"))
+    monkeypatch.setattr(main.job_runner, "start", fail_job_runner)
+
+    async def run():
+        async with main.lifespan(main.app):
+            pass
+
+    with pytest.raises(RuntimeError, match="job runner failed"):
+        asyncio.run(run())
+    assert calls == ["http start", "pool start", "pool stop", "http close"]
@@ -0,0 +1,48 @@
+"""Tests for ASGI middleware."""
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.middleware import BodySizeLimitMiddleware
+
+
+def _client(limit: int) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(BodySizeLimitMiddleware, max_body_size=limit, path_prefixes=("/upload",))
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        return {"size": len(await request.body())}
+
+    @app.post("/other")
+    async def other(request: Request):
+        return {"size": len(await request.body())}
+
+    return TestClient(app)
+
+
+def test_small_bodies_pass_through():
+    """Bodies within the limit reach the endpoint."""
+    assert _client(100).post("/upload", content=b"x" * 50).json() == {"size": 50}
+
+
+def test_content_length_over_limit_is_rejected():
+    """A too-large Content-Length is rejected with 413."""
+    response = _client(100).post("/upload", content=b"x" * 200)
+
+    assert response.status_code == 413
+
+
+def test_chunked_body_over_limit_is_rejected():
+    """Bodies without Content-Length are counted as they arrive."""
+    def body():
+        for _ in range(10):
+            yield b"x" * 50
+
+    response = _client(100).post("/upload", content=body())
+
+    assert response.status_code == 413
+
+
+def test_other_paths_are_not_limited():
+    """The limit only applies to the configured path prefixes."""
+    assert _client(100).post("/other", content=b"x" * 200).status_code == 200
@@ -0,0 +1,278 @@
+"""Tests for the OpenAI humanize service against a fake upstream."""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services.openai_service import OpenAIService
+
+
+def _completion(content: str) -> httpx.Response:
+    return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+
+def _collect(agen):
+    async def _run():
+        return [event async for event in agen]
+
+    return asyncio.run(_run())
+
+
+def test_humanize_single_request(upstream):
+    """Short text is rewritten with one upstream call."""
+    upstream.handler = lambda request: _completion(" Rewritten. ")
+
+    result = asyncio.run(OpenAIService().humanize("Some text.", "Normal", "Moderate", "Neutral"))
+
+    assert result["content"] == "Rewritten."
+    assert result["chars"] == len("Rewritten.")
+    assert len(upstream.requests) == 1
+
+
+def test_humanize_long_text_is_chunked(upstream, monkeypatch):
+    """Long text is split into chunks and reassembled in order."""
+    monkeypatch.setattr(settings, "humanize_chunk_tokens", 100)
+    paragraphs = [f"Paragraph {i}. " + "Filler sentence. " * 4 for i in range(6)]
+
+    def handler(request):
+        prompt = json.loads(request.content)["messages"][-1]["content"]
+        index = prompt.split("Paragraph ")[1].split(".")[0]
+        return _completion(f"P{index}")
+
+    upstream.handler = handler
+    result = asyncio.run(
+        OpenAIService().humanize("\n\n".join(paragraphs), "Normal", "Moderate", "Neutral")
+    )
+
+    assert len(upstream.requests) > 1
+    indices = [part[1:] for part in result["content"].split("\n\n")]
+    assert indices == sorted(indices, key=int)
+
+
+def test_humanize_stream_emits_deltas_then_done(upstream):
+    """Streaming yields upstream deltas followed by a final result."""
+    body = "".join(
+        f"data: {json.dumps({'choices': [{'delta': {'content': piece}}]})}\n\n"
+        for piece in ["Hel", "lo"]
+    ) + "data: [DONE]\n\n"
+    upstream.handler = lambda request: httpx.Response(200, content=body.encode())
+
+    events = _collect(OpenAIService().humanize_stream("Some text.", "Normal", "Moderate", "Neutral"))
+
+    assert [e["content"] for e in events if e["event"] == "delta"] == ["Hel", "lo"]
+    assert events[-1]["event"] == "done"
+    assert events[-1]["result"]["content"] == "Hello"
+    assert json.loads(upstream.requests[0].content)["stream"] is True
+
+
+def test_upstream_error_becomes_value_error(upstream):
+    """Upstream HTTP errors surface as ValueError with the API message."""
+    upstream.handler = lambda request: httpx.Response(
+        400, json={"error": {"message": "bad request"}}
+    )
+
+    with pytest.raises(ValueError, match="bad request"):
+        asyncio.run(OpenAIService().humanize("Some text.", "Normal", "Moderate", "Neutral"))
+
+
+def test_repeat_request_is_served_from_cache(upstream):
+    """An identical request does not reach the upstream twice."""
+    upstream.handler = lambda request: _completion("Rewritten.")
+    service = OpenAIService()
+
+    first = asyncio.run(service.humanize("Some text.", "Normal", "Moderate", "Neutral"))
+    second = asyncio.run(service.humanize("Some  text.", "Normal", "Moderate", "Neutral"))
+    asyncio.run(service.humanize("Some text.", "Normal", "Moderate", "Neutral", use_cache=False))
+
+    assert second["content"] == first["content"]
+    assert len(upstream.requests) == 2
+
+
+def test_rate_limited_request_is_requeued(upstream):
+    """A transient 429 is retried after the advertised reset."""
+    responses = iter([
+        httpx.Response(429, headers={"retry-after": "0.01"}, json={"error": {"code": "rate_limit_exceeded"}}),
+        _completion("Rewritten."),
+    ])
+    upstream.handler = lambda request: next(responses)
+
+    result = asyncio.run(OpenAIService().humanize("Some text.", "Normal", "Moderate", "Neutral"))
+
+    assert result["content"] == "Rewritten."
+    assert len(upstream.requests) == 2
+
+
+def test_transient_errors_are_retried(upstream):
+    """Connection errors and 5xx responses are retried with backoff."""
+    responses = iter([
+        httpx.ConnectError("boom"),
+        httpx.Response(503, json={"error": {"message": "overloaded"}}),
+        _completion("Rewritten."),
+    ])
+
+    def handler(request):
+        response = next(responses)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    upstream.handler = handler
+    result = asyncio.run(OpenAIService().humanize("Some text.", "Normal", "Moderate", "Neutral"))
+
+    assert result["content"] == "Rewritten."
+    assert len(upstream.requests) == 3
+
+
+def test_client_errors_are_not_retried(upstream):
+    """A 4xx other than 429 fails immediately."""
+    upstream.handler = lambda request: httpx.Response(401, json={"error": {"message": "bad key"}})
+
+    with pytest.raises(ValueError, match="bad key"):
+        asyncio.run(OpenAIService().humanize("Some text.", "Normal", "Moderate", "Neutral"))
+    assert len(upstream.requests) == 1
+
+
+def test_open_circuit_fails_fast(upstream):
+    """Once the circuit opens, requests are rejected without calling upstream."""
+    upstream.handler = lambda request: httpx.Response(500, json={"error": {"message": "down"}})
+    service = OpenAIService()
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            asyncio.run(service.humanize("Some text.", "Normal", "Moderate", "Neutral", use_cache=False))
+    calls = len(upstream.requests)
+
+    with pytest.raises(ValueError, match="temporarily unavailable"):
+        asyncio.run(service.humanize("Other text.", "Normal", "Moderate", "Neutral"))
+    assert len(upstream.requests) == calls
+
+
+def test_probe_without_outcome_frees_half_open_circuit(upstream, monkeypatch):
+    """A half-open probe answered with a non-retryable 429 does not block later calls."""
+    import time
+
+    from app.services import openai_service
+    from app.services.resilience import CircuitBreaker
+
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.01)
+    monkeypatch.setattr(openai_service, "openai_breaker", breaker)
+    breaker.record_failure()
+    time.sleep(0.02)
+    replies = iter([
+        httpx.Response(429, json={"error": {"code": "insufficient_quota", "message": "quota"}}),
+        _completion("Recovered."),
+    ])
+    upstream.handler = lambda request: next(replies)
+    service = OpenAIService()
+
+    with pytest.raises(ValueError, match="quota"):
+        asyncio.run(service.humanize("Some text.", "Normal", "Moderate", "Neutral", use_cache=False))
+    result = asyncio.run(service.humanize("Other text.", "Normal", "Moderate", "Neutral"))
+
+    assert result["content"] == "Recovered."
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_identical_concurrent_requests_are_coalesced(upstream, monkeypatch):
+    """Concurrent identical requests share one upstream call."""
+    monkeypatch.setattr(settings, "result_cache_enabled", False)
+    upstream.handler = lambda request: _completion("Rewritten.")
+    service = OpenAIService()
+
+    async def main():
+        return await asyncio.gather(*[
+            service.humanize("Some text.", "Normal", "Moderate", "Neutral") for _ in range(3)
+        ])
+
+    results = asyncio.run(main())
+
+    assert [r["content"] for r in results] == ["Rewritten."] * 3
+    assert len(upstream.requests) == 1
+
+
+def test_max_tokens_follows_input_size(upstream):
+    """Short inputs request a tight completion budget rather than the full cap."""
+    upstream.handler = lambda request: _completion("Rewritten.")
+
+    asyncio.run(OpenAIService().humanize("Some text.", "Normal", "Moderate", "Neutral"))
+
+    assert json.loads(upstream.requests[0].content)["max_tokens"] < OpenAIService.MAX_OUTPUT_TOKENS
+
+
+def test_budget_uses_exact_token_count(upstream, monkeypatch):
+    """The budget is sized from real tokens, not the byte upper bound."""
+    import math
+
+    import tiktoken
+
+    from app.services import openai_service
+    from app.services.output_budget import OUTPUT_SLACK_TOKENS, OutputBudgetEstimator
+
+    merged = tiktoken.Encoding(
+        name="test_pairs",
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={**{bytes([i]): i for i in range(256)}, b"ab": 256},
+        special_tokens={},
+    )
+    monkeypatch.setattr(tiktoken, "encoding_for_model", lambda model: merged)
+    monkeypatch.setattr(openai_service, "output_budget", OutputBudgetEstimator(min_output_tokens=1))
+    upstream.handler = lambda request: _completion("Rewritten.")
+    text = " ".join(["ab"] * 300)  # 599 tokens, 899 bytes
+
+    asyncio.run(OpenAIService().humanize(text, "Normal", "Moderate", "Neutral"))
+
+    expected = math.ceil(599 * 1.3) + OUTPUT_SLACK_TOKENS
+    assert json.loads(upstream.requests[0].content)["max_tokens"] == expected
+
+
+def test_file_mode_gets_the_full_output_cap(upstream, tmp_path):
+    """An attached file's length is unknown, so the budget is not sized from the empty text."""
+    path = tmp_path / "notes.txt"
+    path.write_bytes(b"A long document.")
+    upstream.handler = lambda request: _completion("Rewritten.")
+
+    asyncio.run(
+        OpenAIService().humanize(
+            "", "Normal", "Moderate", "Neutral", file_data={"filename": "notes.txt", "path": path}
+        )
+    )
+
+    body = json.loads(upstream.requests[0].content)
+    assert body.get("max_tokens", body.get("max_completion_tokens")) > 256
+
+
+def test_hedger_times_only_admitted_attempts(upstream, monkeypatch):
+    """Limiter waits and retry backoff are not counted as upstream latency."""
+    from app.services import openai_service
+
+    async def slow_acquire(cost):
+        await asyncio.sleep(0.2)
+
+    monkeypatch.setattr(openai_service.rate_limiter, "acquire", slow_acquire)
+    responses = iter([httpx.Response(503), _completion("Done.")])
+    upstream.handler = lambda request: next(responses)
+
+    asyncio.run(OpenAIService().humanize("Some text.", "Normal", "Moderate", "Neutral"))
+
+    hedger = openai_service.openai_hedger
+    assert hedger.requests == 2
+    assert len(hedger.latencies) == 1  # The 503 is not a latency sample
+    assert hedger.latencies.percentile(100) < 0.1
+
+
+def test_length_finish_reason_is_recorded_as_truncation(upstream, monkeypatch):
+    """A completion that stopped at max_tokens is counted as truncated."""
+    from app.services.output_budget import OutputBudgetEstimator
+
+    estimator = OutputBudgetEstimator()
+    monkeypatch.setattr("app.services.openai_service.output_budget", estimator)
+    upstream.handler = lambda request: httpx.Response(
+        200,
+        json={"choices": [{"message": {"content": "Cut"}, "finish_reason": "length"}]},
+    )
+
+    asyncio.run(OpenAIService().humanize("Some text.", "Normal", "Moderate", "Neutral"))
+
+    assert estimator.truncations == 1
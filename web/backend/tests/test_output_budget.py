@@ -0,0 +1,49 @@
+"""Tests for output budget estimation."""
+from app.services.output_budget import OutputBudgetEstimator
+
+
+def test_budget_scales_with_input_and_length():
+    """Longer inputs and Expanded output get larger budgets."""
+    estimator = OutputBudgetEstimator(max_output_tokens=4000, min_output_tokens=100)
+
+    small = estimator.estimate(200, "Normal")
+    large = estimator.estimate(1000, "Normal")
+    expanded = estimator.estimate(1000, "Expanded")
+    concise = estimator.estimate(1000, "Concise")
+
+    assert small.max_tokens < large.max_tokens
+    assert concise.max_tokens < large.max_tokens < expanded.max_tokens
+    assert small.timeout < large.timeout
+
+
+def test_budget_has_a_floor_and_a_cap():
+    """Tiny inputs get the minimum budget; huge ones are capped and flagged."""
+    estimator = OutputBudgetEstimator(max_output_tokens=4000, min_output_tokens=256, max_timeout=60)
+
+    tiny = estimator.estimate(5, "Normal")
+    huge = estimator.estimate(10000, "Expanded")
+
+    assert tiny.max_tokens == 256
+    assert not tiny.exceeds_cap
+    assert huge.max_tokens == 4000
+    assert huge.exceeds_cap
+    assert huge.timeout == 60
+
+
+def test_truncations_are_counted():
+    """Completions cut off at max_tokens show up in the stats."""
+    estimator = OutputBudgetEstimator()
+
+    estimator.record_truncation("openai", 256)
+
+    assert estimator.stats()["truncations"] == 1
+
+
+def test_max_input_tokens_fits_the_cap():
+    """Inputs up to ``max_input_tokens`` never exceed the output cap."""
+    estimator = OutputBudgetEstimator(max_output_tokens=4000)
+
+    for length in ("Concise", "Normal", "Expanded"):
+        limit = estimator.max_input_tokens(length)
+        assert not estimator.estimate(limit, length).exceeds_cap
+        assert estimator.estimate(limit + 10, length).exceeds_cap
@@ -0,0 +1,120 @@
+"""Tests for page-parallel PDF extraction."""
+import asyncio
+
+import pytest
+
+from app.services.document_parser import DocumentParserService
+from app.services.extraction_pool import ExtractionPool, split_ranges
+from app.services.file_processor import FileProcessor
+from app.services.pdf_extractor import PdfExtractor
+
+PAGES = [f"Page {i} text" for i in range(1, 8)]
+
+
+@pytest.fixture
+def pdf_path(tmp_path, make_pdf):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(make_pdf(PAGES))
+    return str(path)
+
+
+def test_split_ranges_cover_every_page_once():
+    assert split_ranges(7, 3) == [(0, 3), (3, 6), (6, 7)]
+    assert split_ranges(0, 3) == []
+
+
+def test_serial_extractors_join_pages(pdf_path):
+    """The synchronous extractors keep one line per page, in order."""
+    expected = "\n".join(PAGES)
+
+    assert FileProcessor.extract_text_from_pdf(pdf_path) == expected
+    with open(pdf_path, "rb") as f:
+        assert DocumentParserService().parse_pdf(f) == expected
+
+
+def test_parallel_extraction_preserves_order(pdf_path):
+    """Ranges finishing out of order are still assembled in page order."""
+    extractor = PdfExtractor(ExtractionPool(workers=0), pages_per_job=2)
+
+    async def main():
+        pages = [page async for page in extractor.stream_pages(pdf_path)]
+        return pages, await extractor.extract(pdf_path)
+
+    pages, text = asyncio.run(main())
+
+    assert pages == list(enumerate(PAGES))
+    assert text == "\n".join(PAGES)
+
+
+def test_parallel_extraction_in_worker_processes(pdf_path):
+    pool = ExtractionPool(workers=2, timeout=30)
+    pool.start()
+    try:
+        text = asyncio.run(PdfExtractor(pool, pages_per_job=3).extract(pdf_path))
+    finally:
+        pool.shutdown()
+
+    assert text == "\n".join(PAGES)
+    assert pool.stats()["completed"] == 4  # page count + three ranges
+
+
+def test_invalid_pdf_raises_value_error(tmp_path):
+    path = tmp_path / "broken.pdf"
+    path.write_bytes(b"not a pdf")
+    extractor = PdfExtractor(ExtractionPool(workers=0))
+
+    with pytest.raises(ValueError, match="Failed to extract text from PDF"):
+        asyncio.run(extractor.extract(str(path)))
+
+
+def test_budget_stops_without_parsing_remaining_pages(pdf_path, monkeypatch):
+    """Once the budget is reached no further page ranges are extracted."""
+    pool = ExtractionPool(workers=0)
+    jobs = []
+    run = pool.run
+
+    async def recording_run(func, *args, **kwargs):
+        jobs.append((func.__name__, args[1:]))
+        return await run(func, *args, **kwargs)
+
+    monkeypatch.setattr(pool, "run", recording_run)
+    extractor = PdfExtractor(pool, pages_per_job=2)
+
+    result = asyncio.run(extractor.extract_within_budget(pdf_path, token_budget=20, count_tokens=len))
+
+    assert result.text == "Page 1 text\nPage 2 text"
+    assert (result.page_count, result.end_page, result.stop_reason) == (7, 2, "token_budget")
+    assert jobs == [("pdf_page_count", ()), ("extract_pdf_pages", (0, 2))]
+
+
+def test_budget_stop_keeps_worker_processes(pdf_path):
+    """Look-ahead ranges dropped at the budget finish in their workers instead of killing them."""
+    pool = ExtractionPool(workers=2, timeout=30)
+    pool.start()
+    extractor = PdfExtractor(pool, pages_per_job=2)
+
+    async def main():
+        result = await extractor.extract_within_budget(pdf_path, token_budget=20, count_tokens=len)
+        while pool.busy:
+            await asyncio.sleep(0.01)
+        return result
+
+    try:
+        result = asyncio.run(main())
+    finally:
+        pool.shutdown()
+
+    assert result.stop_reason == "token_budget"
+    assert pool.stats()["restarts"] == 0
+    assert pool.stats()["failed"] == 0
+
+
+def test_budget_not_reached_reads_whole_range(pdf_path):
+    extractor = PdfExtractor(ExtractionPool(workers=0), pages_per_job=2)
+
+    result = asyncio.run(
+        extractor.extract_within_budget(pdf_path, start_page=5, token_budget=1000, count_tokens=len)
+    )
+
+    assert result.text == "Page 6 text\nPage 7 text"
+    assert (result.start_page, result.end_page, result.stop_reason) == (5, 7, None)
@@ -0,0 +1,77 @@
+"""Tests for the streaming PPTX extractor."""
+import asyncio
+import io
+
+import pytest
+from pptx import Presentation
+from pptx.util import Inches
+
+from app.services.document_parser import DocumentParserService
+from app.services.extraction_pool import ExtractionPool
+from app.services.pptx_extractor import PptxExtractor, read_pptx_text
+
+
+def _deck_bytes(slides: int = 2) -> bytes:
+    deck = Presentation()
+    first = deck.slides.add_slide(deck.slide_layouts[1])
+    first.shapes.title.text = "Title"
+    first.placeholders[1].text = "Bullet a\nBullet b"
+    first.notes_slide.notes_text_frame.text = "Speaker note"
+
+    second = deck.slides.add_slide(deck.slide_layouts[6])
+    table = second.shapes.add_table(2, 2, Inches(1), Inches(1), Inches(4), Inches(2)).table
+    table.cell(0, 0).text = "Cell A"
+    table.cell(1, 1).text = "Cell D"
+    group = second.shapes.add_group_shape()
+    group.shapes.add_textbox(Inches(1), Inches(4), Inches(2), Inches(1)).text_frame.text = "Grouped"
+
+    for index in range(2, slides):
+        extra = deck.slides.add_slide(deck.slide_layouts[5])
+        extra.shapes.title.text = f"Slide {index + 1}"
+
+    buffer = io.BytesIO()
+    deck.save(buffer)
+    return buffer.getvalue()
+
+
+def test_tables_groups_and_notes_in_order():
+    text = read_pptx_text(io.BytesIO(_deck_bytes()))
+
+    assert text == "Title\nBullet a\nBullet b\nSpeaker note\nCell A\nCell D\nGrouped"
+
+
+def test_notes_can_be_excluded():
+    text = read_pptx_text(io.BytesIO(_deck_bytes()), include_notes=False)
+
+    assert "Speaker note" not in text
+
+
+def test_slide_order_follows_presentation_not_file_names():
+    deck = Presentation(io.BytesIO(_deck_bytes()))
+    slide_ids = deck.slides._sldIdLst
+    first = list(slide_ids)[0]
+    slide_ids.remove(first)
+    slide_ids.append(first)
+    buffer = io.BytesIO()
+    deck.save(buffer)
+
+    text = DocumentParserService().parse_pptx(io.BytesIO(buffer.getvalue()))
+
+    assert text.startswith("Cell A")
+    assert text.endswith("Speaker note")
+
+
+def test_parallel_slide_ranges_preserve_order(tmp_path):
+    path = tmp_path / "deck.pptx"
+    path.write_bytes(_deck_bytes(slides=7))
+    extractor = PptxExtractor(ExtractionPool(workers=0), slides_per_job=2)
+
+    text = asyncio.run(extractor.extract(str(path)))
+
+    assert text == read_pptx_text(str(path))
+    assert text.endswith("\n".join(f"Slide {i}" for i in range(3, 8)))
+
+
+def test_invalid_package_raises_value_error():
+    with pytest.raises(ValueError, match="Not a PPTX file"):
+        read_pptx_text(io.BytesIO(b"plain text"))
@@ -0,0 +1,33 @@
+"""Tests for versioned prompt templates."""
+from app.services.prompt_templates import PromptTemplates
+
+
+def test_static_prefix_is_shared_and_text_is_last():
+    """Requests with the same params share the system message; text goes last."""
+    templates = PromptTemplates()
+    first = templates.build_messages("First text", "Normal", "Moderate", "Academic")
+    second = templates.build_messages("Second text", "Normal", "Moderate", "Academic")
+
+    assert first[0] == second[0]
+    assert first[0]["role"] == "system"
+    assert "First text" not in first[0]["content"]
+    assert first[-1]["content"].endswith("First text")
+
+
+def test_custom_style_stays_out_of_the_prefix():
+    """Custom style text is request-specific and goes in the user message."""
+    templates = PromptTemplates()
+    messages = templates.build_messages("Text", "Normal", "Moderate", "Custom", "Pirate voice")
+
+    assert "Pirate voice" not in messages[0]["content"]
+    assert messages[1]["content"].index("Pirate voice") < messages[1]["content"].index("Text")
+
+
+def test_templates_are_precompiled_with_token_counts():
+    """Every combination is compiled up front with its prefix size."""
+    templates = PromptTemplates(count_tokens=len)
+    template = templates.get("Concise", "High", "Business")
+
+    assert template.prefix_tokens == len(template.system)
+    assert template.version == templates.version
+    assert templates.get("Unknown", "Unknown", "Unknown").style == "Neutral"
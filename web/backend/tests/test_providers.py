@@ -0,0 +1,180 @@
+"""Tests for completion providers and the provider router."""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services.gemini_service import GeminiService
+from app.services.openai_service import OpenAIService
+from app.services.providers import CompletionRequest, FakeProvider, ProviderRouter
+
+
+def _request(text: str = "Some text.") -> CompletionRequest:
+    return CompletionRequest(
+        messages=[
+            {"role": "system", "content": "Rewrite it."},
+            {"role": "user", "content": f"Original text:\n{text}"},
+        ],
+        max_tokens=100,
+    )
+
+
+def _collect(agen):
+    async def _run():
+        return [item async for item in agen]
+
+    return asyncio.run(_run())
+
+
+def test_router_prefers_fastest_provider():
+    """Once both providers have latency samples, the faster one goes first."""
+    slow = FakeProvider("slow", latency=0.02)
+    fast = FakeProvider("fast", latency=0.0)
+    router = ProviderRouter([slow, fast])
+    router.health["slow"].record_success(0.02)
+    router.health["fast"].record_success(0.001)
+
+    for _ in range(3):
+        asyncio.run(router.complete(_request()))
+
+    assert router.ranked()[0] is fast
+    assert fast.calls > slow.calls
+
+
+def test_router_fails_over_on_outage():
+    """A failing provider is skipped and the next one serves the request."""
+    down = FakeProvider("down", fail=True)
+    backup = FakeProvider("backup")
+    router = ProviderRouter([down, backup], min_samples=1)
+
+    assert asyncio.run(router.complete(_request("Hello."))) == "Hello."
+    assert router.failovers == 1
+    # The failed provider is now unhealthy and tried last
+    assert router.ranked()[0] is backup
+
+
+def test_router_raises_when_all_providers_fail():
+    """The last error is raised when no provider succeeds."""
+    router = ProviderRouter([FakeProvider("a", fail=True), FakeProvider("b", fail=True)])
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(router.complete(_request()))
+
+
+def test_router_does_not_fail_over_on_rejected_request():
+    """A 4xx or validation error is raised as is and not counted against the provider."""
+
+    def reject(request):
+        raise ValueError("Prompt is too long")
+
+    primary = FakeProvider("primary", reply=reject)
+    backup = FakeProvider("backup")
+    router = ProviderRouter([primary, backup])
+
+    with pytest.raises(ValueError, match="too long"):
+        asyncio.run(router.complete(_request()))
+
+    assert backup.calls == 0
+    assert router.failovers == 0
+    assert router.health["primary"].failures == 0
+
+
+def test_router_fails_over_when_local_rate_limit_is_saturated():
+    """A rate limiter rejection on the primary is served by the backup."""
+    from app.services.rate_limiter import RateLimitWaitExceeded
+
+    def saturated(request):
+        raise RateLimitWaitExceeded("Upstream rate limit reached")
+
+    router = ProviderRouter([FakeProvider("primary", reply=saturated), FakeProvider("backup")])
+
+    assert asyncio.run(router.complete(_request("Hello."))) == "Hello."
+    assert router.failovers == 1
+
+
+def test_unsampled_backup_keeps_its_configured_position():
+    """A provider without latency samples does not jump ahead of the primary."""
+    primary = FakeProvider("primary", latency=0.01)
+    backup = FakeProvider("backup")
+    router = ProviderRouter([primary, backup])
+
+    asyncio.run(router.complete(_request()))
+
+    assert router.ranked() == [primary, backup]
+    assert backup.calls == 0
+
+
+def test_stream_fails_over_before_first_delta():
+    """Streaming switches providers only if nothing has been emitted yet."""
+    router = ProviderRouter([FakeProvider("down", fail=True), FakeProvider("backup")])
+
+    assert "".join(_collect(router.stream(_request("Hello there.")))) == "Hello there."
+
+
+def test_gemini_provider_converts_messages(upstream, monkeypatch):
+    """Gemini receives a system instruction and user contents and returns text."""
+    monkeypatch.setattr(settings, "gemini_api_key", "g-test")
+    upstream.handler = lambda request: httpx.Response(
+        200, json={"candidates": [{"content": {"parts": [{"text": " Rewritten. "}]}}]}
+    )
+
+    result = asyncio.run(GeminiService().complete(_request()))
+
+    body = json.loads(upstream.requests[0].content)
+    assert result == "Rewritten."
+    assert body["systemInstruction"]["parts"][0]["text"] == "Rewrite it."
+    assert body["contents"][0]["role"] == "user"
+    assert upstream.requests[0].headers["x-goog-api-key"] == "g-test"
+
+
+def test_service_fails_over_from_openai_to_gemini(upstream, monkeypatch):
+    """An OpenAI outage is absorbed by routing to Gemini."""
+    monkeypatch.setattr(settings, "humanize_providers", "openai,gemini")
+    monkeypatch.setattr(settings, "gemini_api_key", "g-test")
+
+    def handler(request):
+        if "openai" in request.url.host:
+            return httpx.Response(503, json={"error": {"message": "overloaded"}})
+        return httpx.Response(
+            200, json={"candidates": [{"content": {"parts": [{"text": "From Gemini."}]}}]}
+        )
+
+    upstream.handler = handler
+    result = asyncio.run(OpenAIService().humanize("Some text.", "Normal", "Moderate", "Neutral"))
+
+    assert result["content"] == "From Gemini."
+
+
+def test_service_surfaces_client_errors_without_fail_over(upstream, monkeypatch):
+    """A 400 from OpenAI is returned to the caller instead of retried on Gemini."""
+    monkeypatch.setattr(settings, "humanize_providers", "openai,gemini")
+    monkeypatch.setattr(settings, "gemini_api_key", "g-test")
+    upstream.handler = lambda request: httpx.Response(
+        400, json={"error": {"message": "bad request"}}
+    )
+
+    with pytest.raises(ValueError, match="bad request"):
+        asyncio.run(OpenAIService().humanize("Some text.", "Normal", "Moderate", "Neutral"))
+
+    assert all("openai" in request.url.host for request in upstream.requests)
+
+
+def test_metrics_report_provider_configuration_errors(upstream, monkeypatch):
+    """A missing API key is reported in the metrics instead of failing the endpoint."""
+    from app.api import metrics
+
+    monkeypatch.setattr(settings, "openai_api_key", "")
+
+    assert "OPENAI_API_KEY" in metrics._provider_stats()["error"]
+
+
+def test_service_runs_offline_with_fake_provider(upstream, monkeypatch):
+    """The fake provider plugs into the service without any upstream calls."""
+    monkeypatch.setattr(settings, "humanize_providers", "fake")
+
+    result = asyncio.run(OpenAIService().humanize("Some text.", "Normal", "Moderate", "Neutral"))
+
+    assert result["content"] == "Some text."
+    assert upstream.requests == []
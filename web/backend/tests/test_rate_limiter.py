@@ -0,0 +1,99 @@
+"""Tests for the upstream rate-limit scheduler."""
+import asyncio
+import time
+
+import pytest
+
+from app.services.rate_limiter import (
+    RateLimitScheduler,
+    RateLimitWaitExceeded,
+    TokenBucket,
+    parse_duration,
+)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("1s", 1.0), ("6m0s", 360.0), ("20ms", 0.02), ("1h2m3.5s", 3723.5), ("7", 7.0), ("", None)],
+)
+def test_parse_duration(value, expected):
+    """OpenAI reset durations and Retry-After values are parsed to seconds."""
+    assert parse_duration(value) == expected
+
+
+def test_unknown_limits_never_block():
+    """With no configured or learned limits requests are admitted immediately."""
+    scheduler = RateLimitScheduler()
+    waited = asyncio.run(scheduler.acquire(1_000_000))
+    assert waited < 0.01
+    assert scheduler.stats()["admitted"] == 1
+
+
+def test_token_bucket_wait_time():
+    """An empty bucket reports the time needed to refill the requested amount."""
+    bucket = TokenBucket(600)  # 10 tokens per second
+    now = time.monotonic()
+    bucket.consume(600, now)
+    assert bucket.time_until(5, now) == pytest.approx(0.5)
+
+
+def test_requests_queue_until_bucket_refills():
+    """Requests beyond the per-minute budget wait instead of failing."""
+    scheduler = RateLimitScheduler(requests_per_minute=600, max_wait=5.0)  # 10 req/s
+    scheduler.requests.level = 1.0
+
+    async def run():
+        await asyncio.gather(scheduler.acquire(10), scheduler.acquire(10))
+
+    asyncio.run(run())
+    stats = scheduler.stats()
+    assert stats["admitted"] == 2
+    assert stats["delayed"] == 1
+    assert stats["maxWaitSeconds"] > 0.05
+
+
+def test_wait_beyond_max_is_rejected():
+    """A request that would queue too long is rejected."""
+    scheduler = RateLimitScheduler(tokens_per_minute=60, max_wait=0.1)
+    scheduler.tokens.level = 0.0
+    with pytest.raises(RateLimitWaitExceeded, match="rate limit"):
+        asyncio.run(scheduler.acquire(30))
+    assert scheduler.stats()["rejected"] == 1
+
+
+def test_try_acquire_never_waits():
+    """try_acquire admits only while there is room right now."""
+    scheduler = RateLimitScheduler(requests_per_minute=60)
+    scheduler.requests.level = 1.0
+
+    assert scheduler.try_acquire(10)
+    assert not scheduler.try_acquire(10)
+    assert scheduler.stats()["admitted"] == 1
+
+
+def test_headers_update_limits_and_remaining():
+    """Response headers set learned limits and current remaining budget."""
+    scheduler = RateLimitScheduler()
+    scheduler.update_from_headers(
+        {
+            "x-ratelimit-limit-requests": "500",
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-reset-requests": "120ms",
+            "x-ratelimit-limit-tokens": "200000",
+            "x-ratelimit-remaining-tokens": "150000",
+            "x-ratelimit-reset-tokens": "15s",
+        }
+    )
+    now = time.monotonic()
+    assert scheduler.requests.capacity == 500
+    assert 0 < scheduler.requests.time_until(1, now) <= 0.13
+    assert scheduler.tokens.time_until(100_000, now) == 0
+
+
+def test_rate_limited_response_pauses_admissions():
+    """A 429 blocks admissions for the Retry-After period."""
+    scheduler = RateLimitScheduler(max_wait=0.05)
+    assert scheduler.on_rate_limited({"retry-after": "2"}) == 2.0
+    with pytest.raises(ValueError):
+        asyncio.run(scheduler.acquire(1))
+    assert scheduler.stats()["throttled429"] == 1
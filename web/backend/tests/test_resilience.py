@@ -0,0 +1,73 @@
+"""Tests for retry backoff and the circuit breaker."""
+import time
+
+import pytest
+
+from app.services.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+
+def test_backoff_is_jittered_and_capped():
+    """Delays stay within the exponential ceiling and the global cap."""
+    policy = RetryPolicy(base_delay=0.5, max_delay=4.0)
+    for attempt in range(8):
+        delay = policy.delay(attempt)
+        assert 0 <= delay <= min(4.0, 0.5 * 2 ** attempt)
+
+
+def test_backoff_honors_retry_after():
+    """Retry-After is used as a lower bound (within the cap)."""
+    policy = RetryPolicy(base_delay=0.01, max_delay=10.0)
+    assert policy.delay(0, retry_after=3.0) >= 3.0
+    assert policy.delay(0, retry_after=60.0) == 10.0
+
+
+def test_breaker_opens_after_threshold():
+    """Consecutive failures open the circuit and calls fail fast."""
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=60)
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_breaker_half_open_probe():
+    """After the reset timeout one probe is allowed; success closes the circuit."""
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_failed_probe_reopens():
+    """A failed half-open probe opens the circuit again."""
+    breaker = CircuitBreaker("test", failure_threshold=5, reset_timeout=0.01)
+    for _ in range(5):
+        breaker.record_failure()
+    time.sleep(0.02)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_released_probe_lets_next_call_probe():
+    """A probe that ends without success or failure frees the half-open slot."""
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    breaker.before_call()
+    breaker.release()
+
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
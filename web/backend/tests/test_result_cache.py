@@ -0,0 +1,64 @@
+"""Tests for the humanize result cache."""
+from app.services.result_cache import ResultCache
+
+
+def _key(text="Some text", style="Neutral", custom=None):
+    return ResultCache.make_key(text, "Normal", "Moderate", style, custom, "gpt-4o-mini")
+
+
+def test_key_normalizes_whitespace():
+    """Whitespace-only differences map to the same key."""
+    assert _key("Some   text \r\n") == _key("Some text")
+    assert _key("Some\ntext") != _key("Some text")
+
+
+def test_custom_style_only_keys_custom_requests():
+    """customStyle is ignored unless the style is Custom."""
+    assert _key(style="Neutral", custom="x") == _key(style="Neutral")
+    assert _key(style="Custom", custom="x") != _key(style="Custom", custom="y")
+
+
+def test_hit_and_miss_counters():
+    """Lookups are counted as hits or misses."""
+    cache = ResultCache()
+    assert cache.get("k") is None
+    cache.put("k", {"content": "v", "chars": 1, "processingTime": 5})
+    assert cache.get("k")["content"] == "v"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction_by_entries():
+    """The least recently used key is evicted first."""
+    cache = ResultCache(max_entries=2)
+    cache.put("a", {"content": "a"})
+    cache.put("b", {"content": "b"})
+    cache.get("a")
+    cache.put("c", {"content": "c"})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+
+def test_byte_cap():
+    """Entries are evicted to stay under the byte budget."""
+    cache = ResultCache(max_bytes=1000)
+    cache.put("a", {"content": "x" * 600})
+    cache.put("b", {"content": "y" * 600})
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] <= 1000
+
+
+def test_ttl_expiry():
+    """Expired entries are treated as misses."""
+    cache = ResultCache(ttl_seconds=0)
+    cache.put("a", {"content": "a"})
+    assert cache.get("a") is None
+
+
+def test_variants_rotate():
+    """With several variants the key misses until full, then rotates."""
+    cache = ResultCache(max_variants=2)
+    cache.put("k", {"content": "one"})
+    assert cache.get("k") is None
+    cache.put("k", {"content": "two"})
+    assert [cache.get("k")["content"] for _ in range(3)] == ["one", "two", "one"]
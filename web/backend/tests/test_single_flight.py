@@ -0,0 +1,84 @@
+"""Tests for single-flight request coalescing."""
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    """Callers with the same key get one computation's result."""
+    flights = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*[flights.do("key", work) for _ in range(5)])
+
+    assert asyncio.run(main()) == ["result"] * 5
+    assert len(calls) == 1
+    assert flights.stats() == {"inFlight": 0, "leaders": 1, "coalesced": 4}
+
+
+def test_errors_reach_every_waiter():
+    """A failure is delivered to all callers, and the key is released."""
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    async def main():
+        return await asyncio.gather(
+            flights.do("key", work), flights.do("key", work), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flights.stats()["inFlight"] == 0
+
+
+def test_cancelled_waiter_does_not_cancel_others():
+    """One caller going away leaves the computation running for the rest."""
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "result"
+
+    async def main():
+        first = asyncio.ensure_future(flights.do("key", work))
+        second = asyncio.ensure_future(flights.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "result"
+
+
+def test_last_waiter_leaving_cancels_computation():
+    """With no callers left, the computation is cancelled."""
+    flights = SingleFlight()
+    cancelled = []
+
+    async def work():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def main():
+        waiter = asyncio.ensure_future(flights.do("key", work))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+    assert cancelled == [True]
@@ -0,0 +1,42 @@
+"""Tests for token-bounded text chunking."""
+import pytest
+
+from app.services.text_chunker import split_into_chunks
+
+
+def test_short_text_is_single_chunk(byte_encoding):
+    """Text under the budget is returned as one chunk."""
+    text = "A short paragraph."
+    chunks = split_into_chunks(text, byte_encoding.encode(text), byte_encoding, 100)
+    assert [c.text for c in chunks] == [text]
+
+
+def test_chunks_respect_budget_and_order(byte_encoding):
+    """Chunks stay within the token budget and preserve all content in order."""
+    paragraphs = [f"Paragraph {i}. " + "Some sentence here. " * 5 for i in range(20)]
+    text = "\n\n".join(paragraphs)
+    tokens = byte_encoding.encode(text)
+
+    chunks = split_into_chunks(text, tokens, byte_encoding, 300)
+
+    assert len(chunks) > 1
+    assert all(c.token_count <= 300 for c in chunks)
+    assert [c.index for c in chunks] == list(range(len(chunks)))
+    assert " ".join(c.text for c in chunks).split() == text.split()
+
+
+def test_chunks_split_on_paragraph_boundaries(byte_encoding):
+    """Cuts land on paragraph breaks when one is available."""
+    paragraphs = ["x" * 80 for _ in range(10)]
+    text = "\n\n".join(paragraphs)
+
+    chunks = split_into_chunks(text, byte_encoding.encode(text), byte_encoding, 200)
+
+    for chunk in chunks:
+        assert all(part == "x" * 80 for part in chunk.text.split("\n\n"))
+
+
+def test_invalid_budget(byte_encoding):
+    """A non-positive budget is rejected."""
+    with pytest.raises(ValueError):
+        split_into_chunks("text", [1, 2], byte_encoding, 0)
@@ -0,0 +1,72 @@
+"""Tests for the tokenizer subsystem."""
+import asyncio
+
+import pytest
+import tiktoken
+
+from app.config import settings
+from app.services.tokenizer import Tokenizer
+
+
+@pytest.fixture
+def tokenizer(monkeypatch, byte_encoding):
+    monkeypatch.setattr(tiktoken, "encoding_for_model", lambda model: byte_encoding)
+    return Tokenizer("test-model")
+
+
+def test_upper_bound_is_never_below_token_count(tokenizer):
+    """The cheap bound never underestimates the real token count."""
+    for text in ["plain ascii", "中文文本测试", "emoji 🙂 mix", ""]:
+        assert tokenizer.upper_bound(text) >= len(tokenizer.encode(text))
+
+
+def test_tokenize_skips_encoding_under_budget(tokenizer):
+    """Text that obviously fits the budget is not encoded."""
+    doc = asyncio.run(tokenizer.tokenize("short text", budget=100))
+    assert not doc.exact
+    assert doc.token_count == len("short text")
+
+
+def test_tokenize_over_budget_is_exact(tokenizer):
+    """Text over the budget is encoded exactly."""
+    doc = asyncio.run(tokenizer.tokenize("x" * 200, budget=100))
+    assert doc.exact
+    assert doc.token_count == 200
+
+
+def test_large_text_encoded_in_thread_pool(tokenizer, monkeypatch):
+    """Large inputs are encoded off the event loop with the same result."""
+    from app.services import tokenizer as tokenizer_module
+
+    monkeypatch.setattr(settings, "tokenizer_thread_threshold_chars", 10)
+    executor = tokenizer_module._get_executor()
+    submitted = []
+    original_submit = executor.submit
+
+    def submit(func, *args, **kwargs):
+        submitted.append(func)
+        return original_submit(func, *args, **kwargs)
+
+    monkeypatch.setattr(executor, "submit", submit)
+    text = "word " * 100
+    doc = asyncio.run(tokenizer.tokenize(text))
+
+    assert doc.tokens == tokenizer.encode(text)
+    assert submitted, "encoding did not go through the thread pool"
+
+    submitted.clear()
+    asyncio.run(tokenizer.tokenize("short"))
+    assert not submitted
+
+
+def test_truncate_reuses_tokens(tokenizer):
+    """Truncation slices the existing token array."""
+    doc = asyncio.run(tokenizer.tokenize("abcdefghij"))
+    truncated = asyncio.run(tokenizer.truncate(doc, 4))
+    assert truncated.text == "abcd"
+    assert truncated.token_count == 4
+
+
+def test_special_token_text_is_encoded_as_plain_text(tokenizer):
+    """Special-token strings in user text do not raise."""
+    assert tokenizer.count("<|endoftext|>") > 0
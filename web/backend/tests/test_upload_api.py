@@ -0,0 +1,217 @@
+"""Tests for the upload, download and humanize-file routes."""
+import base64
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services.extraction_cache import ExtractionCache
+from app.services.extraction_pool import ExtractionPool
+from app.services.pdf_extractor import PdfExtractor
+from app.services.pptx_extractor import PptxExtractor
+from app.services.upload_store import UploadStore
+
+
+@pytest.fixture
+def client(upstream, monkeypatch, tmp_path):
+    from app.api import humanize_file, upload
+
+    store = UploadStore(tmp_path)
+    monkeypatch.setattr(upload, "upload_store", store)
+    pool = ExtractionPool(workers=0)
+    monkeypatch.setattr(upload, "extraction_pool", pool)
+    monkeypatch.setattr(upload, "pdf_extractor", PdfExtractor(pool, pages_per_job=2))
+    monkeypatch.setattr(upload, "pptx_extractor", PptxExtractor(pool, slides_per_job=2))
+    monkeypatch.setattr(upload, "extraction_cache", ExtractionCache(tmp_path / "cache"))
+    monkeypatch.setattr(humanize_file, "upload_store", store)
+
+    app = FastAPI()
+    app.include_router(upload.router)
+    app.include_router(humanize_file.router)
+    return TestClient(app)
+
+
+def _upload(client, content: bytes = b"Some uploaded text.") -> dict:
+    response = client.post("/api/v1/upload", files={"file": ("notes.txt", content, "text/plain")})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_upload_returns_id_without_file_bytes(client):
+    """The response carries the content ID and text, not the file as base64."""
+    data = _upload(client)
+
+    assert set(data) == {"fileId", "filename", "text", "size", "chars"}
+    assert data["text"] == "Some uploaded text."
+    assert data["size"] == len(b"Some uploaded text.")
+
+
+def test_download_supports_ranges(client):
+    """Raw bytes are available separately, including partial ranges."""
+    file_id = _upload(client)["fileId"]
+
+    full = client.get(f"/api/v1/files/{file_id}")
+    partial = client.get(f"/api/v1/files/{file_id}", headers={"Range": "bytes=0-3"})
+
+    assert full.content == b"Some uploaded text."
+    assert partial.status_code == 206
+    assert partial.content == b"Some"
+
+
+def test_download_rejects_bad_ids(client):
+    """Malformed IDs are rejected and unknown IDs are 404."""
+    assert client.get("/api/v1/files/not-a-hash").status_code == 400
+    assert client.get(f"/api/v1/files/{'0' * 64}").status_code == 404
+
+
+def test_humanize_file_by_id(client, upstream):
+    """humanize-file resolves the upload by its content ID."""
+    upstream.handler = lambda request: httpx.Response(
+        200, json={"choices": [{"message": {"content": "Rewritten."}}]}
+    )
+    data = _upload(client)
+
+    response = client.post(
+        "/api/v1/humanize-file",
+        json={
+            "file_id": data["fileId"],
+            "text": data["text"],
+            "params": {"length": "Normal", "similarity": "Moderate", "style": "Neutral"},
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json()["content"] == "Rewritten."
+
+
+def test_pdf_upload_extracts_pages_in_order(client, make_pdf):
+    pages = ["First page", "Second page", "Third page"]
+    response = client.post(
+        "/api/v1/upload",
+        files={"file": ("doc.pdf", make_pdf(pages), "application/pdf")},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["text"] == "\n".join(pages)
+
+
+def test_repeat_upload_skips_extraction(client, monkeypatch):
+    from app.api import upload
+
+    _upload(client)
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("extraction should not run again")
+
+    monkeypatch.setattr(upload.extraction_pool, "run", fail)
+    assert _upload(client)["text"] == "Some uploaded text."
+    assert upload.extraction_cache.memory_hits == 1
+
+
+def test_pdf_upload_reports_page_range(client, make_pdf):
+    pages = [f"Page {i}" for i in range(1, 6)]
+    response = client.post(
+        "/api/v1/upload?start_page=2&end_page=3",
+        files={"file": ("doc.pdf", make_pdf(pages), "application/pdf")},
+    )
+
+    data = response.json()
+    assert data["text"] == "Page 2\nPage 3"
+    assert (data["pageCount"], data["startPage"], data["endPage"]) == (5, 2, 3)
+    assert "stopReason" not in data
+
+
+def test_pdf_page_range_from_disk_matches_in_memory(client, make_pdf, monkeypatch):
+    """Uploads too large to parse in memory go through the pool with the same result."""
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "extraction_inline_max_bytes", 0)
+    pages = [f"Page {i}" for i in range(1, 6)]
+    response = client.post(
+        "/api/v1/upload?start_page=2&end_page=3",
+        files={"file": ("doc.pdf", make_pdf(pages), "application/pdf")},
+    )
+
+    data = response.json()
+    assert data["text"] == "Page 2\nPage 3"
+    assert (data["pageCount"], data["startPage"], data["endPage"]) == (5, 2, 3)
+
+
+def test_format_is_detected_from_content(client, make_pdf):
+    """A PDF with a .txt name is parsed as a PDF; legacy Office files are rejected."""
+    pdf = client.post(
+        "/api/v1/upload", files={"file": ("notes.txt", make_pdf(["Hidden PDF"]), "text/plain")}
+    )
+    legacy = client.post(
+        "/api/v1/upload",
+        files={"file": ("old.docx", b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + b"\x00" * 64, "application/msword")},
+    )
+
+    assert pdf.json()["text"] == "Hidden PDF"
+    assert pdf.json()["pageCount"] == 1
+    assert legacy.status_code == 400
+    assert "Legacy" in legacy.json()["detail"]
+
+
+def test_pdf_upload_stops_at_token_budget(client, make_pdf, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "extraction_token_budget", 10)
+    pages = [f"Page {i} text" for i in range(1, 6)]
+    response = client.post(
+        "/api/v1/upload",
+        files={"file": ("doc.pdf", make_pdf(pages), "application/pdf")},
+    )
+
+    data = response.json()
+    assert data["text"] == "Page 1 text"
+    assert (data["pageCount"], data["endPage"], data["stopReason"]) == (5, 1, "token_budget")
+
+
+def test_humanize_file_streams_file_in_file_mode(client, upstream):
+    """Without text, the stored file is sent upstream as a base64 data URL."""
+    content = b"Plain text attached as a file."
+    received = {}
+
+    def reply(request):
+        received["length"] = int(request.headers["content-length"])
+        received["body"] = request.content
+        return httpx.Response(200, json={"choices": [{"message": {"content": "Rewritten."}}]})
+
+    upstream.handler = reply
+    response = client.post("/api/v1/upload", files={"file": ("notes.txt", content, "text/plain")})
+    file_id = response.json()["fileId"]
+
+    response = client.post(
+        "/api/v1/humanize-file",
+        json={
+            "file_id": file_id,
+            "text": "",
+            "params": {"length": "Normal", "similarity": "Moderate", "style": "Neutral"},
+        },
+    )
+
+    assert response.status_code == 200
+    payload = json.loads(received["body"])
+    file_part = payload["messages"][1]["content"][0]["file"]
+    assert file_part["file_data"] == "data:text/plain;base64," + base64.b64encode(content).decode()
+    assert received["length"] == len(received["body"])
+
+
+def test_small_uploads_are_parsed_in_the_pool(client, monkeypatch):
+    """Uploads parsed from the received bytes still go through the extraction pool."""
+    from app.api import upload
+
+    jobs = []
+    run = upload.extraction_pool.run
+
+    async def recording_run(func, *args, **kwargs):
+        jobs.append((func.__name__, type(args[0])))
+        return await run(func, *args, **kwargs)
+
+    monkeypatch.setattr(upload.extraction_pool, "run", recording_run)
+
+    assert _upload(client)["text"] == "Some uploaded text."
+    assert jobs == [("extract_buffer", bytes)]
@@ -0,0 +1,136 @@
+"""Tests for the upload store janitor."""
+import asyncio
+import os
+import time
+
+from app.services.upload_janitor import UploadJanitor
+from app.services.upload_store import UploadStore
+
+
+def _age(store: UploadStore, file_id: str, seconds: float) -> None:
+    """Set a blob's mtime ``seconds`` into the past."""
+    past = time.time() - seconds
+    os.utime(store.blob_path(file_id), (past, past))
+
+
+def test_blobs_are_sharded_and_flat_layout_is_migrated(tmp_path):
+    """New blobs go into a two-character shard; old flat files are moved there."""
+    store = UploadStore(tmp_path)
+    stored = store.put("a.txt", b"hello")
+    assert stored.path == tmp_path / stored.file_id[:2] / stored.file_id
+
+    legacy = "ab" * 32
+    (tmp_path / legacy).write_bytes(b"old")
+    (tmp_path / f"{legacy}.json").write_text('{"filename": "old.txt"}')
+
+    assert store.migrate_flat_layout() == 2
+    assert store.get(legacy).path.read_bytes() == b"old"
+
+
+def test_sweep_deletes_expired_files(tmp_path):
+    """Files older than max_age are deleted with their metadata; bytes are reported."""
+    store = UploadStore(tmp_path)
+    janitor = UploadJanitor(store, max_age=3600, max_total_bytes=0)
+    old = store.put("old.txt", b"x" * 100)
+    new = store.put("new.txt", b"y" * 10)
+    _age(store, old.file_id, 7200)
+    janitor.scan()
+
+    result = janitor.sweep()
+
+    assert result["deletedFiles"] == 1
+    assert result["reclaimedBytes"] >= 100
+    assert not old.path.exists()
+    assert not store.meta_path(old.file_id).exists()
+    assert new.path.exists()
+    assert janitor.stats()["files"] == 1
+
+
+def test_sweep_enforces_quota_oldest_first(tmp_path):
+    """Over the quota, the least recently stored files go first."""
+    store = UploadStore(tmp_path)
+    janitor = UploadJanitor(store, max_age=0, max_total_bytes=250)
+    files = [store.put(f"{i}.txt", bytes([i]) * 100) for i in range(4)]
+    for i, stored in enumerate(files):
+        _age(store, stored.file_id, 100 - i)
+    janitor.scan()
+
+    janitor.sweep()
+
+    assert [f.path.exists() for f in files] == [False, False, True, True]
+    assert janitor.total_bytes == 200
+
+
+def test_reupload_refreshes_index(tmp_path):
+    """Storing known content again moves it to the back of the queue."""
+    store = UploadStore(tmp_path)
+    janitor = UploadJanitor(store, max_age=0, max_total_bytes=150)
+    first = store.put("a.txt", b"a" * 100)
+    _age(store, first.file_id, 100)
+    janitor.scan()
+    second = store.put("b.txt", b"b" * 100)
+
+    store.put("a-again.txt", b"a" * 100)
+    janitor.sweep()
+
+    assert first.path.exists()
+    assert not second.path.exists()
+
+
+def test_file_refreshed_by_another_process_is_kept(tmp_path):
+    """A blob whose mtime moved on since indexing is re-indexed, not deleted."""
+    store = UploadStore(tmp_path)
+    janitor = UploadJanitor(store, max_age=3600, max_total_bytes=0)
+    stored = store.put("a.txt", b"data")
+    _age(store, stored.file_id, 7200)
+    janitor.scan()
+    os.utime(stored.path)
+
+    assert janitor.sweep()["deletedFiles"] == 0
+    assert stored.path.exists()
+
+
+def test_start_scans_and_sweeps(tmp_path):
+    """Starting the janitor indexes existing files and removes stale temporaries."""
+    store = UploadStore(tmp_path)
+    janitor = UploadJanitor(store, max_age=3600, max_total_bytes=0, interval=3600)
+    stored = store.put("old.txt", b"old")
+    _age(store, stored.file_id, 7200)
+    tmp = tmp_path / ".tmp-abandoned"
+    tmp.write_bytes(b"partial")
+    os.utime(tmp, (0, 0))
+
+    async def run():
+        await janitor.start()
+        await janitor.stop()
+
+    asyncio.run(run())
+
+    assert not stored.path.exists()
+    assert not tmp.exists()
+    assert janitor.stats()["deletedFiles"] == 1
+
+
+def test_file_stored_during_scan_stays_indexed(tmp_path, monkeypatch):
+    """An upload recorded after the walk passed its shard is not dropped by the scan."""
+    from contextlib import nullcontext
+
+    from app.services import upload_janitor
+
+    store = UploadStore(tmp_path)
+    janitor = UploadJanitor(store, max_age=3600, max_total_bytes=0)
+    real_scandir = os.scandir
+    late = []
+
+    def scandir(path):
+        entries = list(real_scandir(path))
+        if path == store.root and not late:
+            late.append(store.put("late.txt", b"late"))
+        return nullcontext(entries)
+
+    monkeypatch.setattr(store, "migrate_flat_layout", lambda: 0)
+    monkeypatch.setattr(upload_janitor.os, "scandir", scandir)
+    janitor.scan()
+
+    assert janitor.stats()["files"] == 1
+    assert janitor.total_bytes == late[0].size
@@ -0,0 +1,71 @@
+"""Tests for the content-addressed upload store."""
+import asyncio
+import hashlib
+
+import pytest
+
+from app.services.upload_store import UploadStore
+
+
+def test_put_stores_by_content_hash(tmp_path):
+    """Files are stored under their SHA-256 and can be looked up again."""
+    store = UploadStore(tmp_path)
+
+    stored = store.put("notes.txt", b"hello")
+    fetched = store.get(stored.file_id)
+
+    assert stored.file_id == hashlib.sha256(b"hello").hexdigest()
+    assert fetched.filename == "notes.txt"
+    assert fetched.size == 5
+    assert fetched.path.read_bytes() == b"hello"
+    assert fetched.content_type == "text/plain"
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    """Re-uploading the same bytes reuses the blob and keeps the latest name."""
+    store = UploadStore(tmp_path)
+
+    first = store.put("a.txt", b"same")
+    second = store.put("b.txt", b"same")
+
+    assert first.file_id == second.file_id
+    assert store.get(first.file_id).filename == "b.txt"
+    blobs = [p for p in tmp_path.rglob("*") if p.is_file() and not p.name.endswith(".json")]
+    assert len(blobs) == 1
+
+
+def test_invalid_and_missing_ids(tmp_path):
+    """Malformed IDs are rejected; unknown IDs are not found."""
+    store = UploadStore(tmp_path)
+
+    with pytest.raises(ValueError):
+        store.get("../../etc/passwd")
+    with pytest.raises(FileNotFoundError):
+        store.get("0" * 64)
+
+
+def _chunks(*parts: bytes):
+    async def gen():
+        for part in parts:
+            yield part
+
+    return gen()
+
+
+def test_put_stream_hashes_incrementally(tmp_path):
+    """Streamed content gets the same ID as the whole content."""
+    store = UploadStore(tmp_path)
+
+    stored = asyncio.run(store.put_stream("a.txt", _chunks(b"hel", b"lo"), max_size=100))
+
+    assert stored.file_id == hashlib.sha256(b"hello").hexdigest()
+    assert stored.path.read_bytes() == b"hello"
+
+
+def test_put_stream_rejects_oversized_files(tmp_path):
+    """Exceeding the limit aborts the upload and removes the partial file."""
+    store = UploadStore(tmp_path)
+
+    with pytest.raises(ValueError, match="exceeds"):
+        asyncio.run(store.put_stream("a.txt", _chunks(b"x" * 8, b"x" * 8), max_size=10))
+    assert list(tmp_path.iterdir()) == []
@@ -35,7 +35,7 @@ export default function Home() {
   const [isLoading, setIsLoading] = useState(false);
   const [inputMode, setInputMode] = useState<"text" | "document">("text");
   const [fileName, setFileName] = useState<string>("");
-  const [filePath, setFilePath] = useState<string>("");
+  const [fileId, setFileId] = useState<string>("");
 
   const {
     register,
@@ -58,14 +58,12 @@ export default function Home() {
   const style = watch("style");
   const { count, isTooShort, isTooLong } = useCharCount(text);
 
-  const handleFileProcessed = (text: string, _base64: string, filename: string, filepath?: string) => {
-    console.log("File processed:", { textLength: text.length, filename, filepath });
+  const handleFileProcessed = (text: string, filename: string, fileId: string) => {
+    console.log("File processed:", { textLength: text.length, filename, fileId });
     setValue("text", text);
     setValue("mode", "document");
     setFileName(filename);
-    if (filepath) {
-      setFilePath(filepath);
-    }
+    setFileId(fileId);
   };
 
   const onSubmit = async (data: HumanizeFormData) => {
@@ -75,7 +73,7 @@ export default function Home() {
       count,
       isTooShort,
       isTooLong,
-      filePath,
+      fileId,
     });
     
     setIsLoading(true);
@@ -84,11 +82,11 @@ export default function Home() {
       let response;
       
       // Use different API endpoint based on mode
-      if (data.mode === "document" && filePath) {
+      if (data.mode === "document" && fileId) {
         // For document mode, use the file-specific endpoint
-        console.log("Calling humanize-file API with file path:", filePath);
+        console.log("Calling humanize-file API with file ID:", fileId);
         response = await humanizeFile({
-          file_path: filePath,
+          file_id: fileId,
           text: data.text,
           params: {
             length: data.length,
@@ -390,7 +388,7 @@ export default function Home() {
                   onClick={() => {
                     setValue("text", "");
                     setFileName("");
-                    setFilePath("");
+                    setFileId("");
                   }}
                 >
                   Clear
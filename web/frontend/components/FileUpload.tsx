@@ -7,7 +7,7 @@ import { useToast } from "@/hooks/use-toast";
 import { getApiUrl } from "@/lib/api";
 
 interface FileUploadProps {
-  onFileProcessed: (text: string, base64: string, filename: string, filepath?: string) => void;
+  onFileProcessed: (text: string, filename: string, fileId: string) => void;
   disabled?: boolean;
 }
 
@@ -111,8 +111,8 @@ export function FileUpload({ onFileProcessed, disabled }: FileUploadProps) {
         size: file.size,
       });
 
-      // Call parent callback with extracted text, base64, and file path
-      onFileProcessed(data.text, data.base64, file.name, data.file_path);
+      // Call parent callback with extracted text and the stored file ID
+      onFileProcessed(data.text, file.name, data.fileId);
 
       toast({
         title: "File uploaded successfully",
@@ -2,7 +2,7 @@
  * API client for backend communication
  */
 
-import { API_BASE_URL, getApiUrl } from './config';
+import { API_BASE_URL, API_CONFIG, getApiUrl } from './config';
 
 // Compatible export for use by other files
 export { API_BASE_URL, getApiUrl };
@@ -21,7 +21,7 @@ interface HumanizeRequest {
 }
 
 interface HumanizeFileRequest {
-  file_path: string;
+  file_id: string;
   text: string;
   params: {
     length: string;
@@ -37,6 +37,16 @@ interface HumanizeResponse {
   processingTime: number;
 }
 
+interface JobResponse {
+  jobId: string;
+  kind: string;
+  status: "queued" | "running" | "succeeded" | "failed";
+  progress: number;
+  message?: string | null;
+  result?: HumanizeResponse | null;
+  error?: string | null;
+}
+
 /**
  * Humanize text (for text mode)
  */
@@ -61,11 +71,16 @@ export async function humanizeText(
 
 /**
  * Humanize file (for document mode)
+ *
+ * Runs as a background job so long documents are not bound by the HTTP
+ * request timeout: the job is queued, then polled with a growing interval
+ * until it finishes or API_CONFIG.JOB_DEADLINE passes.
  */
 export async function humanizeFile(
-  request: HumanizeFileRequest
+  request: HumanizeFileRequest,
+  onProgress?: (progress: number, message?: string | null) => void
 ): Promise<HumanizeResponse> {
-  const response = await fetch(getApiUrl('HUMANIZE_FILE'), {
+  const response = await fetch(getApiUrl('HUMANIZE_FILE_JOB'), {
     method: "POST",
     headers: {
       "Content-Type": "application/json",
@@ -78,6 +93,36 @@ export async function humanizeFile(
     throw new Error(error.detail || "Failed to humanize file");
   }
 
+  let job: JobResponse = await response.json();
+  const deadline = Date.now() + API_CONFIG.JOB_DEADLINE;
+  let interval: number = API_CONFIG.JOB_POLL_INTERVAL;
+  while (job.status === "queued" || job.status === "running") {
+    onProgress?.(job.progress, job.message);
+    if (Date.now() + interval > deadline) {
+      throw new Error("Timed out waiting for the file to be humanized");
+    }
+    await new Promise((resolve) => setTimeout(resolve, interval));
+    interval = Math.min(interval * 1.5, API_CONFIG.JOB_POLL_MAX_INTERVAL);
+    job = await getJob(job.jobId);
+  }
+
+  if (job.status === "failed" || !job.result) {
+    throw new Error(job.error || "Failed to humanize file");
+  }
+  return job.result;
+}
+
+/**
+ * Get the status of a background job
+ */
+export async function getJob(jobId: string): Promise<JobResponse> {
+  const response = await fetch(`${getApiUrl('JOBS')}/${jobId}`);
+
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || "Failed to get job status");
+  }
+
   return response.json();
 }
 
@@ -85,12 +130,15 @@ export async function humanizeFile(
  * Upload file and extract text
  */
 export async function uploadFile(file: File): Promise<{
+  fileId: string;
   filename: string;
   text: string;
-  base64: string;
-  size: string;
-  chars: string;
-  file_path?: string;
+  size: number;
+  chars: number;
+  pageCount?: number;
+  startPage?: number;
+  endPage?: number;
+  stopReason?: string;
 }> {
   const formData = new FormData();
   formData.append("file", file);
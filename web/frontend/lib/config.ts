@@ -49,7 +49,25 @@ export const API_CONFIG = {
     HUMANIZE: '/api/v1/humanize',
     HUMANIZE_FILE: '/api/v1/humanize-file',
     UPLOAD: '/api/v1/upload',
+    JOBS: '/api/v1/jobs',
+    HUMANIZE_FILE_JOB: '/api/v1/jobs/humanize-file',
   },
+
+  /**
+   * Interval before the first job status poll (milliseconds)
+   */
+  JOB_POLL_INTERVAL: 1000,
+
+  /**
+   * Upper bound for the backed-off poll interval (milliseconds)
+   */
+  JOB_POLL_MAX_INTERVAL: 10000,
+
+  /**
+   * Give up polling a job after this long (milliseconds).
+   * Matches the backend JOB_TIMEOUT_SECONDS (1800) plus time spent queued.
+   */
+  JOB_DEADLINE: (1800 + 300) * 1000, // 35 minutes
   
   /**
    * Request timeout setting (milliseconds)
@@ -0,0 +1,59 @@
+/**
+ * Unit tests for the API client
+ */
+import { afterEach, beforeEach, describe, expect, it, vi } from "vitest";
+import { humanizeFile } from "@/lib/api";
+import { API_CONFIG } from "@/lib/config";
+
+const request = {
+  file_id: "file-1",
+  text: "text",
+  params: { length: "Normal", similarity: "Moderate", style: "Neutral" },
+};
+
+function jsonResponse(body: unknown) {
+  return { ok: true, json: async () => body } as Response;
+}
+
+describe("humanizeFile", () => {
+  beforeEach(() => {
+    vi.useFakeTimers();
+  });
+
+  afterEach(() => {
+    vi.useRealTimers();
+    vi.unstubAllGlobals();
+  });
+
+  it("should back off between polls and return the result", async () => {
+    const result = { content: "done", chars: 4, processingTime: 1 };
+    const fetchMock = vi
+      .fn()
+      .mockResolvedValueOnce(jsonResponse({ jobId: "j", status: "queued", progress: 0 }))
+      .mockResolvedValueOnce(jsonResponse({ jobId: "j", status: "running", progress: 50 }))
+      .mockResolvedValueOnce(jsonResponse({ jobId: "j", status: "succeeded", progress: 100, result }));
+    vi.stubGlobal("fetch", fetchMock);
+
+    const pending = humanizeFile(request);
+    await vi.advanceTimersByTimeAsync(API_CONFIG.JOB_POLL_INTERVAL);
+    expect(fetchMock).toHaveBeenCalledTimes(2);
+    await vi.advanceTimersByTimeAsync(API_CONFIG.JOB_POLL_INTERVAL);
+    expect(fetchMock).toHaveBeenCalledTimes(2);
+    await vi.advanceTimersByTimeAsync(API_CONFIG.JOB_POLL_INTERVAL / 2);
+
+    await expect(pending).resolves.toEqual(result);
+    expect(fetchMock).toHaveBeenCalledTimes(3);
+  });
+
+  it("should give up once the deadline passes", async () => {
+    vi.stubGlobal(
+      "fetch",
+      vi.fn().mockImplementation(async () => jsonResponse({ jobId: "j", status: "running", progress: 10 }))
+    );
+
+    const pending = humanizeFile(request);
+    const assertion = expect(pending).rejects.toThrow("Timed out");
+    await vi.advanceTimersByTimeAsync(API_CONFIG.JOB_DEADLINE);
+    await assertion;
+  });
+});